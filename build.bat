@@ -35,14 +35,31 @@ REM MUDANÇA CRÍTICA: Adicionando --paths "client" para forçar PyInstaller a p
 --collect-all "scipy" ^
 --collect-all "numpy" ^
 --collect-all "socketio" ^
+--hidden-import "log_utils" ^
+--hidden-import "config_store" ^
 --hidden-import "sim_data" ^
+--hidden-import "http_client" ^
 --hidden-import "auth_utils" ^
+--hidden-import "pilot_directory" ^
 --hidden-import "event_logic" ^
+--hidden-import "touchdown_analyzer" ^
 --hidden-import "ws_monitor" ^
+--hidden-import "position_reporter" ^
 --hidden-import "gui" ^
 --hidden-import "radio_dsp" ^
+--hidden-import "jitter_buffer" ^
+--hidden-import "rx_mixer" ^
+--hidden-import "rx_recorder" ^
+--hidden-import "warm_capture" ^
+--hidden-import "audio_codecs" ^
+--hidden-import "voice_activity" ^
+--hidden-import "frame_controller" ^
+--hidden-import "audio_host" ^
+--hidden-import "audio_engine" ^
 --hidden-import "radio_ui_logic" ^
 --hidden-import "update_logic" ^
+--hidden-import "startup" ^
+--hidden-import "import_profiler" ^
 --add-binary "C:\Users\ander\Documents\KAFLY\sky\teste\client\.venv\Lib\site-packages\SimConnect\SimConnect.dll;SimConnect" ^
 "%MAIN_SCRIPT%"
 IF ERRORLEVEL 1 GOTO :PYINSTALLER_FAIL
@@ -0,0 +1,162 @@
+# Arquivo: client/audio_codecs.py
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+import radio_dsp
+
+# --- CONSTANTES DOS CODECS ---
+PCM16 = 'pcm16'             # PCM int16 cru na taxa do rádio (fallback, sempre suportado)
+ULAW = 'ulaw'               # G.711 μ-law (8 bits/amostra): 2x menor
+ALAW = 'alaw'               # G.711 A-law (8 bits/amostra): 2x menor
+NB_ULAW = 'nb-ulaw'         # Banda estreita: 8 kHz + μ-law (~5,75x menor a 23 kHz); a voz já é limitada a 3,8 kHz no TX
+NARROWBAND_RATE = 8000
+
+# Ordem de preferência (mais compacto primeiro). O relay escolhe o primeiro suportado por todos os clientes.
+CODEC_PREFERENCE = [NB_ULAW, ULAW, ALAW, PCM16]
+
+# Taxa de amostragem da rede (DSP, jitter buffer e codecs), negociada junto com o codec. Os dispositivos
+# abrem na taxa nativa e convertem. Clientes antigos só conhecem 23 kHz; 16 kHz cobre a voz (até 3,8 kHz)
+# com menos CPU e converte de/para 48 kHz na razão exata 1:3.
+LEGACY_WIRE_RATE = 23000
+WIRE_RATE_PREFERENCE = [16000, LEGACY_WIRE_RATE]
+
+
+# --- G.711 vetorizado (tabelas calculadas uma vez a partir do algoritmo de referência) ---
+
+def _build_ulaw_tables():
+    pcm = np.arange(-32768, 32768, dtype=np.int32)
+    value = pcm >> 2
+    mask = np.where(value < 0, 0x7F, 0xFF)
+    value = np.minimum(np.abs(value), 8159) + 0x21
+    seg = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), value)
+    uval = (seg << 4) | ((value >> (seg + 1)) & 0x0F)
+    encoded = np.where(seg >= 8, 0x7F, uval) ^ mask
+    # Índice pelo padrão de bits (int16 visto como uint16)
+    encode = np.empty(65536, dtype=np.uint8)
+    encode[pcm.astype(np.int16).view(np.uint16)] = encoded.astype(np.uint8)
+
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0x0F) << 3) + 0x84) << ((u & 0x70) >> 4)
+    decode = np.where(u & 0x80, 0x84 - t, t - 0x84).astype(np.int16)
+    return encode, decode
+
+
+def _build_alaw_tables():
+    pcm = np.arange(-32768, 32768, dtype=np.int32)
+    value = pcm >> 3
+    mask = np.where(value >= 0, 0xD5, 0x55)
+    value = np.where(value >= 0, value, -value - 1)
+    seg = np.searchsorted(np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF]), value)
+    aval = (seg << 4) | np.where(seg < 2, value >> 1, value >> np.maximum(seg, 1)) & 0x0F
+    encoded = np.where(seg >= 8, 0x7F, aval) ^ mask
+    encode = np.empty(65536, dtype=np.uint8)
+    encode[pcm.astype(np.int16).view(np.uint16)] = encoded.astype(np.uint8)
+
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    t = (a & 0x0F) << 4
+    seg = (a & 0x70) >> 4
+    t = np.where(seg == 0, t + 8, (t + 0x108) << np.maximum(seg - 1, 0))
+    decode = np.where(a & 0x80, t, -t).astype(np.int16)
+    return encode, decode
+
+
+_TABLES = {ULAW: _build_ulaw_tables(), ALAW: _build_alaw_tables()}
+
+
+class PcmCodec:
+    """Sem compressão: o chunk int16 segue como está."""
+    name = PCM16
+
+    def encode(self, pcm) -> bytes:
+        return bytes(pcm)
+
+    def decode(self, payload) -> bytes:
+        return bytes(payload)
+
+    def reset(self):
+        pass
+
+
+class G711Codec:
+    """G.711 (μ-law ou A-law) por tabela: uma indexação NumPy por chunk em cada sentido."""
+    def __init__(self, name: str):
+        self.name = name
+        self._encode_table, self._decode_table = _TABLES[name]
+
+    def encode(self, pcm) -> bytes:
+        return self._encode_table[np.frombuffer(pcm, dtype=np.int16).view(np.uint16)].tobytes()
+
+    def decode(self, payload) -> bytes:
+        return self._decode_table[np.frombuffer(payload, dtype=np.uint8)].tobytes()
+
+    def reset(self):
+        pass
+
+
+class NarrowbandCodec:
+    """
+    Codec de fala de baixa taxa: reamostra para 8 kHz (polifásico, com estado) e codifica em μ-law.
+    Cada instância serve um único stream (um encoder no TX, um decoder por remetente no RX).
+    """
+    name = NB_ULAW
+
+    def __init__(self, sample_rate: int):
+        self._g711 = G711Codec(ULAW)
+        self._down = radio_dsp.PolyphaseResampler(sample_rate, NARROWBAND_RATE)
+        self._up = radio_dsp.PolyphaseResampler(NARROWBAND_RATE, sample_rate)
+
+    def encode(self, pcm) -> bytes:
+        narrow = self._down.process(np.frombuffer(pcm, dtype=np.int16).astype(np.float32))
+        return self._g711.encode(radio_dsp.float_to_int16(narrow))
+
+    def decode(self, payload) -> bytes:
+        narrow = np.frombuffer(self._g711.decode(payload), dtype=np.int16).astype(np.float32)
+        return radio_dsp.float_to_int16(self._up.process(narrow)).tobytes()
+
+    def reset(self):
+        """Nova transmissão: descarta o histórico dos reamostradores."""
+        self._down.reset()
+        self._up.reset()
+
+
+def create_codec(name: str, sample_rate: int):
+    """Instância do codec (uma por stream: o codec de banda estreita guarda estado). Desconhecido -> ValueError."""
+    if name == PCM16:
+        return PcmCodec()
+    if name in _TABLES:
+        return G711Codec(name)
+    if name == NB_ULAW:
+        return NarrowbandCodec(sample_rate)
+    raise ValueError(f"Codec de áudio desconhecido: {name}")
+
+
+def supported_codecs(allowed: Iterable[str] | None = None) -> List[str]:
+    """Codecs oferecidos ao relay, na ordem de preferência (restritos a `allowed`; PCM16 sempre incluído)."""
+    allowed_set = set(allowed) if allowed else set(CODEC_PREFERENCE)
+    return [name for name in CODEC_PREFERENCE if name in allowed_set or name == PCM16]
+
+
+def supported_rates(allowed: Iterable[int] | None = None) -> List[int]:
+    """Taxas de rede oferecidas ao relay, na ordem de preferência (a taxa legada sempre incluída)."""
+    allowed_set = set(allowed) if allowed else set(WIRE_RATE_PREFERENCE)
+    return [rate for rate in WIRE_RATE_PREFERENCE if rate in allowed_set or rate == LEGACY_WIRE_RATE]
+
+
+def select_common_rate(offers: Dict[str, Iterable[int]], preference: Iterable[int] = WIRE_RATE_PREFERENCE) -> int:
+    """Primeira taxa da preferência suportada por todos os clientes (mesma regra do radio_server)."""
+    offer_sets = [set(rates) for rates in offers.values()]
+    for rate in preference:
+        if all(rate in rates for rates in offer_sets):
+            return rate
+    return LEGACY_WIRE_RATE
+
+
+def select_common_codec(offers: Dict[str, Iterable[str]], preference: Iterable[str] = CODEC_PREFERENCE) -> str:
+    """Primeiro codec da preferência suportado por todos os clientes (mesma regra do radio_server)."""
+    offer_sets = [set(codecs) for codecs in offers.values()]
+    for name in preference:
+        if all(name in codecs for codecs in offer_sets):
+            return name
+    return PCM16
@@ -0,0 +1,411 @@
+# Arquivo: client/audio_engine.py
+#
+# Motor de áudio em processo separado (opcional, client_config.json: "audio_engine_process": true).
+# O processo filho é dono do PyAudio, dos dispositivos, do DSP, do codec e do Socket.IO do rádio (um
+# RadioClient comum, sem entrada de PTT); o processo da UI/telemetria fica com a config, o teclado e o
+# joystick e só envia comandos (sintonia, posição, PTT, ajustes da janela de configuração) por um canal
+# de controle. O áudio não cruza os processos: captura e reprodução acontecem no motor. Assim o áudio
+# e o loop de telemetria deixam de disputar o mesmo GIL.
+
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from log_utils import get_logger
+from radio_ui_logic import RadioControlsMixin, ensure_radio_stack, load_config, flush_config
+
+log = get_logger('radio')
+
+# --- CONSTANTES DO MOTOR DE ÁUDIO ---
+ENGINE_FLAG = '--audio-engine'
+AUTHKEY_ENV = 'SKYMETRICS_ENGINE_AUTHKEY'
+ENGINE_LOG_FILE = 'skymetrics_audio_engine.log'
+ENGINE_START_TIMEOUT_S = 20.0   # Importar NumPy/SciPy/PyAudio no filho pode levar alguns segundos
+ENGINE_STOP_TIMEOUT_S = 5.0     # Inclui o fechamento do WebSocket do rádio (até ~3 s esperando o relay)
+DEVICE_REFRESH_TIMEOUT_S = 5.0  # Reenumeração dos dispositivos no motor (botão "Atualizar" da janela)
+STATUS_INTERVAL_S = 0.5         # Intervalo de verificação do estado da conexão no filho
+DISTANCE_MIN_DELTA_KM = 0.05    # Distância só é reenviada à UI se mudar mais que isso...
+DISTANCE_MAX_AGE_S = 1.0        # ...ou após esse tempo
+
+
+def engine_command(address, pilot_id: str):
+    """Linha de comando do processo filho: o próprio executável (PyInstaller) ou este arquivo com o Python atual."""
+    args = [ENGINE_FLAG, f"{address[0]}:{address[1]}", pilot_id]
+    if getattr(sys, 'frozen', False):
+        return [sys.executable] + args
+    return [sys.executable, os.path.abspath(__file__)] + args
+
+
+# =================================================================
+# PROCESSO PRINCIPAL: proxy com a mesma interface usada pelo ws_monitor/main
+# =================================================================
+
+class _RemoteConnectionState:
+    """Substitui `RadioClient.sio` para quem só consulta `sio.connected`."""
+    def __init__(self):
+        self.connected = False
+
+
+class AudioEngineClient(RadioControlsMixin):
+    """
+    Proxy do RadioClient que roda no processo do motor de áudio. Expõe o que o monitor, a janela
+    principal e a janela de configuração usam (p, sio.connected, connect, disconnect, tune_frequency,
+    monitor_frequency, send_position, update_audio_streams, replay_last_transmission, update_*_config).
+    O PTT (teclado/joystick) é lido neste processo e enviado ao motor; o catálogo de dispositivos vem do motor.
+    O motor sobe em segundo plano: `starting` fica verdadeiro até ele responder e `failed` indica que não há áudio.
+    """
+    remote = True
+
+    def __init__(self, master_app=None, pilot_id="N/A"):
+        from audio_host import DeviceCatalog
+        self.master_app = master_app
+        self.pilot_id = pilot_id
+        self.p = None  # Verdadeiro quando o motor confirmou o áudio disponível (mesmo teste do RadioClient)
+        self.sio = _RemoteConnectionState()
+        self.audio_host = DeviceCatalog() # Preenchido com a lista enviada pelo motor
+        self.config = load_config()
+        self._apply_config_values()
+        self.ptt_input = True
+        self.is_ptt_active = False
+        self.is_listening_for_ptt = False
+        self.radio_config_window = None
+        self.joystick_thread = None
+        self._joystick_stop = threading.Event()
+        self.current_joystick = None
+        self._ptt_hook = None
+        self.process = None
+        self.conn = None
+        self.starting = True
+        self._closed = False
+        self._connect_requested = False
+        self._state_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._devices_received = threading.Event()
+        threading.Thread(target=self._start, daemon=True).start()
+
+    @property
+    def failed(self) -> bool:
+        """O motor terminou de subir sem áudio (ou não subiu)."""
+        return not self.starting and self.p is None
+
+    def _start(self):
+        """Thread de inicialização: sobe o motor sem bloquear quem criou o proxy (loop de telemetria)."""
+        try:
+            ensure_radio_stack(open_audio=False) # Teclado e joystick do PTT neste processo (sem PortAudio)
+            conn = self._launch()
+            with self._state_lock:
+                if conn is not None and self._closed: # disconnect() durante a inicialização
+                    self._shutdown(conn)
+                    conn = None
+                self.conn = conn
+            if conn is None:
+                return
+            threading.Thread(target=self._event_loop, daemon=True).start()
+            if not self._ready.wait(ENGINE_START_TIMEOUT_S):
+                log.error("Motor de áudio não inicializou o áudio em %.0f s.", ENGINE_START_TIMEOUT_S)
+                return
+            log.info("Motor de áudio ativo (pid %d).", self.process.pid)
+            with self._state_lock:
+                self.starting = False # connect() chamado a partir daqui envia direto
+                connect = self._connect_requested and self.p is not None and not self._closed
+            if connect:
+                self._send('connect')
+        finally:
+            self.starting = False
+            self._ready.set() # Falha na inicialização: libera quem espera o catálogo
+
+    def _launch(self):
+        """Inicia o processo filho e espera ele conectar ao canal de controle. Retorna a conexão (ou None)."""
+        authkey = secrets.token_bytes(16)
+        listener = Listener(('127.0.0.1', 0), authkey=authkey)
+        env = dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
+        creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        try:
+            self.process = subprocess.Popen(engine_command(listener.address, str(self.pilot_id)),
+                                            env=env, creationflags=creationflags)
+        except OSError as e:
+            log.error("Falha ao iniciar o motor de áudio: %s", e)
+            listener.close()
+            return None
+
+        accepted = {}
+        def accept():
+            try:
+                accepted['conn'] = listener.accept()
+            except Exception as e:
+                log.error("Motor de áudio não conectou ao canal de controle: %s", e)
+        accept_thread = threading.Thread(target=accept, daemon=True)
+        accept_thread.start()
+        accept_thread.join(ENGINE_START_TIMEOUT_S)
+        listener.close()
+        conn = accepted.get('conn')
+        if conn is None:
+            log.error("Motor de áudio não respondeu em %.0f s; rádio indisponível.", ENGINE_START_TIMEOUT_S)
+            self._reap_process()
+        return conn
+
+    def _event_loop(self):
+        """Thread do proxy: eventos do motor (pronto, dispositivos, estado da conexão, distância)."""
+        while True:
+            try:
+                event, data = self.conn.recv()
+            except (EOFError, OSError, AttributeError):
+                break
+            if event == 'ready':
+                from audio_host import DeviceCatalog
+                self.audio_host = DeviceCatalog(data.get('devices'))
+                self.p = True if data.get('audio') else None
+                self._ready.set()
+            elif event == 'devices':
+                from audio_host import DeviceCatalog
+                self.audio_host = DeviceCatalog(data)
+                self._devices_received.set()
+            elif event == 'status':
+                self._on_status(bool(data.get('connected')))
+            elif event == 'distance':
+                self._show_distance(data)
+        self._on_status(False)
+        self._ready.set()
+
+    def _on_status(self, connected: bool):
+        """Mesmo efeito do connect/disconnect do Socket.IO no RadioClient: liga/desliga a entrada do PTT."""
+        if connected == self.sio.connected:
+            return
+        self.sio.connected = connected
+        if connected:
+            self.set_ptt_hotkeys(self.ptt_key, True)
+            self.start_joystick_monitor()
+        else:
+            self.is_ptt_active = False # O motor encerra a transmissão ao perder o relay
+            self.set_ptt_hotkeys(self.ptt_key, False)
+
+    def _show_distance(self, distance_km: float):
+        if self.master_app and self.master_app.current_frame:
+            current_frame = self.master_app.current_frame
+            if hasattr(current_frame, 'update_radio_distance'):
+                self.master_app.after(0, lambda: current_frame.update_radio_distance(distance_km))
+
+    def _send(self, command: str, *args) -> bool:
+        conn = self.conn
+        if conn is None:
+            return False
+        try:
+            with self._send_lock:
+                conn.send((command, args))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    # --- Interface do RadioClient ---
+
+    def connect(self):
+        """Conecta o rádio; com o motor ainda subindo, o comando é enviado quando ele ficar pronto."""
+        with self._state_lock:
+            self._connect_requested = True
+            if self.starting:
+                return
+        self._send('connect')
+
+    def disconnect(self):
+        """Encerra o rádio e o processo do motor sem esperar por ele (o filho é recolhido em segundo plano)."""
+        self.set_ptt_hotkeys(self.ptt_key, False)
+        self.stop_joystick_monitor()
+        with self._state_lock:
+            self._closed = True
+            conn, self.conn = self.conn, None
+        if conn is not None:
+            self._shutdown(conn)
+        self.sio.connected = False
+        self.is_ptt_active = False
+
+    def _shutdown(self, conn):
+        try:
+            with self._send_lock:
+                conn.send(('shutdown', ()))
+        except (OSError, ValueError):
+            pass
+        threading.Thread(target=self._reap_process, args=(conn,), daemon=True).start()
+
+    def _reap_process(self, conn=None):
+        process = self.process
+        if process is not None:
+            try:
+                process.wait(ENGINE_STOP_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                log.warning("Motor de áudio não encerrou em %.0f s; finalizando.", ENGINE_STOP_TIMEOUT_S)
+                process.kill()
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def tune_frequency(self, new_freq_str):
+        self._send('tune', new_freq_str)
+
+    def monitor_frequency(self, new_freq_str):
+        self._send('monitor', new_freq_str)
+
+    def send_position(self, lat: float, lng: float, gs: float | None = None, track: float | None = None):
+        self._send('position', lat, lng, gs, track)
+
+    def start_transmission_ptt(self):
+        if self.is_ptt_active:
+            return
+        self.is_ptt_active = True
+        self._send('ptt', True)
+
+    def stop_transmission(self):
+        if not self.is_ptt_active:
+            return
+        self.is_ptt_active = False
+        self._send('ptt', False)
+
+    def replay_last_transmission(self) -> bool:
+        return self._send('replay')
+
+    # --- Janela de configuração ---
+
+    def _apply_settings(self, changes):
+        """Volumes, loopback, dual-watch e COMs: o motor aplica na hora, sem gravar (a config é deste processo)."""
+        self._apply_config_values()
+        self._send('settings', changes)
+
+    def _device_index(self, direction: str, allow_refresh: bool = False):
+        config = self.config
+        return self.audio_host.resolve(direction, config.get(f'{direction}_device_index'),
+                                       config.get(f'{direction}_device_name'), config.get(f'{direction}_device_host_api'))
+
+    def refresh_audio_devices(self):
+        """Reenumera os dispositivos no motor e espera o catálogo novo (botão "Atualizar" da janela)."""
+        if self.starting:
+            self._ready.wait(ENGINE_START_TIMEOUT_S) # O evento 'ready' já traz o catálogo
+            return
+        self._devices_received.clear()
+        if self._send('refresh_devices'):
+            self._devices_received.wait(DEVICE_REFRESH_TIMEOUT_S)
+
+    def update_audio_streams(self):
+        """A janela de configuração trocou os dispositivos: o motor relê o client_config.json e reabre os streams."""
+        flush_config() # A gravação é adiada (debounce): o motor lê o disco
+        self._send('reload_config')
+
+
+# =================================================================
+# PROCESSO DO MOTOR
+# =================================================================
+
+class _EngineHost:
+    """Lado filho: um RadioClient local comandado pelo canal de controle."""
+    def __init__(self, conn, radio):
+        self.conn = conn
+        self.radio = radio
+        self._send_lock = threading.Lock()
+        self._last_distance = None
+        self._last_distance_time = 0.0
+        radio.on_distance = self._on_distance
+
+    def send(self, event: str, data=None):
+        try:
+            with self._send_lock:
+                self.conn.send((event, data))
+        except (OSError, ValueError):
+            pass
+
+    def _on_distance(self, distance_km: float):
+        now = time.monotonic()
+        if (self._last_distance is None or abs(distance_km - self._last_distance) > DISTANCE_MIN_DELTA_KM
+                or now - self._last_distance_time > DISTANCE_MAX_AGE_S):
+            self._last_distance, self._last_distance_time = distance_km, now
+            self.send('distance', distance_km)
+
+    def handle(self, command: str, args) -> bool:
+        """Executa um comando do processo principal. Retorna False para encerrar o motor."""
+        radio = self.radio
+        if command == 'shutdown':
+            return False
+        if radio.p is None:
+            return True
+        if command == 'connect':
+            radio.connect()
+        elif command == 'tune':
+            radio.tune_frequency(*args)
+        elif command == 'monitor':
+            radio.monitor_frequency(*args)
+        elif command == 'position':
+            radio.send_position(*args)
+        elif command == 'ptt':
+            if args[0]:
+                radio.start_transmission_ptt()
+            else:
+                radio.stop_transmission()
+        elif command == 'settings':
+            radio.apply_settings(*args)
+        elif command == 'replay':
+            radio.replay_last_transmission()
+        elif command == 'reload_config':
+            radio.reload_config()
+        elif command == 'refresh_devices':
+            radio.refresh_audio_devices()
+            self.send('devices', radio.audio_host.devices())
+        else:
+            log.warning("Comando desconhecido para o motor de áudio: %s", command)
+        return True
+
+    def run(self):
+        connected = None
+        while True:
+            try:
+                if self.conn.poll(STATUS_INTERVAL_S):
+                    command, args = self.conn.recv()
+                    if not self.handle(command, args):
+                        break
+            except (EOFError, OSError):
+                break  # Processo principal encerrado
+            except Exception as e:
+                log.error("Falha ao executar comando no motor de áudio: %s", e)
+            is_connected = bool(self.radio.p is not None and self.radio.sio.connected)
+            if is_connected != connected:
+                connected = is_connected
+                self.send('status', {'connected': connected})
+
+
+def engine_main(argv) -> int:
+    """Ponto de entrada do processo filho: [--audio-engine, host:porta, pilot_id]."""
+    import configparser
+    from log_utils import setup_logging
+    _, address, pilot_id = argv[argv.index(ENGINE_FLAG):][:3]
+    log_config = configparser.ConfigParser()
+    log_config.read('client_config.ini')
+    setup_logging(dict(log_config['LOGGING']) if log_config.has_section('LOGGING') else None, log_file=ENGINE_LOG_FILE)
+
+    host, port = address.rsplit(':', 1)
+    try:
+        conn = Client((host, int(port)), authkey=bytes.fromhex(os.environ.get(AUTHKEY_ENV, '')))
+    except Exception as e:
+        log.critical("Motor de áudio sem canal de controle: %s", e)
+        return 1
+
+    from radio_ui_logic import RadioClient
+    radio = RadioClient(pilot_id=pilot_id, ptt_input=False) # PTT lido no processo da UI e recebido como comando
+    host_loop = _EngineHost(conn, radio)
+    host_loop.send('ready', {'audio': radio.p is not None,
+                             'devices': radio.audio_host.devices() if radio.audio_host is not None else []})
+    log.info("Motor de áudio iniciado (pid %d).", os.getpid())
+    try:
+        host_loop.run()
+    finally:
+        if radio.p is not None:
+            radio.disconnect()
+        conn.close()
+        log.info("Motor de áudio encerrado.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(engine_main(sys.argv))
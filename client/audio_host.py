@@ -0,0 +1,134 @@
+# Arquivo: client/audio_host.py
+
+import threading
+from typing import Dict, Any, List
+
+import pyaudio
+
+from log_utils import get_logger
+
+log = get_logger('radio')
+
+# --- DIREÇÕES DE DISPOSITIVO ---
+INPUT = 'input'
+OUTPUT = 'output'
+_CHANNEL_KEYS = {INPUT: 'max_input_channels', OUTPUT: 'max_output_channels'}
+
+
+class DeviceCatalog:
+    """
+    Catálogo de dispositivos (a lista de `AudioHost.devices`) com as buscas por direção, nome e API.
+    Sozinho, serve a quem não abre o PortAudio: o processo da UI com o motor de áudio separado recebe
+    a lista do motor.
+    """
+    def __init__(self, devices: List[Dict[str, Any]] | None = None):
+        self._devices = devices
+
+    def devices(self) -> List[Dict[str, Any]]:
+        return self._devices or []
+
+    def device_map(self, direction: str) -> Dict[str, int]:
+        """Rótulo -> índice dos dispositivos da direção (rótulo estável: nome e API, sem o índice)."""
+        key = _CHANNEL_KEYS[direction]
+        labels: Dict[str, int] = {}
+        for device in self.devices():
+            if device[key] > 0:
+                label = f"{device['name']} ({device['host_api']})"
+                if label in labels:
+                    label = f"{label} #{device['index']}"
+                labels[label] = device['index']
+        return labels
+
+    def device_info(self, index) -> Dict[str, Any] | None:
+        for device in self.devices():
+            if device['index'] == index:
+                return device
+        return None
+
+    def resolve(self, direction: str, index=None, name: str | None = None, host_api: str | None = None) -> int | None:
+        """
+        Índice atual do dispositivo configurado: procura pelo nome e API (estáveis entre hot-plugs);
+        sem nome salvo (configs antigas) ou sem correspondência, usa o índice se ele ainda servir à direção.
+        """
+        key = _CHANNEL_KEYS[direction]
+        candidates = [d for d in self.devices() if d[key] > 0]
+        if name:
+            matches = [d for d in candidates if d['name'] == name and (host_api is None or d['host_api'] == host_api)]
+            if matches:
+                # Vários iguais (ex.: dois headsets do mesmo modelo): prefere o do índice salvo
+                return next((d['index'] for d in matches if d['index'] == index), matches[0]['index'])
+            return None
+        if index is not None and any(d['index'] == index for d in candidates):
+            return index
+        return None
+
+
+class AudioHost(DeviceCatalog):
+    """
+    Única instância do PortAudio (PyAudio) do processo, com o catálogo de dispositivos em cache.
+    O PortAudio só reenumera dispositivos ao ser reinicializado, então `refresh()` recria a instância:
+    quem tiver streams abertos deve fechá-los antes (RadioClient.refresh_audio_devices faz isso).
+    """
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.RLock()
+        self.pa = pyaudio.PyAudio()
+        self.refreshes = 0
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """Catálogo em cache: index, name, host_api, max_input_channels, max_output_channels, default_rate."""
+        with self._lock:
+            if self._devices is None:
+                self._devices = self._enumerate()
+            return self._devices
+
+    def _enumerate(self) -> List[Dict[str, Any]]:
+        host_apis = {}
+        devices = []
+        for i in range(self.pa.get_device_count()):
+            try:
+                info = self.pa.get_device_info_by_index(i)
+            except Exception:
+                continue
+            api_index = info.get('hostApi', 0)
+            if api_index not in host_apis:
+                try:
+                    host_apis[api_index] = self.pa.get_host_api_info_by_index(api_index).get('name', str(api_index))
+                except Exception:
+                    host_apis[api_index] = str(api_index)
+            devices.append({
+                'index': i,
+                'name': info.get('name', ''),
+                'host_api': host_apis[api_index],
+                'max_input_channels': info.get('maxInputChannels', 0),
+                'max_output_channels': info.get('maxOutputChannels', 0),
+                'default_rate': int(info.get('defaultSampleRate', 0)),
+            })
+        return devices
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Reinicializa o PortAudio e reenumera os dispositivos (hot-plug). Streams abertos ficam inválidos."""
+        with self._lock:
+            try:
+                self.pa.terminate()
+            except Exception:
+                pass
+            self.pa = pyaudio.PyAudio()
+            self._devices = None
+            self.refreshes += 1
+            devices = self.devices()
+        log.info("Dispositivos de áudio reenumerados: %d encontrados.", len(devices))
+        return devices
+
+
+_host: AudioHost | None = None
+_host_lock = threading.Lock()
+
+
+def get_audio_host() -> AudioHost:
+    """Instância compartilhada (criada no primeiro uso)."""
+    global _host
+    with _host_lock:
+        if _host is None:
+            _host = AudioHost()
+        return _host
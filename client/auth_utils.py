@@ -6,6 +6,13 @@ import keyring
 import os
 from typing import Dict, Any, Tuple
 
+from log_utils import get_logger
+from config_store import IniConfigStore
+from http_client import get_http_client
+from pilot_directory import get_pilot_directory, CACHE_FILE as PILOTS_CACHE_FILE
+
+log = get_logger('auth')
+
 CONFIG_FILE = 'client_config.ini'
 CLIENT_CONFIG_SECTION = 'CLIENT_CONFIG' 
 CLIENT_LOGIN_SECTION = 'LOGIN_CREDENTIALS'
@@ -21,12 +28,21 @@ def _get_absolute_config_path(config_file: str) -> str:
     return os.path.join(parent_dir, config_file) 
 
 
+_ini_stores: Dict[str, IniConfigStore] = {}
+
+def _ini_store(config_path: str) -> IniConfigStore:
+    """Armazenamento (em memória, gravação adiada e atômica) do INI nesse caminho, um por processo."""
+    store = _ini_stores.get(config_path)
+    if store is None:
+        store = _ini_stores.setdefault(config_path, IniConfigStore(config_path))
+    return store
+
+
 def _get_config_globals(config_file: str) -> Tuple[str, str, str, str, str, configparser.ConfigParser]:
     # CHAVE: Usar o caminho ABSOLUTO
     config_path = _get_absolute_config_path(config_file)
     
-    config = configparser.ConfigParser()
-    config.read(config_path)
+    config = _ini_store(config_path).read()
 
     # Garante que as seções existem antes de usar, caso o arquivo seja novo
     if CLIENT_CONFIG_SECTION not in config: config[CLIENT_CONFIG_SECTION] = {}
@@ -46,26 +62,27 @@ def check_login(email: str, password: str, config_file: str = CONFIG_FILE) -> bo
     url = KAFY_BASE_URL + LOGIN_ENDPOINT
     data = {'username': email, 'password': password}
     try:
-        response = requests.post(url, data=data, timeout=10)
+        response = get_http_client().post(url, data=data, timeout=10)
         return response.text.strip().lower() == 'true'
     except requests.exceptions.RequestException: 
         return False
 
 def get_validated_pilot_data(email: str, config_file: str = CONFIG_FILE) -> Dict[str, Any] | None:
-    """Busca os dados do piloto na lista de pilotos validados da VA."""
+    """Busca os dados do piloto na lista de pilotos validados da VA (cache local indexado por e-mail)."""
     KAFY_BASE_URL, _, PILOTS_ENDPOINT, _, _, _ = _get_config_globals(config_file)
     url = KAFY_BASE_URL + PILOTS_ENDPOINT
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        pilots_list = response.json()
-        for pilot in pilots_list:
-            if pilot.get('_email_contato', '').lower() == email.lower(): 
-                return pilot
-        return None
+        directory = get_pilot_directory(url, _get_absolute_config_path(PILOTS_CACHE_FILE))
+        return directory.lookup(email)
     except Exception: 
         return None
 
+def prefetch_validated_pilots(config_file: str = CONFIG_FILE) -> bool:
+    """Aquece o diretório de pilotos validados (usado em paralelo na inicialização)."""
+    KAFY_BASE_URL, _, PILOTS_ENDPOINT, _, _, _ = _get_config_globals(config_file)
+    directory = get_pilot_directory(KAFY_BASE_URL + PILOTS_ENDPOINT, _get_absolute_config_path(PILOTS_CACHE_FILE))
+    return directory.refresh()
+
 def load_credentials(config_file: str = CONFIG_FILE) -> Tuple[str, str, bool]:
     """Carrega as credenciais salvas do arquivo de config e do keyring."""
     email, password, remember_me = "", "", False
@@ -92,13 +109,12 @@ def save_credentials(email: str, password: str, config_file: str = CONFIG_FILE):
         config[CLIENT_LOGIN_SECTION]['pilot_email'] = email
         
         # CHAVE: Salva no caminho ABSOLUTO correto
-        with open(config_path, 'w') as configfile: 
-            config.write(configfile)
+        _ini_store(config_path).save(config) # Gravação atômica em segundo plano
             
         keyring_username = email
         keyring.set_password(KEYRING_SERVICE_ID, keyring_username, password)
     except Exception as e: 
-        print(f"Erro ao salvar credenciais: {e}")
+        log.error("Erro ao salvar credenciais: %s", e)
 
 def delete_credentials(email: str, clear_email: bool = True, config_file: str = CONFIG_FILE):
     """Remove as credenciais e desativa o autologin."""
@@ -118,7 +134,6 @@ def delete_credentials(email: str, clear_email: bool = True, config_file: str =
                  config[CLIENT_LOGIN_SECTION]['pilot_email'] = '' 
                  
         # CHAVE: Salva no caminho ABSOLUTO correto
-        with open(config_path, 'w') as configfile: 
-            config.write(configfile)
+        _ini_store(config_path).save(config) # Gravação atômica em segundo plano
     except Exception as e: 
-        print(f"Erro ao deletar credenciais: {e}")
\ No newline at end of file
+        log.error("Erro ao deletar credenciais: %s", e)
\ No newline at end of file
@@ -0,0 +1,117 @@
+# Arquivo: client/config_store.py
+
+import atexit
+import configparser
+import io
+import json
+import os
+import threading
+from typing import Dict, Any
+
+from log_utils import get_logger
+
+log = get_logger('app')
+
+# --- CONSTANTES DO ARMAZENAMENTO DE CONFIGURAÇÃO ---
+SAVE_DEBOUNCE_S = 0.5           # Alterações dentro dessa janela (ex.: girar um knob) viram uma única gravação
+
+
+def atomic_write_text(path: str, text: str):
+    """Grava o arquivo inteiro de forma atômica (arquivo temporário + fsync + rename)."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class DebouncedFileStore:
+    """
+    Conteúdo de um arquivo de configuração mantido em memória: `_submit` aplica a alteração na hora
+    e agenda a gravação em uma thread de fundo após SAVE_DEBOUNCE_S, agrupando as alterações da janela.
+    A serialização acontece em quem chama (instantâneo consistente); a thread só grava o texto.
+    Gravações pendentes são concluídas no encerramento do processo (atexit) ou com `flush()`.
+    """
+    def __init__(self, path: str, debounce_s: float = SAVE_DEBOUNCE_S):
+        self.path = path
+        self.debounce_s = debounce_s
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._text: str | None = None       # Último conteúdo conhecido (lido do disco ou submetido)
+        self._pending: str | None = None    # Conteúdo ainda não gravado
+        self._timer: threading.Timer | None = None
+        self.writes = 0
+        atexit.register(self.flush)
+
+    def _read_text(self, reload: bool = False) -> str:
+        """Conteúdo atual: do disco na primeira vez (ou com `reload`, após gravar o pendente), senão da memória."""
+        if reload:
+            self.flush()
+        with self._lock:
+            if self._text is None or reload:
+                try:
+                    with open(self.path, 'rb') as f:
+                        raw = f.read()
+                except OSError:
+                    raw = b''
+                try:
+                    self._text = raw.decode('utf-8')
+                except UnicodeDecodeError:
+                    self._text = raw.decode('latin-1') # Arquivos antigos gravados na codificação local
+            return self._text
+
+    def _submit(self, text: str):
+        with self._lock:
+            self._text = self._pending = text
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce_s, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Grava agora o conteúdo pendente, se houver (chamado pelo timer, no atexit ou antes de outro processo ler)."""
+        with self._write_lock:
+            with self._lock:
+                text, self._pending = self._pending, None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if text is None:
+                return
+            try:
+                atomic_write_text(self.path, text)
+                self.writes += 1
+            except OSError as e:
+                log.error("Falha ao gravar %s: %s", self.path, e)
+
+
+class JsonConfigStore(DebouncedFileStore):
+    """Configuração JSON (client_config.json do rádio)."""
+    def load(self, reload: bool = False) -> Dict[str, Any]:
+        """Cópia independente da configuração atual ({} se o arquivo não existir ou estiver inválido)."""
+        try:
+            data = json.loads(self._read_text(reload) or '{}')
+        except json.JSONDecodeError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save(self, data: Dict[str, Any]):
+        self._submit(json.dumps(data, indent=4))
+
+
+class IniConfigStore(DebouncedFileStore):
+    """Configuração INI (client_config.ini do login)."""
+    def read(self, reload: bool = False) -> configparser.ConfigParser:
+        """ConfigParser novo com o conteúdo atual (alterações só valem após `save`)."""
+        config = configparser.ConfigParser()
+        try:
+            config.read_string(self._read_text(reload))
+        except configparser.Error as e:
+            log.warning("Configuração inválida em %s: %s", self.path, e)
+        return config
+
+    def save(self, config: configparser.ConfigParser):
+        buffer = io.StringIO()
+        config.write(buffer)
+        self._submit(buffer.getvalue())
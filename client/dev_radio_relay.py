@@ -0,0 +1,211 @@
+# Arquivo: client/dev_radio_relay.py
+#
+# Relay de rádio local para testes: reproduz o protocolo Socket.IO do radio_server/server.js
+# (frequências, posição, fator de degradação, sender, negociação de codec/taxa e marcadores de silêncio) sem HTTPS nem Node.
+# Uso: python dev_radio_relay.py [--port 3000]  e, no client_config.json, "server_url": "http://127.0.0.1:3000"
+# Requer (apenas para desenvolvimento): python-socketio, simple-websocket e werkzeug (servidor WSGI com WebSocket).
+# Instalação: pip install -r requirements-dev.txt
+
+import argparse
+import collections
+import logging
+import math
+import threading
+import time
+
+import socketio
+from werkzeug.serving import make_server
+
+from audio_codecs import CODEC_PREFERENCE, LEGACY_WIRE_RATE, PCM16, select_common_codec, select_common_rate
+from log_utils import get_logger, setup_logging
+from position_reporter import extrapolate
+
+log = get_logger('radio')
+
+# --- CONSTANTES (as mesmas do radio_server) ---
+DEFAULT_PORT = 3000
+DEFAULT_FREQUENCY = '121.5'
+MAX_RANGE_KM = 4000.0
+MIN_RANGE_KM = 5.0
+EARTH_RADIUS_KM = 6371
+STATS_INTERVAL_S = 10.0
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = math.sin(d_lat / 2) ** 2 + math.sin(d_lon / 2) ** 2 * math.cos(math.radians(lat1)) * math.cos(math.radians(lat2))
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def degradation_factor(distance_km):
+    if distance_km <= MIN_RANGE_KM: return 0.0
+    if distance_km >= MAX_RANGE_KM: return 1.0
+    return (distance_km - MIN_RANGE_KM) / (MAX_RANGE_KM - MIN_RANGE_KM)
+
+
+def current_position(position, now):
+    """Posição estimada agora: a última recebida, extrapolada pela velocidade e rumo."""
+    lat, lng, gs, track, received = position
+    return extrapolate(lat, lng, gs, track, now - received)
+
+
+class DevRadioRelay:
+    """Estado do relay: frequência/posição por socket, codecs oferecidos e bytes de áudio recebidos por codec."""
+    def __init__(self):
+        self.sio = socketio.Server(async_mode='threading', cors_allowed_origins='*')
+        self._lock = threading.Lock()
+        self.frequency = {}     # sid -> frequência
+        self.monitored = {}     # sid -> frequências só de escuta (dual-watch)
+        self.pilot = {}         # sid -> pilot_id
+        self.position = {}      # sid -> (lat, lng, gs, track, instante do recebimento)
+        self.codecs = {}        # sid -> codecs suportados
+        self.rates = {}         # sid -> taxas de rede suportadas
+        self.current_codec = PCM16
+        self.current_rate = LEGACY_WIRE_RATE
+        self.audio_bytes = collections.Counter()
+        self.silence_markers = 0
+        self.position_updates = 0
+        self._register()
+
+    def _renegotiate(self):
+        with self._lock:
+            codec = select_common_codec(self.codecs, CODEC_PREFERENCE)
+            rate = select_common_rate(self.rates)
+            changed = (codec, rate) != (self.current_codec, self.current_rate)
+            self.current_codec, self.current_rate = codec, rate
+        if changed:
+            log.info("Codec de áudio da rede: %s a %d Hz", codec, rate)
+            self.sio.emit('codec_selected', {'codec': codec, 'rate': rate})
+
+    def _register(self):
+        sio = self.sio
+
+        @sio.event
+        def connect(sid, environ, auth=None):
+            with self._lock:
+                self.frequency[sid] = DEFAULT_FREQUENCY
+                self.codecs[sid] = [PCM16]
+                self.rates[sid] = [LEGACY_WIRE_RATE]
+            sio.enter_room(sid, DEFAULT_FREQUENCY)
+            self._renegotiate()
+
+        @sio.event
+        def disconnect(sid, *args):
+            with self._lock:
+                for table in (self.frequency, self.monitored, self.pilot, self.position, self.codecs, self.rates):
+                    table.pop(sid, None)
+            self._renegotiate()
+
+        @sio.on('codec_offer')
+        def codec_offer(sid, offer):
+            codecs = [c for c in (offer or {}).get('codecs', []) if isinstance(c, str)]
+            rates = [r for r in (offer or {}).get('rates', []) if isinstance(r, int)]
+            with self._lock:
+                self.codecs[sid] = codecs if PCM16 in codecs else codecs + [PCM16]
+                self.rates[sid] = rates if LEGACY_WIRE_RATE in rates else rates + [LEGACY_WIRE_RATE]
+            self._renegotiate()
+            sio.emit('codec_selected', {'codec': self.current_codec, 'rate': self.current_rate}, to=sid)
+
+        @sio.on('change_frequency')
+        def change_frequency(sid, new_frequency):
+            if not isinstance(new_frequency, str):
+                return
+            new_frequency = new_frequency.strip()
+            with self._lock:
+                old = self.frequency.get(sid, DEFAULT_FREQUENCY)
+                self.frequency[sid] = new_frequency
+                self.monitored[sid] = self.monitored.get(sid, set()) - {new_frequency}
+            sio.leave_room(sid, old)
+            sio.enter_room(sid, new_frequency)
+            sio.emit('frequency_changed', new_frequency, to=sid)
+
+        @sio.on('monitor_frequencies')
+        def monitor_frequencies(sid, frequencies):
+            if not isinstance(frequencies, list):
+                return
+            with self._lock:
+                current = self.frequency.get(sid)
+                self.monitored[sid] = {f.strip() for f in frequencies if isinstance(f, str) and f.strip() and f.strip() != current}
+
+        @sio.on('update_position')
+        def update_position(sid, data):
+            lat, lng, pilot_id = data.get('lat'), data.get('lng'), data.get('pilot_id')
+            if pilot_id and isinstance(lat, (int, float)) and isinstance(lng, (int, float)):
+                # Velocidade/rumo opcionais (clientes novos): a posição é extrapolada até o próximo reporte
+                gs, track = data.get('gs'), data.get('track')
+                if not isinstance(gs, (int, float)) or not isinstance(track, (int, float)):
+                    gs, track = 0.0, 0.0
+                with self._lock:
+                    self.pilot[sid] = pilot_id
+                    self.position[sid] = (lat, lng, gs, track, time.monotonic())
+                    self.position_updates += 1
+
+        @sio.on('audio_chunk')
+        def audio_chunk(sid, chunk):
+            wrapped = isinstance(chunk, dict)
+            audio = chunk.get('audio') if wrapped else chunk
+            codec = chunk.get('codec', PCM16) if wrapped else PCM16
+            rate = chunk.get('rate', LEGACY_WIRE_RATE) if wrapped else LEGACY_WIRE_RATE
+            frame_ms = chunk.get('frame_ms') if wrapped else None
+            silence = wrapped and chunk.get('silence') is True # Marcador do VAD: repassado sem áudio
+            with self._lock:
+                sender = self.pilot.get(sid)
+                sender_pos = self.position.get(sid)
+                frequency = self.frequency.get(sid)
+                receivers = [(other, self.position.get(other)) for other, freq in self.frequency.items()
+                             if other != sid and (freq == frequency or frequency in self.monitored.get(other, ()))]
+                self.audio_bytes[codec] += len(audio or b'')
+                if silence:
+                    self.silence_markers += 1
+            if sender is None or sender_pos is None or not (audio or silence):
+                return True # O retorno vira o ack (RTT do emit medido pelo cliente)
+            now = time.monotonic()
+            sender_now = current_position(sender_pos, now)
+            for receiver, receiver_pos in receivers:
+                factor = degradation_factor(haversine_distance(*sender_now, *current_position(receiver_pos, now))) if receiver_pos else 0.0
+                payload = {'silence': True} if silence else {'audio': audio}
+                payload.update(factor=factor, sender=sender, frequency=frequency, codec=codec, rate=rate)
+                if frame_ms is not None:
+                    payload['frame_ms'] = frame_ms
+                sio.emit('broadcast_audio', payload, to=receiver)
+            return True
+
+    def log_stats(self, elapsed_s: float):
+        with self._lock:
+            totals = dict(self.audio_bytes)
+            self.audio_bytes.clear()
+            fields = {'silence_markers': self.silence_markers, 'position_updates': self.position_updates}
+            self.silence_markers = self.position_updates = 0
+            clients = len(self.frequency)
+        fields.update({f"{codec}_kbps": round(total * 8 / 1000 / elapsed_s, 1) for codec, total in totals.items()})
+        log.info("Relay local: %d clientes, codec %s a %d Hz.", clients, self.current_codec, self.current_rate, extra={'fields': fields})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay de rádio local (substituto do radio_server para testes).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    setup_logging(log_file='dev_radio_relay.log')
+    logging.getLogger('werkzeug').setLevel(logging.WARNING) # Uma linha por requisição de polling
+    relay = DevRadioRelay()
+    app = socketio.WSGIApp(relay.sio)
+    server = make_server(args.host, args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info("Relay de rádio local em http://%s:%d", args.host, args.port)
+
+    try:
+        last = time.monotonic()
+        while True:
+            time.sleep(STATS_INTERVAL_S)
+            now = time.monotonic()
+            relay.log_stats(now - last)
+            last = now
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
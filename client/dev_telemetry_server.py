@@ -0,0 +1,211 @@
+# Arquivo: client/dev_telemetry_server.py
+#
+# Servidor de telemetria local para testes: reproduz o protocolo WebSocket do skymetrics_server
+# (pacote de identificação com pilot_name/vatsim_id/ivao_id, resposta START_TX/STOP_TX e quadros de
+# telemetria em JSON) sem Node, sem checagem de rede real e sem renderizar o monitor HTML/JSON.
+# Mede quadros/s e, para quadros com 'loadgen_sent_at' (telemetry_loadgen.py), a latência ponta a ponta.
+# Uso: python dev_telemetry_server.py [--port 8765] [--record sessao.jsonl]
+#      e, no client_config.ini, websocket_url = ws://127.0.0.1:8765
+# Requer (apenas para desenvolvimento): simple-websocket e werkzeug (os mesmos do dev_radio_relay).
+# Instalação: pip install -r requirements-dev.txt
+
+import argparse
+import collections
+import json
+import logging
+import random
+import threading
+import time
+from typing import Dict, Any
+
+import simple_websocket
+from werkzeug.serving import make_server
+
+from log_utils import get_logger, setup_logging
+
+log = get_logger('monitor')
+
+# --- CONSTANTES (as mesmas do skymetrics_server) ---
+DEFAULT_PORT = 8765
+ANONYMOUS = "ANÔNIMO"
+STATS_INTERVAL_S = 10.0
+LATENCY_SAMPLES = 100000        # Reservatório de latências (os mais recentes) para os percentis
+CONTROL_KEY = 'loadgen'         # Mensagens de controle do gerador de carga: {"loadgen": "stats" | "reset"}
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Percentil por posição mais próxima de uma lista já ordenada (0.0 se vazia)."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class DevTelemetryServer:
+    """Estado do servidor: conexões por piloto, último quadro de cada um e contadores de carga."""
+    def __init__(self, check_delay_ms: float = 0.0, offline_ratio: float = 0.0, record_path: str | None = None):
+        self.check_delay_s = check_delay_ms / 1000
+        self.offline_ratio = offline_ratio
+        self._lock = threading.Lock()
+        self.connections: Dict[str, Any] = {}   # pilot_name -> websocket
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        self._record = open(record_path, 'a', encoding='utf-8') if record_path else None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.packets = 0
+            self.bytes = 0
+            self.parse_errors = 0
+            self.latencies_ms = collections.deque(maxlen=LATENCY_SAMPLES)
+            self._window_packets = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            latencies = sorted(self.latencies_ms)
+            return {
+                'connections': len(self.connections),
+                'packets': self.packets,
+                'bytes': self.bytes,
+                'parse_errors': self.parse_errors,
+                'elapsed_s': round(elapsed, 3),
+                'frames_per_s': round(self.packets / elapsed, 1),
+                'latency_samples': len(latencies),
+                'latency_p50_ms': round(percentile(latencies, 0.50), 2),
+                'latency_p99_ms': round(percentile(latencies, 0.99), 2),
+                'latency_max_ms': round(latencies[-1], 2) if latencies else 0.0,
+            }
+
+    # --- Conexão (uma thread por WebSocket, como o servidor WSGI com threads) ---
+
+    def handle(self, ws):
+        pilot_name = ANONYMOUS
+        try:
+            while True:
+                message = ws.receive()
+                if message is None:
+                    continue
+                received = time.time()
+                pilot_name = self._on_message(ws, message, received, pilot_name)
+        except simple_websocket.ConnectionClosed:
+            pass
+        finally:
+            with self._lock:
+                if self.connections.get(pilot_name) is ws:
+                    del self.connections[pilot_name]
+                    self.snapshots.pop(pilot_name, None)
+
+    def _on_message(self, ws, message, received: float, pilot_name: str) -> str:
+        """Mesmo fluxo do state_manager.js: conta, interpreta, registra o piloto na primeira mensagem."""
+        if isinstance(message, bytes):
+            message = message.decode('utf-8', errors='replace')
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            with self._lock:
+                self.parse_errors += 1
+            return pilot_name
+
+        if CONTROL_KEY in data:
+            self._on_control(ws, data[CONTROL_KEY])
+            return pilot_name
+
+        name = str(data.get('pilot_name') or ANONYMOUS)
+        with self._lock:
+            self.packets += 1
+            self.bytes += len(message.encode('utf-8'))
+            sent_at = data.get('loadgen_sent_at')
+            if isinstance(sent_at, (int, float)):
+                self.latencies_ms.append((received - sent_at) * 1000)
+            new_pilot = name != ANONYMOUS and name not in self.connections
+            if new_pilot:
+                self.connections[name] = ws
+            if name in self.connections:
+                self.snapshots[name] = data
+            if self._record is not None and not new_pilot:
+                self._record.write(json.dumps({'t': received, 'pilot': name, 'data': data}) + '\n')
+
+        if new_pilot:
+            # O servidor real consulta VATSIM/IVAO antes de responder; aqui só o atraso é simulado
+            if self.check_delay_s:
+                time.sleep(self.check_delay_s)
+            command = "STOP_TX" if random.random() < self.offline_ratio else "START_TX"
+            ws.send(json.dumps({'command': command}))
+        return name
+
+    def _on_control(self, ws, action):
+        if action == 'reset':
+            self.reset_stats()
+            ws.send(json.dumps({CONTROL_KEY: 'reset'}))
+        elif action == 'stats':
+            ws.send(json.dumps({CONTROL_KEY: 'stats', **self.stats()}))
+
+    def log_stats(self, elapsed_s: float):
+        with self._lock:
+            packets = self.packets - self._window_packets
+            self._window_packets = self.packets
+        stats = self.stats()
+        fields = {'frames_per_s': round(packets / elapsed_s, 1), 'latency_p99_ms': stats['latency_p99_ms']}
+        log.info("Servidor de telemetria local: %d conexões.", stats['connections'], extra={'fields': fields})
+
+    def close(self):
+        with self._lock:
+            if self._record is not None:
+                self._record.close()
+                self._record = None
+
+
+def make_app(server: DevTelemetryServer):
+    """Aplicação WSGI: toda requisição vira um WebSocket tratado por `server.handle`."""
+    def app(environ, start_response):
+        try:
+            ws = simple_websocket.Server(environ)
+        except simple_websocket.ConnectionError:
+            start_response('400 Bad Request', [('Content-Type', 'text/plain')])
+            return [b'WebSocket esperado']
+        server.handle(ws)
+        try:
+            ws.close()
+        except simple_websocket.ConnectionClosed:
+            pass
+        return []
+    return app
+
+
+def serve(host: str, port: int, server: DevTelemetryServer):
+    """Sobe o servidor WSGI com threads em segundo plano. Retorna o servidor werkzeug (porta real em `.port`)."""
+    http_server = make_server(host, port, make_app(server), threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    return http_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de telemetria local (substituto do skymetrics_server para testes).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--check-delay-ms', type=float, default=0.0, help="Atraso simulado da checagem de rede antes do START_TX")
+    parser.add_argument('--offline-ratio', type=float, default=0.0, help="Fração de pilotos que recebe STOP_TX")
+    parser.add_argument('--record', help="Grava os quadros recebidos em JSON Lines (fonte 'replay' do telemetry_loadgen)")
+    args = parser.parse_args()
+
+    setup_logging(log_file='dev_telemetry_server.log')
+    logging.getLogger('werkzeug').setLevel(logging.WARNING) # Uma linha por conexão
+    server = DevTelemetryServer(args.check_delay_ms, args.offline_ratio, args.record)
+    http_server = serve(args.host, args.port, server)
+    log.info("Servidor de telemetria local em ws://%s:%d", args.host, http_server.port)
+
+    try:
+        last = time.monotonic()
+        while True:
+            time.sleep(STATS_INTERVAL_S)
+            now = time.monotonic()
+            server.log_stats(now - last)
+            last = now
+    except KeyboardInterrupt:
+        http_server.shutdown()
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+# Arquivo: client/dsp_benchmark.py
+#
+# Benchmark do radio_dsp: µs por chunk, bytes alocados por chunk e fator de tempo real de cada
+# caminho de DSP, por tamanho de chunk, taxa de amostragem e fator de degradação. Termina com
+# código 1 se algum caso estourar o orçamento de tempo real ou alocar mais que a baseline e, havendo
+# baseline desta máquina, se o tempo regredir além da margem de ruído do caso.
+#
+# A baseline é específica da máquina e não vai para o repositório: grave-a localmente com --save
+# (no commit de referência) antes de comparar uma otimização.
+#
+# Uso:  python dsp_benchmark.py                  (mede e compara com dsp_benchmark_baseline.json)
+#       python dsp_benchmark.py --save           (mede e grava a baseline desta máquina)
+#       python dsp_benchmark.py --chunks 512,2048 --rates 23000 --cases chain_tx,rx_volume
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+import radio_dsp
+
+# --- CONSTANTES DO BENCHMARK ---
+DEFAULT_CHUNKS = (256, 512, 1024, 2048, 4096)
+DEFAULT_RATES = (16000, 23000, 48000)
+DEFAULT_FACTORS = (0.25, 0.75)          # Casos com degradação (RX); os demais rodam com fator 0
+DEFAULT_THRESHOLD = 0.50                # Regressão de tempo: mais de 50% acima da mediana da baseline...
+MIN_DELTA_US = 15.0                     # ...e pelo menos isto em µs (jitter de agendamento/cache entre execuções)
+MIN_DELTA_RTF = 0.002                   # ...e pelo menos 0,2% da duração do chunk (casos grandes variam mais em µs)
+NOISE_SPREADS = 3.0                     # ...e acima de 3x a dispersão (IQR) somada das duas medições
+ALLOC_THRESHOLD = 0.25                  # Alocação é determinística: a margem só cobre objetos Python pequenos
+ALLOC_SLACK_BYTES = 256                 # Folga de alocação (objetos Python pequenos)
+REALTIME_BUDGET = 0.10                  # Um caminho de DSP pode usar no máximo 10% da duração do chunk
+TARGET_SAMPLE_S = 0.01                  # Duração aproximada de cada repetição cronometrada
+REPEATS = 15
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dsp_benchmark_baseline.json')
+
+
+def make_voice(chunk_size: int, sample_rate: int, seed: int = 7) -> bytes:
+    """Sinal de teste determinístico parecido com voz (fundamental + harmônicos + ruído), int16."""
+    t = np.arange(chunk_size) / sample_rate
+    rng = np.random.default_rng(seed)
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 8)) * 0.2
+    voice += rng.standard_normal(chunk_size) * 0.01
+    return (voice * radio_dsp.MAX_INT_16).astype(np.int16).tobytes()
+
+
+def build_case(name: str, chunk_size: int, sample_rate: int, factor: float) -> Callable[[], object]:
+    """Função sem argumentos que processa um chunk no caminho `name` (estado criado uma vez, como no cliente)."""
+    audio = make_voice(chunk_size, sample_rate)
+    if name == 'apply_radio_effect':
+        state = radio_dsp.RadioFilterState(sample_rate)
+        return lambda: radio_dsp.apply_radio_effect(audio, sample_rate, state)
+    if name == 'apply_degradation':
+        state = radio_dsp.RadioFilterState(sample_rate)
+        return lambda: radio_dsp.apply_degradation(audio, sample_rate, factor, state)
+    if name == 'add_static_noise_only':
+        return lambda: radio_dsp.add_static_noise_only(audio, sample_rate)
+    if name == 'generate_squelch_tail_burst':
+        burst = radio_dsp.generate_squelch_tail_burst.__wrapped__ # Sem o cache: custo real da geração
+        return lambda: burst(chunk_size, sample_rate)
+    if name == 'chain_tx':
+        chain = radio_dsp.RadioDSPChain(sample_rate, chunk_size)
+        return lambda: chain.process(audio, input_gain=1.2)
+    if name == 'chain_rx':
+        chain = radio_dsp.RadioDSPChain(sample_rate, chunk_size)
+        return lambda: chain.process(audio, factor, volume=0.8)
+    if name == 'rx_volume':
+        chain = radio_dsp.RadioDSPChain(sample_rate, chunk_size)
+        return lambda: chain.apply_volume(audio, 0.8)
+    raise ValueError(f"Caso desconhecido: {name}")
+
+
+# Caminhos medidos e se variam com o fator de degradação
+CASES = {
+    'apply_radio_effect': False,
+    'apply_degradation': True,
+    'add_static_noise_only': False,
+    'generate_squelch_tail_burst': False,
+    'chain_tx': False,
+    'chain_rx': True,
+    'rx_volume': False,
+}
+
+
+def case_key(name: str, sample_rate: int, chunk_size: int, factor: float) -> str:
+    return f"{name}@{sample_rate}/{chunk_size}/{factor:g}"
+
+
+def time_per_call_us(func: Callable[[], object]) -> Tuple[float, float]:
+    """
+    Mediana e dispersão (intervalo interquartil) da média por chamada entre REPEATS repetições de
+    ~TARGET_SAMPLE_S, em µs. A mediana não premia uma repetição excepcionalmente rápida como o mínimo.
+    """
+    for _ in range(3):
+        func()
+    start = time.perf_counter()
+    func()
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, int(TARGET_SAMPLE_S / single))
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    q1, median, q3 = np.percentile(samples, (25, 50, 75))
+    return float(median), float(q3 - q1)
+
+
+def allocated_bytes(func: Callable[[], object], calls: int = 3) -> int:
+    """Pico de memória alocada (Python + NumPy, via tracemalloc) em uma chamada, o menor de `calls`."""
+    func()
+    tracemalloc.start()
+    try:
+        best = None
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = func()
+            peak = tracemalloc.get_traced_memory()[1] - base
+            del result
+            best = peak if best is None else min(best, peak)
+        return best
+    finally:
+        tracemalloc.stop()
+
+
+def run(cases: List[str], chunks, rates, factors) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in cases:
+        for sample_rate in rates:
+            for chunk_size in chunks:
+                for factor in (factors if CASES[name] else (0.0,)):
+                    func = build_case(name, chunk_size, sample_rate, factor)
+                    us, spread = time_per_call_us(func)
+                    chunk_us = chunk_size / sample_rate * 1e6
+                    results[case_key(name, sample_rate, chunk_size, factor)] = {
+                        'us': round(us, 2),
+                        'spread_us': round(spread, 2),
+                        'chunk_us': round(chunk_us, 1),
+                        'alloc_bytes': allocated_bytes(func),
+                        'rtf': round(us / chunk_us, 5),
+                    }
+    return results
+
+
+def machine_info() -> Dict[str, str]:
+    return {'platform': platform.platform(), 'machine': platform.machine(), 'processor': platform.processor(),
+            'python': platform.python_version(), 'numpy': np.__version__}
+
+
+def noise_margin_us(current, base, threshold: float) -> float:
+    """Quanto o tempo do caso pode subir sem contar como regressão: o maior entre as margens relativa e absolutas."""
+    spread = current.get('spread_us', 0.0) + base.get('spread_us', 0.0)
+    return max(base['us'] * threshold, MIN_DELTA_US, current['chunk_us'] * MIN_DELTA_RTF, spread * NOISE_SPREADS)
+
+
+def compare(results, baseline, threshold: float) -> List[str]:
+    """Lista de regressões (tempo ou alocação) em relação à baseline e de estouros do orçamento de tempo real."""
+    problems = []
+    for key, current in results.items():
+        if current['rtf'] > REALTIME_BUDGET:
+            problems.append(f"{key}: {current['rtf']:.1%} do tempo real (orçamento {REALTIME_BUDGET:.0%})")
+        base = baseline.get(key)
+        if base is None:
+            continue
+        margin = noise_margin_us(current, base, threshold)
+        if current['us'] - base['us'] > margin:
+            problems.append(f"{key}: {current['us']:.1f} µs vs {base['us']:.1f} µs na baseline (margem {margin:.1f} µs)")
+        if current['alloc_bytes'] > base['alloc_bytes'] * (1 + ALLOC_THRESHOLD) + ALLOC_SLACK_BYTES:
+            problems.append(f"{key}: {current['alloc_bytes']} B alocados vs {base['alloc_bytes']} B na baseline")
+    return problems
+
+
+def format_table(results, baseline) -> str:
+    lines = [f"{'caso':<48} {'µs/chunk':>10} {'IQR':>7} {'vs base':>8} {'alloc B':>9} {'tempo real':>10}"]
+    for key, current in results.items():
+        base = baseline.get(key)
+        delta = f"{current['us'] / base['us'] - 1:+.0%}" if base and base['us'] else '-'
+        lines.append(f"{key:<48} {current['us']:>10.1f} {current['spread_us']:>7.1f} {delta:>8} {current['alloc_bytes']:>9} {current['rtf']:>10.2%}")
+    return '\n'.join(lines)
+
+
+def _int_list(value: str):
+    return tuple(int(v) for v in value.split(',') if v)
+
+
+def _float_list(value: str):
+    return tuple(float(v) for v in value.split(',') if v)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do radio_dsp com baseline e limiar de regressão.")
+    parser.add_argument('--chunks', type=_int_list, default=DEFAULT_CHUNKS)
+    parser.add_argument('--rates', type=_int_list, default=DEFAULT_RATES)
+    parser.add_argument('--factors', type=_float_list, default=DEFAULT_FACTORS)
+    parser.add_argument('--cases', default=','.join(CASES), help="Caminhos medidos: " + ', '.join(CASES))
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=None, help="Regressão relativa de tempo tolerada (padrão: a da baseline ou 0.5)")
+    parser.add_argument('--save', action='store_true', help="Grava os resultados como a nova baseline")
+    parser.add_argument('--json', help="Também grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    cases = [name for name in args.cases.split(',') if name]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"casos desconhecidos: {', '.join(unknown)}")
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    baseline = stored.get('results', {})
+    threshold = args.threshold if args.threshold is not None else stored.get('threshold', DEFAULT_THRESHOLD)
+
+    results = run(cases, args.chunks, args.rates, args.factors)
+    print(format_table(results, baseline))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_info(), 'results': results}, f, indent=1)
+
+    if args.save:
+        merged = dict(baseline)
+        merged.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_info(), 'threshold': threshold, 'results': merged}, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline gravada em {args.baseline} ({len(merged)} casos).")
+        return 0
+
+    if stored.get('machine') and stored['machine'] != machine_info():
+        print("\nAviso: a baseline foi gravada em outra máquina/ambiente; regrave com --save antes de comparar tempos.")
+    problems = compare(results, baseline, threshold)
+    if not baseline:
+        print("\nSem baseline desta máquina: só o orçamento de tempo real foi verificado (grave uma com --save).")
+    if problems:
+        print(f"\n{len(problems)} regressão(ões) (limiar {threshold:.0%}):")
+        for problem in problems:
+            print("  " + problem)
+        return 1
+    print("\nSem regressões.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,13 @@ from typing import Dict, Any, List
 from datetime import datetime
 from threading import Lock
 
+from touchdown_analyzer import TouchdownAnalyzer
+from log_utils import get_logger
+from http_client import get_http_client
+
+log = get_logger('event')
+upload_log = get_logger('upload')
+
 # --- CONSTANTES DE LÓGICA DE VOO ---
 GS_TAXI_START_KTS = 10         # ALTERADO: Usando Ground Speed para eventos em solo
 ALERT_RATE_LIMIT_SECONDS = 60 
@@ -49,6 +56,9 @@ class FlightEventLogger:
         self.last_vs = 0.0
         self.flight_ended = True 
         
+        # NOVO: Análise de toque a partir da janela pré-toque (VS, G, quiques, float e corrida)
+        self.touchdown = TouchdownAnalyzer()
+        
         # Flag para controlar se o início de voo/táxi já foi detectado para esta instância.
         self._flight_sequence_started = False
 
@@ -60,13 +70,13 @@ class FlightEventLogger:
 
         self._log_event("INICIO_SESSAO", f"Sessão de telemetria iniciada. DEP: {self.departure_id}, ARR: {self.arrival_id}. (Usando ID de Rede {self.log_user_id})", {})
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOGIC] Logger inicializado para {self.pilot_name}.")
+        log.info("Logger inicializado para %s.", self.pilot_name)
 
 
     def _log_event(self, event_name: str, description: str, snapshot: Dict[str, Any]):
         """Armazena o evento localmente no buffer."""
         with self.log_lock:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [EVENTO] {self.pilot_name}: {event_name} -> {description}")
+            log.info("%s: %s -> %s", self.pilot_name, event_name, description)
 
             lat_string = str(snapshot.get('lat', 0.0))
             lng_string = str(snapshot.get('lng', 0.0))
@@ -89,6 +99,10 @@ class FlightEventLogger:
                 vs_value = snapshot.get('landing_vs', 0.0) 
                 log_entry['landing_vs'] = int(vs_value)
                 log_entry['valor'] = int(vs_value) # <--- CORREÇÃO 2: Popula 'valor' com VS
+                # NOVO: Métricas do analisador de toque (quando disponíveis)
+                for key in ('touchdown_peak_g', 'touchdown_bounces', 'float_distance_m', 'rollout_distance_m'):
+                    if snapshot.get(key) is not None:
+                        log_entry[key] = snapshot[key]
                 
             elif event_name in ('COMBUSTIVEL_INICIAL', 'COMBUSTIVEL_FINAL'):
                 log_entry['total_fuel'] = int(safe_total_fuel) 
@@ -104,13 +118,18 @@ class FlightEventLogger:
             return True
         return False
 
-    def check_and_log_events(self, data: Dict[str, Any]):
-        """Executa a detecção e o registro de todos os eventos de voo."""
+    def check_and_log_events(self, data: Dict[str, Any], raw_data: Dict[str, Any] | None = None):
+        """Executa a detecção e o registro de todos os eventos de voo.
+        `raw_data` (sem arredondamento) alimenta a análise de toque: AGL em pés inteiros não serve para a razão de descida."""
         current_agl = data.get('agl', 0); current_gs = data.get('gs', 0) 
         current_vs = data.get('vs', 0); current_on_ground = data.get('on_ground', 0)
         current_bank = data.get('plane_bank_degrees', 0); eng_combustion = data.get('eng_combustion', 0)
         alerts = data.get('alerts', {})
 
+        sample = raw_data if raw_data is not None else data
+        self.touchdown.add_sample(time.monotonic(), sample.get('vs', 0), sample.get('g_force', 1.0), sample.get('agl', 0),
+                                  sample.get('gs', 0), current_on_ground)
+
         # A.1. REGISTRO DE MOTOR LIGADO E COMBUSTÍVEL INICIAL (MESMO PARADO)
         if not self.initial_fuel_logged and eng_combustion == 1 and current_on_ground == 1:
             self._log_event("MOTOR_LIGADO", "Motor detectado como ligado (Parado ou Taxiando).", data)
@@ -143,11 +162,16 @@ class FlightEventLogger:
 
         # C. POUSO
         if self.is_airborne and current_on_ground == 1 and current_agl < 100 and not self.has_landed:
-            if self.landing_vs is None: data['landing_vs'] = self.last_vs; self.landing_vs = self.last_vs
+            if self.landing_vs is None:
+                # NOVO: Prioriza o VS calculado na borda de contato pelo analisador
+                td_vs = self.touchdown.touchdown_vs if self.touchdown.touchdown_detected else None
+                self.landing_vs = td_vs if td_vs is not None else self.last_vs
+                data['landing_vs'] = self.landing_vs
             if current_gs < 10: 
                 self.has_landed = True; self.is_airborne = False
                 vs_no_toque = self.landing_vs if self.landing_vs is not None else current_vs
                 data['landing_vs'] = vs_no_toque 
+                data.update({k: v for k, v in self.touchdown.get_results().items() if k != 'touchdown_vs'})
                 self._log_event("VS_NO_TOQUE", f"Velocidade vertical no toque detectada: {vs_no_toque:.0f} fpm.", data)
                 self._log_event("POUSO_FINALIZADO", f"Pouso concluído. VS no toque final: {vs_no_toque:.0f} fpm", data)
 
@@ -169,6 +193,7 @@ class FlightEventLogger:
             self.is_airborne = False; self.has_landed = True; self.initial_fuel_logged = False
             self.landing_vs = None; self.last_alert_timestamps = {}
             self._flight_sequence_started = False 
+            self.touchdown.reset()
             
         # H. POUSO RESET (Touch-and-Go)
         if self.initial_fuel_logged and self.has_landed and current_on_ground == 1 and current_gs >= GS_TAXI_START_KTS: 
@@ -178,6 +203,7 @@ class FlightEventLogger:
 
             self.is_airborne = False; self.has_landed = False; self.initial_fuel_logged = False
             self.landing_vs = None; self.flight_ended = False
+            self.touchdown.reset()
             self._log_event("RESET_VOO", "Voando novamente ou táxi rápido após pouso. Reiniciando estado de voo.", data)
 
         self.last_vs = current_vs
@@ -188,7 +214,7 @@ class FlightEventLogger:
         with self.log_lock: log_copy = self.event_log[:]
         if not log_copy: return
 
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] Tentativa de envio de {len(log_copy)} eventos para o piloto {self.pilot_name}...")
+        upload_log.info("Tentativa de envio de %d eventos para o piloto %s...", len(log_copy), self.pilot_name)
 
         for attempt in range(1, MAX_RETRIES + 1):
             all_events_succeeded = True
@@ -196,37 +222,37 @@ class FlightEventLogger:
                 event_name = log_entry.get('evento', 'N/A')
                 try:
                     # Envia a requisição
-                    response = requests.post(SUBMIT_LOG_URL, data=log_entry, timeout=5)
+                    response = get_http_client().post(SUBMIT_LOG_URL, data=log_entry, timeout=5)
                     response_json = response.json()
                     
                     if response.status_code != 200 or response_json.get('status') in ['error', 'not_found']:
                         # Falha Lógica ou HTTP
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] Falha no evento {event_name}. Resposta: {response.status_code} / {response_json.get('message', 'Erro desconhecido')}")
+                        upload_log.warning("Falha no evento %s. Resposta: %s / %s", event_name, response.status_code, response_json.get('message', 'Erro desconhecido'))
                         all_events_succeeded = False; break 
                     else:
                         # Sucesso Individual
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] Evento {event_name} enviado com sucesso. Resposta: {response_json.get('message', 'OK')}")
+                        upload_log.debug("Evento %s enviado com sucesso. Resposta: %s", event_name, response_json.get('message', 'OK'))
 
                 except requests.exceptions.RequestException as e:
                     # Erro de Conexão/Timeout
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] ERRO DE CONEXÃO ao enviar evento {event_name}: {e}")
+                    upload_log.warning("ERRO DE CONEXÃO ao enviar evento %s: %s", event_name, e)
                     all_events_succeeded = False; break 
                 except json.JSONDecodeError:
                     # Erro de JSON (Resposta inválida)
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] ERRO DE JSON (Resposta inválida do PHP) ao enviar evento {event_name}.")
+                    upload_log.warning("ERRO DE JSON (Resposta inválida do PHP) ao enviar evento %s.", event_name)
                     all_events_succeeded = False; break
             
             if all_events_succeeded:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] Envio em lote concluído com SUCESSO na tentativa {attempt}.")
+                upload_log.info("Envio em lote concluído com SUCESSO na tentativa %d.", attempt)
                 with self.log_lock: self.event_log = []
                 return
             
             if attempt < MAX_RETRIES: 
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] Tentativa {attempt} falhou. Aguardando {RETRY_DELAY_MS / 1000}s antes da próxima retentativa...")
+                upload_log.warning("Tentativa %d falhou. Aguardando %ss antes da próxima retentativa...", attempt, RETRY_DELAY_MS / 1000)
                 time.sleep(RETRY_DELAY_MS / 1000)
             else:
                 # FALHA CRÍTICA
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG SUBMIT] FALHA CRÍTICA: O envio falhou após {MAX_RETRIES} tentativas. O log foi perdido.")
+                upload_log.error("FALHA CRÍTICA: O envio falhou após %d tentativas. O log foi perdido.", MAX_RETRIES)
 
     def handle_session_end(self, data: Dict[str, Any]):
         """Chamado no encerramento do cliente."""
@@ -0,0 +1,98 @@
+# Arquivo: client/frame_controller.py
+
+import statistics
+import threading
+import time
+from typing import Dict, Any, Iterable
+
+# --- CONSTANTES DO CONTROLE DE QUADRO ---
+FRAME_LADDER_MS = (20, 30, 40, 60, 90)  # Tamanhos de quadro permitidos (90 ms ~ o antigo CHUNK fixo de 2048 a 23 kHz)
+FRAME_START_MS = 40             # Quadro inicial (client_config.json: frame_start_ms)
+EVAL_WINDOW_S = 3.0             # Janela em que overflows, underruns e RTT são acumulados antes de decidir
+STABLE_WINDOWS = 5              # Janelas limpas seguidas (~15 s) para voltar a um quadro menor
+RTT_HIGH_MS = 250.0             # RTT mediano do emit acima disso: uplink/relay saturado, quadros maiores
+RTT_LOW_MS = 120.0              # RTT mediano abaixo disso (ou sem medição) conta como janela limpa
+RTT_SAMPLE_S = 1.0              # Intervalo entre chunks enviados com confirmação (ack) para medir o RTT
+
+
+class FrameSizeController:
+    """
+    Escolhe o tamanho de quadro do rádio (TX e captura) dentro de FRAME_LADDER_MS: começa pequeno
+    (baixa latência boca-ouvido) e sobe um degrau quando a janela de avaliação registra overflow
+    do microfone, underrun do dispositivo de saída ou RTT alto do Socket.IO; desce um degrau após
+    várias janelas limpas. Os contadores podem vir de qualquer thread (callbacks do PortAudio).
+    """
+    def __init__(self, start_ms: float = FRAME_START_MS, ladder: Iterable[float] = FRAME_LADDER_MS):
+        self.ladder = tuple(sorted(ladder)) or FRAME_LADDER_MS
+        self._index = next((i for i, ms in enumerate(self.ladder) if ms >= start_ms), len(self.ladder) - 1)
+        self._lock = threading.Lock()
+        self._overflows = 0
+        self._underruns = 0
+        self._rtts = []
+        self._window_start = time.monotonic()
+        self._clean_windows = 0
+        self._last_rtt_sample = 0.0
+        self.changes = 0
+        self.last_window: Dict[str, Any] = {}
+
+    @property
+    def frame_ms(self) -> float:
+        return self.ladder[self._index]
+
+    def frame_samples(self, rate: int) -> int:
+        """Quadro atual em amostras na taxa `rate`."""
+        return max(1, round(rate * self.frame_ms / 1000))
+
+    def record_overflow(self, count: int = 1):
+        with self._lock:
+            self._overflows += count
+
+    def record_underrun(self, count: int = 1):
+        with self._lock:
+            self._underruns += count
+
+    def record_rtt(self, rtt_ms: float):
+        with self._lock:
+            self._rtts.append(rtt_ms)
+
+    def rtt_due(self, now: float) -> bool:
+        """Se o próximo chunk deve ir com ack para medir o RTT (um por RTT_SAMPLE_S)."""
+        if now - self._last_rtt_sample < RTT_SAMPLE_S:
+            return False
+        self._last_rtt_sample = now
+        return True
+
+    def update(self, now: float | None = None) -> bool:
+        """Fecha a janela de avaliação, se vencida, e ajusta o quadro. Retorna True se o tamanho mudou."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._window_start < EVAL_WINDOW_S:
+                return False
+            rtt_ms = statistics.median(self._rtts) if self._rtts else None
+            stressed = self._overflows > 0 or self._underruns > 0 or (rtt_ms is not None and rtt_ms > RTT_HIGH_MS)
+            relaxed = not stressed and (rtt_ms is None or rtt_ms < RTT_LOW_MS)
+            self.last_window = {'overflows': self._overflows, 'underruns': self._underruns,
+                                'rtt_ms': round(rtt_ms) if rtt_ms is not None else None}
+            self._overflows = self._underruns = 0
+            self._rtts = []
+            self._window_start = now
+
+            previous = self._index
+            if stressed:
+                self._clean_windows = 0
+                self._index = min(self._index + 1, len(self.ladder) - 1)
+            elif relaxed:
+                self._clean_windows += 1
+                if self._clean_windows >= STABLE_WINDOWS:
+                    self._clean_windows = 0
+                    self._index = max(self._index - 1, 0)
+            else:
+                self._clean_windows = 0
+            changed = self._index != previous
+            if changed:
+                self.changes += 1
+            return changed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Quadro atual, número de mudanças e os contadores da última janela avaliada."""
+        return {'frame_ms': self.frame_ms, 'changes': self.changes, **self.last_window}
@@ -69,7 +69,7 @@ class LoginFormFrame(ttk.Frame):
         else: self._delete_credentials_func(email) 
             
         self.master.after(0, lambda: self.status_label.config(text=f"Piloto Validado! Nome: {display_name}", bootstyle="success"))
-        self.master.after(1000, lambda: self.on_success(email, password, display_name, pilot_data))
+        self.master.after(0, lambda: self.on_success(email, password, display_name, pilot_data))
 
 
 class MonitorFrame(ttk.Frame):
@@ -126,6 +126,7 @@ class MonitorFrame(ttk.Frame):
         
         # NOVO: Botão de Configuração do Rádio
         ttk.Button(self, text="Rádio Configurações", command=self._show_radio_config, bootstyle="info-outline").pack(pady=(5, 5))
+        ttk.Button(self, text="Repetir Última Transmissão", command=self._replay_radio, bootstyle="secondary-outline").pack(pady=(0, 5))
 
         ttk.Button(self, text="Logoff", command=master._handle_logoff, bootstyle="danger-outline").pack(pady=(5, 0))
 
@@ -133,6 +134,10 @@ class MonitorFrame(ttk.Frame):
         """Chama a função no MainApplication para abrir a janela de configuração do rádio."""
         self.master._show_radio_config_window() 
 
+    def _replay_radio(self):
+        """Repete a última transmissão recebida pelo rádio (gravador RX)."""
+        self.master._replay_last_radio_transmission()
+
     def _create_data_row(self, parent, label_text: str, var_key: str, row_num: int):
         row = ttk.Frame(parent, padding=2); row.pack(fill='x')
         ttk.Label(row, text=label_text, width=15).pack(side='left', padx=(0, 10))
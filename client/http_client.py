@@ -0,0 +1,124 @@
+# Arquivo: client/http_client.py
+
+import gzip
+import threading
+import time
+from typing import Dict, Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from log_utils import get_logger
+
+log = get_logger('http')
+
+# --- CONSTANTES DO CLIENTE HTTP ---
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRIES = 2             # Retentativas automáticas (apenas métodos idempotentes)
+DEFAULT_BACKOFF = 0.5           # Espera entre retentativas: backoff * 2^(n-1) segundos
+RETRY_STATUS_CODES = (502, 503, 504)
+POOL_CONNECTIONS = 8            # Número de hosts com pool mantido
+POOL_MAXSIZE = 4                # Conexões keep-alive por host
+GZIP_MIN_BYTES = 1024           # Corpos menores não compensam a compressão
+
+
+class HttpClient:
+    """
+    Cliente HTTP compartilhado pela sessão: pools keep-alive por host, política de
+    retentativa configurável, métricas de tempo/bytes por host e corpo gzip opcional.
+    """
+    def __init__(self, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF):
+        self.session = requests.Session()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.configure(retries, backoff)
+
+    def configure(self, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF):
+        """(Re)monta os adaptadores com a política de retentativa informada."""
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=backoff, status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}), raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _record(self, host: str, elapsed_ms: float, bytes_sent: int, bytes_received: int, error: bool):
+        with self._stats_lock:
+            st = self._stats.setdefault(host, {'requests': 0, 'errors': 0, 'bytes_sent': 0, 'bytes_received': 0, 'total_ms': 0.0, 'last_ms': 0.0})
+            st['requests'] += 1
+            st['errors'] += int(error)
+            st['bytes_sent'] += bytes_sent
+            st['bytes_received'] += bytes_received
+            st['total_ms'] += elapsed_ms
+            st['last_ms'] = elapsed_ms
+
+    def request(self, method: str, url: str, timeout: float = DEFAULT_TIMEOUT, gzip_body: bool = False,
+                verify: bool | str = True, headers: Dict[str, str] | None = None, **kwargs) -> requests.Response:
+        """Executa a requisição na sessão compartilhada. Exceções de `requests` são propagadas ao chamador."""
+        prepared = self.session.prepare_request(requests.Request(method, url, headers=headers, **kwargs))
+        body = prepared.body
+        if gzip_body and body and len(body) >= GZIP_MIN_BYTES:
+            prepared.body = gzip.compress(body.encode('utf-8') if isinstance(body, str) else body)
+            prepared.headers['Content-Encoding'] = 'gzip'
+            prepared.headers['Content-Length'] = str(len(prepared.body))
+        bytes_sent = len(prepared.body) if prepared.body else 0
+
+        host = urlsplit(url).netloc
+        settings = self.session.merge_environment_settings(prepared.url, {}, None, verify, None)
+        start = time.perf_counter()
+        try:
+            response = self.session.send(prepared, timeout=timeout, **settings)
+        except requests.exceptions.RequestException:
+            self._record(host, (time.perf_counter() - start) * 1000, bytes_sent, 0, True)
+            raise
+        # .content consome o corpo agora: o tempo medido inclui o download completo
+        bytes_received = len(response.content)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._record(host, elapsed_ms, bytes_sent, bytes_received, response.status_code >= 400)
+        log.debug("%s %s -> %s em %.0f ms (%d B enviados, %d B recebidos)", method, url, response.status_code, elapsed_ms, bytes_sent, bytes_received)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Cópia das métricas por host (requisições, erros, bytes e tempo médio)."""
+        with self._stats_lock:
+            stats = {host: dict(st) for host, st in self._stats.items()}
+        for st in stats.values():
+            st['avg_ms'] = st['total_ms'] / st['requests'] if st['requests'] else 0.0
+        return stats
+
+    def log_stats(self):
+        for host, st in self.get_stats().items():
+            log.info("Resumo HTTP %s: %d req, %d erros, %.1f KB enviados, %.1f KB recebidos, média %.0f ms",
+                     host, st['requests'], st['errors'], st['bytes_sent'] / 1024, st['bytes_received'] / 1024, st['avg_ms'])
+
+    def close(self):
+        self.session.close()
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Retorna o cliente HTTP único da sessão (criado sob demanda)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+def configure_http_client(retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF):
+    """Aplica a política de retentativa configurada (client_config.ini) ao cliente compartilhado."""
+    get_http_client().configure(retries, backoff)
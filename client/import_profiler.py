@@ -0,0 +1,111 @@
+# Arquivo: client/import_profiler.py
+
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from typing import List, Tuple
+
+# Ativação: argumento --import-report ou variável de ambiente SKYMETRICS_IMPORT_REPORT=1
+REPORT_FLAG = '--import-report'
+REPORT_ENV = 'SKYMETRICS_IMPORT_REPORT'
+REPORT_TOP_N = 25
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    Mede o custo de importação por módulo (no espírito de `python -X importtime`):
+    tempo próprio e cumulativo de cada exec_module, inclusive importações tardias feitas em outras threads.
+    """
+    def __init__(self):
+        self.records: List[Tuple[str, float, float, int]] = []  # (módulo, próprio_us, cumulativo_us, profundidade)
+        self._records_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[float]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._local.finding = False
+
+        loader = spec.loader if spec is not None else None
+        # Loaders compartilhados (classes como BuiltinImporter/FrozenImporter) não são instrumentados
+        if loader is None or isinstance(loader, type) or not hasattr(loader, 'exec_module'):
+            return spec
+        self._wrap_exec_module(loader, fullname)
+        return spec
+
+    def _wrap_exec_module(self, loader, fullname: str):
+        original = loader.exec_module
+
+        def timed_exec_module(module):
+            stack = self._stack()
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                original(module)
+            finally:
+                cumulative = (time.perf_counter() - start) * 1e6
+                children = stack.pop()
+                if stack:
+                    stack[-1] += cumulative
+                with self._records_lock:
+                    self.records.append((fullname, cumulative - children, cumulative, len(stack)))
+        try:
+            loader.exec_module = timed_exec_module  # Atributo de instância: preserva o tipo do loader
+        except AttributeError:
+            pass
+
+    def format_report(self, title: str) -> str:
+        """Relatório em ordem de conclusão (como -X importtime) seguido dos módulos mais caros."""
+        with self._records_lock:
+            records = list(self.records)
+        lines = [f"=== Relatório de importação: {title} ({len(records)} módulos) ===",
+                 "import time: self [us] | cumulative | imported package"]
+        for name, self_us, cum_us, depth in records:
+            lines.append(f"import time: {self_us:9.0f} | {cum_us:10.0f} | {'  ' * depth}{name}")
+        lines.append(f"--- Top {REPORT_TOP_N} por tempo cumulativo (apenas módulos de nível superior) ---")
+        top = sorted((r for r in records if r[3] == 0), key=lambda r: -r[2])[:REPORT_TOP_N]
+        for name, _, cum_us, _ in top:
+            lines.append(f"{cum_us / 1000:8.1f} ms  {name}")
+        return '\n'.join(lines)
+
+
+_profiler: ImportProfiler | None = None
+
+
+def is_requested() -> bool:
+    return REPORT_FLAG in sys.argv or bool(os.environ.get(REPORT_ENV))
+
+
+def install() -> ImportProfiler:
+    """Instala o medidor no início de sys.meta_path (deve ser chamado antes das demais importações)."""
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+    return _profiler
+
+
+def log_report(title: str):
+    """Registra o relatório no log 'app' (sem efeito se o modo de relatório não estiver ativo)."""
+    if _profiler is None:
+        return
+    from log_utils import get_logger
+    get_logger('app').info("%s", _profiler.format_report(title))
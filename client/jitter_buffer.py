@@ -0,0 +1,183 @@
+# Arquivo: client/jitter_buffer.py
+
+import threading
+import time
+from typing import Dict, Any
+
+import numpy as np
+
+import radio_dsp
+
+# --- CONSTANTES DO JITTER BUFFER ---
+JITTER_TARGET_MS = 120      # Profundidade inicial antes de começar a tocar (client_config.json: jitter_target_ms)
+JITTER_MIN_MS = 60          # Limite inferior da adaptação
+JITTER_MAX_MS = 400         # Acima disso o áudio chegou tarde demais: as amostras mais antigas são descartadas
+JITTER_STEP_MS = 20         # Ajuste da profundidade alvo a cada underrun / período estável
+JITTER_STABLE_S = 10.0      # Tempo sem underrun para reduzir a profundidade alvo
+TALK_GAP_MS = 500           # Sem pacotes por mais que isso: fim da transmissão (silêncio, não ruído de conforto)
+JITTER_FRAMES_MIN = 1.5     # Profundidade mínima em quadros do remetente (quadro sinalizado no chunk)
+
+
+class JitterBuffer:
+    """
+    Buffer entre a rede (Socket.IO) e o dispositivo de saída (callback do PyAudio).
+    FIFO circular de amostras int16 com pré-buffer até a profundidade alvo, que cresce a cada
+    underrun e encolhe após períodos estáveis. Lacunas dentro de uma transmissão são cobertas com
+    ruído de conforto; áudio que excede a profundidade máxima é descartado (latência limitada).
+    Marcadores de silêncio (VAD do transmissor) mantêm a transmissão aberta sem contar underrun.
+    """
+    def __init__(self, sample_rate: int, target_ms: float = JITTER_TARGET_MS, max_ms: float = JITTER_MAX_MS):
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._max_samples = self._ms_to_samples(max_ms)
+        self._ring = np.zeros(self._max_samples, dtype=np.int16)
+        self._initial_target = self._ms_to_samples(min(max(target_ms, JITTER_MIN_MS), max_ms))
+        self._step = self._ms_to_samples(JITTER_STEP_MS)
+        self._floor = self._ms_to_samples(JITTER_MIN_MS)
+        self.frame_ms = None
+        self._noise_bank = radio_dsp.get_noise_bank(sample_rate)
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._out = np.empty(0, dtype=np.int16)
+        self.comfort_level = radio_dsp.NOISE_LEVEL
+        self.comfort_gain = radio_dsp.OUTPUT_GAIN * radio_dsp.MAX_INT_16
+        self.reset()
+
+    def _ms_to_samples(self, ms: float) -> int:
+        return int(self.sample_rate * ms / 1000)
+
+    def reset(self):
+        """Esvazia o buffer e zera os contadores (novo stream de saída)."""
+        with self._lock:
+            self._read = 0
+            self._count = 0
+            self._playing = False
+            self._target = max(self._initial_target, self._floor)
+            self._last_push = None
+            self._silence = False
+            self._last_adjust = time.monotonic()
+            self.underruns = 0
+            self.overruns = 0
+            self.dropped_samples = 0
+            self.concealed_samples = 0
+            self.silence_samples = 0
+
+    def set_frame_ms(self, frame_ms: float):
+        """Quadro do remetente: a profundidade alvo nunca fica abaixo de JITTER_FRAMES_MIN quadros."""
+        if frame_ms == self.frame_ms:
+            return
+        with self._lock:
+            self.frame_ms = frame_ms
+            floor_ms = max(JITTER_MIN_MS, frame_ms * JITTER_FRAMES_MIN)
+            self._floor = min(self._ms_to_samples(floor_ms), self._max_samples // 2)
+            self._target = max(self._target, self._floor)
+
+    def set_comfort_noise(self, noise_level: float, volume: float = 1.0):
+        """Nível do ruído de conforto (mesma escala do DSP) acompanhando a degradação e o volume RX atuais."""
+        self.comfort_level = noise_level
+        self.comfort_gain = radio_dsp.OUTPUT_GAIN * radio_dsp.MAX_INT_16 * volume
+
+    def push(self, pcm):
+        """Enfileira um chunk int16 (bytes ou memoryview). Nunca bloqueia o thread de recepção."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n = samples.shape[0]
+        if n == 0:
+            return
+        with self._lock:
+            self._last_push = time.monotonic()
+            self._silence = False
+            if n > self._max_samples:
+                samples = samples[-self._max_samples:]
+                n = self._max_samples
+            excess = self._count + n - self._max_samples
+            if excess > 0:
+                # Pacote atrasado demais: descarta as amostras mais antigas para manter a latência limitada
+                self._read = (self._read + excess) % self._max_samples
+                self._count -= excess
+                self.overruns += 1
+                self.dropped_samples += excess
+            write = (self._read + self._count) % self._max_samples
+            first = min(n, self._max_samples - write)
+            self._ring[write:write + first] = samples[:first]
+            self._ring[:n - first] = samples[first:]
+            self._count += n
+
+    def mark_silence(self):
+        """O remetente segue transmitindo, mas em silêncio (VAD): esvaziar o buffer não é underrun."""
+        with self._lock:
+            self._last_push = time.monotonic()
+            self._silence = True
+
+    def pull(self, frame_count: int) -> bytes:
+        """Retira `frame_count` amostras para o dispositivo, completando com ruído de conforto/silêncio."""
+        if self._out.shape[0] < frame_count:
+            self._out = np.empty(frame_count, dtype=np.int16)
+        out = self._out[:frame_count]
+        self.pull_into(out)
+        return out.tobytes()
+
+    def pull_into(self, out):
+        """Como pull(), mas grava no array int16 `out` (usado pelo mixer de recepção)."""
+        frame_count = out.shape[0]
+        if self._scratch.shape[0] < frame_count:
+            self._scratch = np.empty(frame_count, dtype=np.float32)
+
+        with self._lock:
+            now = time.monotonic()
+            in_talk = self._last_push is not None and (now - self._last_push) * 1000 < TALK_GAP_MS
+            if not self._playing and (self._count >= self._target or (self._count and not in_talk)):
+                self._playing = True  # Pré-buffer atingido (ou fim da transmissão: toca o que sobrou)
+
+            n = min(self._count, frame_count) if self._playing else 0
+            if n:
+                first = min(n, self._max_samples - self._read)
+                out[:first] = self._ring[self._read:self._read + first]
+                out[first:n] = self._ring[:n - first]
+                self._read = (self._read + n) % self._max_samples
+                self._count -= n
+
+            if n < frame_count and self._playing:
+                self._playing = False
+                if in_talk and not self._silence:
+                    # Underrun no meio da transmissão: a rede atrasou, aumenta a profundidade alvo
+                    self.underruns += 1
+                    self._target = min(self._target + self._step, self._max_samples // 2)
+                    self._last_adjust = now
+            elif self._playing and now - self._last_adjust > JITTER_STABLE_S:
+                self._target = max(self._target - self._step, self._floor)
+                self._last_adjust = now
+
+        if n < frame_count:
+            self._conceal(out[n:], in_talk, self._silence)
+
+    def _conceal(self, out, in_talk: bool, silence: bool = False):
+        if not in_talk:
+            out.fill(0)
+            return
+        count = out.shape[0]
+        noise = self._noise_bank.read(count, self.comfort_level, out=self._scratch[:count])
+        np.clip(noise, -radio_dsp.CLIPPING_FACTOR, radio_dsp.CLIPPING_FACTOR, out=noise)
+        noise *= np.float32(self.comfort_gain)
+        np.copyto(out, noise, casting='unsafe')
+        if silence:
+            self.silence_samples += count
+        else:
+            self.concealed_samples += count
+
+    def is_idle(self, idle_s: float) -> bool:
+        """Vazio e sem pacotes há mais de `idle_s` segundos."""
+        with self._lock:
+            return self._count == 0 and (self._last_push is None or time.monotonic() - self._last_push > idle_s)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidade atual/alvo (ms) e contadores de underrun, overrun, ocultação e silêncio sintetizado."""
+        with self._lock:
+            to_ms = 1000 / self.sample_rate
+            return {
+                'depth_ms': round(self._count * to_ms),
+                'target_ms': round(self._target * to_ms),
+                'underruns': self.underruns,
+                'overruns': self.overruns,
+                'dropped_ms': round(self.dropped_samples * to_ms),
+                'concealed_ms': round(self.concealed_samples * to_ms),
+                'silence_ms': round(self.silence_samples * to_ms),
+            }
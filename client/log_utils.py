@@ -0,0 +1,97 @@
+# Arquivo: client/log_utils.py
+
+import logging
+import logging.handlers
+import queue
+import sys
+import atexit
+from typing import Dict, Any
+
+# --- CONSTANTES DE LOG ---
+LOG_FILE = 'skymetrics_client.log'
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+ROOT_LOGGER_NAME = 'skymetrics'
+LOG_FORMAT = '%(asctime)s %(levelname)-7s [%(name)s] %(message)s'
+LOG_DATE_FORMAT = '%H:%M:%S'
+
+# Níveis padrão por subsistema (sobrescritos pela seção [LOGGING] do client_config.ini)
+DEFAULT_LEVELS = {
+    'app': 'INFO',
+    'auth': 'INFO',
+    'update': 'INFO',
+    'http': 'INFO',
+    'monitor': 'INFO',
+    'simconnect': 'INFO',
+    'event': 'INFO',
+    'upload': 'INFO',
+    'radio': 'INFO',
+    'radio.rx': 'INFO',  # DEBUG registra cada chunk recebido (~11/s)
+}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formata o registro e acrescenta os campos estruturados (`extra={'fields': {...}}`) como chave=valor."""
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Retorna o logger do subsistema (ex.: 'radio.rx' -> 'skymetrics.radio.rx')."""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+def setup_logging(levels: Dict[str, Any] | None = None, log_file: str = LOG_FILE):
+    """
+    Configura o log assíncrono: as threads apenas enfileiram registros (QueueHandler) e
+    um QueueListener em segundo plano grava no arquivo rotativo (e no console fora do executável).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers: list[logging.Handler] = []
+    formatter = StructuredFormatter(LOG_FORMAT, LOG_DATE_FORMAT)
+    try:
+        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except OSError:
+        pass  # Sem permissão de escrita: mantém apenas o console
+
+    if not getattr(sys, 'frozen', False) and sys.stderr:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    root.propagate = False
+
+    merged_levels = {**DEFAULT_LEVELS, **(levels or {})}
+    for subsystem, level in merged_levels.items():
+        try:
+            get_logger(subsystem).setLevel(str(level).upper())
+        except ValueError:
+            pass  # Nível inválido na configuração: mantém o herdado
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Esvazia a fila e encerra a thread de gravação."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
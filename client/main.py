@@ -1,14 +1,28 @@
 # Arquivo: client/main.py (Ponto de Entrada Principal)
 
+import os 
+import sys
+
+# NOVO: Relatório de custo de importação por módulo (no espírito de -X importtime).
+# Ativado com --import-report ou SKYMETRICS_IMPORT_REPORT=1; precisa ser instalado antes das demais importações.
+if '--import-report' in sys.argv or os.environ.get('SKYMETRICS_IMPORT_REPORT'):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import import_profiler
+    import_profiler.install()
+
+# NOVO: O mesmo executável também roda o motor de áudio do rádio em processo separado (audio_engine);
+# nesse modo nada da interface é carregado.
+if '--audio-engine' in sys.argv:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import audio_engine
+    sys.exit(audio_engine.engine_main(sys.argv))
+
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import configparser
-import os 
-import sys
 import threading
 from typing import Dict, Any
 from subprocess import Popen 
-import time
 from tkinter import messagebox 
 
 
@@ -35,13 +49,25 @@ if not getattr(sys, 'frozen', False):
 # --------------------------------------------------------------------------------
 
 
+# NOVO: Log assíncrono configurado ANTES dos módulos internos (alguns registram logs já na importação).
+# Níveis por subsistema na seção opcional [LOGGING] do client_config.ini (ex.: radio.rx = DEBUG).
+from log_utils import setup_logging, get_logger
+_log_config = configparser.ConfigParser()
+_log_config.read('client_config.ini')
+setup_logging(dict(_log_config['LOGGING']) if _log_config.has_section('LOGGING') else None)
+log = get_logger('app')
+
 # IMPORTAÇÕES DIRETAS (A sintaxe para módulos internos permanece a mesma para PyInstaller)
-from sim_data import CONN_STATUS, sm
-from auth_utils import load_credentials, save_credentials, delete_credentials, check_login, get_validated_pilot_data
+import sim_data
+from sim_data import check_and_connect_simconnect
+from auth_utils import load_credentials, save_credentials, delete_credentials, check_login, get_validated_pilot_data, prefetch_validated_pilots
 from update_logic import check_for_update_sync, DECISION_PROCEED_TO_LOGIN, DECISION_INITIATE_UPDATE
 from ws_monitor import FlightMonitor
 from gui import LoginFormFrame, MonitorFrame
 from radio_ui_logic import RadioConfigWindow, RadioClient 
+from http_client import configure_http_client, get_http_client, DEFAULT_RETRIES, DEFAULT_BACKOFF
+from startup import StartupOrchestrator
+import import_profiler
 
 
 # =================================================================
@@ -63,6 +89,11 @@ VA_KEY = config.get(CLIENT_CONFIG_SECTION, 'va_key', fallback='KAFLY')
 WEBSOCKET_URL = config.get(CLIENT_CONFIG_SECTION, 'websocket_url', fallback='ws://www.kafly.com.br:8765')
 HEARTBEAT_INTERVAL = config.getint(CLIENT_CONFIG_SECTION, 'heartbeat_interval', fallback=5)
 UPDATE_CHECK_URL = config.get(CLIENT_CONFIG_SECTION, 'update_check_url', fallback="https://kafly.com.br/skymetrics/update/current_version.txt")
+HTTP_RETRIES = config.getint(CLIENT_CONFIG_SECTION, 'http_retries', fallback=DEFAULT_RETRIES)
+HTTP_BACKOFF = config.getfloat(CLIENT_CONFIG_SECTION, 'http_backoff', fallback=DEFAULT_BACKOFF)
+
+# NOVO: Cliente HTTP único (keep-alive) compartilhado por login, atualização, plano de voo e logs
+configure_http_client(HTTP_RETRIES, HTTP_BACKOFF)
 
 
 # --- FUNÇÕES AUXILIARES ---
@@ -78,15 +109,22 @@ def _get_resource_path(relative_path: str) -> str:
 
 ICON_PATH = _get_resource_path('icons/skymetrics.ico')
 
-# Tenta importar pystray (para a System Tray)
-try:
-    from PIL import Image
-    import pystray 
-    PYSTRAY_AVAILABLE = True
-except ImportError:
-    PYSTRAY_AVAILABLE = False
-except Exception:
-    PYSTRAY_AVAILABLE = False
+# Tenta importar pystray (para a System Tray) - importação TARDIA, apenas ao minimizar para a bandeja
+pystray = None
+PYSTRAY_AVAILABLE: bool | None = None  # None = ainda não verificado
+
+def _load_tray_stack() -> bool:
+    """Importa PIL e pystray no primeiro uso da bandeja."""
+    global pystray, PYSTRAY_AVAILABLE
+    if PYSTRAY_AVAILABLE is None:
+        try:
+            from PIL import Image
+            import pystray as pystray_module
+            pystray = pystray_module
+            PYSTRAY_AVAILABLE = True
+        except Exception:
+            PYSTRAY_AVAILABLE = False
+    return PYSTRAY_AVAILABLE
 
 
 class MainApplication(ttk.Window):
@@ -104,10 +142,12 @@ class MainApplication(ttk.Window):
         self.current_pilot_email: str | None = None 
         self.protocol("WM_DELETE_WINDOW", self._on_app_closing)
         
-        self.tray_icon: pystray.Icon | None = None
+        self.tray_icon: 'pystray.Icon | None' = None
         self.minimized_to_tray = False
         
         self.radio_config_window: RadioConfigWindow | None = None
+        self._startup: StartupOrchestrator | None = None
+        self._import_report_logged = False
         
         self._center_window()
         threading.Thread(target=self._initial_flow_thread, daemon=True).start()
@@ -123,17 +163,49 @@ class MainApplication(ttk.Window):
     def _initial_flow_thread(self):
         # Delegate calls to auth_utils in the main app object
         self._set_delegated_auth_funcs() 
-        decision, latest_version = check_for_update_sync(self, CURRENT_VERSION, UPDATE_CHECK_URL)
-        self.after(0, self._handle_update_decision, decision, latest_version)
+
+        # NOVO: Etapas independentes em paralelo. O login automático depende apenas das credenciais;
+        # a decisão de atualização só é necessária para liberar a interface.
+        startup = self._startup = StartupOrchestrator()
+        startup.submit('update_check', check_for_update_sync, self, CURRENT_VERSION, UPDATE_CHECK_URL)
+        startup.submit('credentials', self._auth_funcs['load'])
+        startup.submit('pilot_prefetch', prefetch_validated_pilots, CONFIG_FILE)
+        startup.submit('simconnect_probe', check_and_connect_simconnect)
+        startup.submit('auto_login', self._speculative_login, startup, depends_on=('credentials',))
+
+        decision, latest_version = startup.result('update_check', default=(DECISION_PROCEED_TO_LOGIN, None))
+        # As credenciais são resolvidas aqui, fora da thread do Tk (que não deve esperar pelo keyring)
+        credentials = startup.result('credentials', default=("", "", False)) if decision == DECISION_PROCEED_TO_LOGIN else None
+        self.after(0, self._handle_update_decision, decision, latest_version, credentials)
+        startup.log_report()
+
+    def _speculative_login(self, startup: StartupOrchestrator) -> tuple | None:
+        """Valida as credenciais salvas enquanto a verificação de atualização ainda está em andamento."""
+        # Recebe o orquestrador como argumento: self._startup é zerado por _check_login na thread do Tk
+        email, password, remember_me = startup.result('credentials', default=("", "", False))
+        if not (email and password and remember_me):
+            return None
+        return email, password, check_login(email, password, CONFIG_FILE)
+
+    def _check_login(self, email: str, password: str) -> bool:
+        """Usa o resultado do login antecipado (uma única vez) quando as credenciais coincidem."""
+        startup = self._startup
+        if startup is not None:
+            self._startup = None
+            pre = startup.result('auto_login')
+            if pre and pre[0] == email and pre[1] == password:
+                return pre[2]
+        return check_login(email, password, CONFIG_FILE)
         
-    def _handle_update_decision(self, decision: int, latest_version: str | None):
+    def _handle_update_decision(self, decision: int, latest_version: str | None, credentials: tuple | None = None):
         self.title(f"Monitor de Voo - Login {VA_KEY}")
 
         if decision == DECISION_INITIATE_UPDATE and latest_version:
             self._initiate_update_final_step(latest_version)
         
         elif decision == DECISION_PROCEED_TO_LOGIN:
-            email, password, remember_me = self._auth_funcs['load']()
+            # As credenciais já foram lidas do keyring em paralelo com a verificação de atualização
+            email, password, remember_me = credentials if credentials is not None else self._auth_funcs['load']()
             self.after(60 * 60 * 1000, self.start_periodic_update_check)
             if email and password and remember_me: self._attempt_auto_login(email, password)
             else: self._show_login_form()
@@ -149,7 +221,7 @@ class MainApplication(ttk.Window):
         """Define e armazena as funções delegadas de auth para o formulário."""
         self._auth_funcs = {
             'load': lambda: load_credentials(CONFIG_FILE),
-            'check': lambda e, p: check_login(e, p, CONFIG_FILE),
+            'check': self._check_login,
             'get_pilot': lambda e: get_validated_pilot_data(e, CONFIG_FILE),
             'save': lambda e, p: save_credentials(e, p, CONFIG_FILE),
             'delete': lambda e, c=True: delete_credentials(e, c, CONFIG_FILE),
@@ -160,9 +232,10 @@ class MainApplication(ttk.Window):
         """
         Abre a janela de configuração do rádio. 
         Se o cliente de rádio não foi inicializado (modo SIMULADO ou falha), 
-        cria um RadioClient temporário para a janela de configurações.
+        cria um RadioClient temporário para a janela de configurações (com o motor de áudio em
+        processo separado, um motor temporário: o PortAudio nunca é aberto no processo da UI).
         """
-        print("[DIAG] Tentativa de abrir RadioConfigWindow...") 
+        log.debug("Tentativa de abrir RadioConfigWindow...")
         
         if self.radio_config_window and self.radio_config_window.winfo_exists():
             self.radio_config_window.lift()
@@ -170,18 +243,24 @@ class MainApplication(ttk.Window):
             
         target_radio_client = None
         
-        # 1. Tenta usar o cliente já inicializado pelo monitor (se REAL e bem-sucedido)
+        # 1. Tenta usar o cliente já inicializado pelo monitor (se REAL e bem-sucedido); com o motor de áudio
+        # em processo separado é o proxy dele (catálogo de dispositivos do motor, ajustes enviados pelo canal de controle)
         if self.monitor and self.monitor.radio_client:
             target_radio_client = self.monitor.radio_client
-            print(f"[DIAG] Usando RadioClient ativo do Monitor.")
+            log.debug("Usando RadioClient ativo do Monitor.")
         
         # 2. Se não houver cliente ativo (SIMULADO ou falha inicial)
         elif self.monitor:
-            print("[DIAG] Tentando criar RadioClient temporário para configuração.")
+            log.debug("Tentando criar RadioClient temporário para configuração.")
             try:
                 # Importa a classe DENTRO do método para evitar falha no __init__ do MainApplication
-                from radio_ui_logic import RadioClient 
-                target_radio_client = RadioClient()
+                from radio_ui_logic import RadioClient, load_config as load_radio_config
+                if load_radio_config().get('audio_engine_process', False):
+                    from audio_engine import AudioEngineClient
+                    target_radio_client = AudioEngineClient(master_app=self)
+                    target_radio_client.refresh_audio_devices() # Espera o catálogo de dispositivos do motor
+                else:
+                    target_radio_client = RadioClient()
             except Exception as e:
                 # Falha ao instanciar o RadioClient devido a dependências ausentes (o caso original do usuário)
                 messagebox.showerror("Erro ao Abrir Configurações do Rádio", 
@@ -191,6 +270,10 @@ class MainApplication(ttk.Window):
         if target_radio_client:
             try:
                 self.radio_config_window = RadioConfigWindow(self, target_radio_client)
+                if getattr(target_radio_client, 'remote', False) and target_radio_client is not self.monitor.radio_client:
+                    # Motor temporário: encerrado junto com a janela (não fica um processo de áudio órfão)
+                    window = self.radio_config_window
+                    window.bind('<Destroy>', lambda e: target_radio_client.disconnect() if e.widget is window else None, add='+')
             except Exception as e:
                 # Este bloco captura erros que ocorrem durante o setup da janela TK (ex: falha de áudio GUI)
                 messagebox.showerror("Erro ao Abrir Configurações do Rádio", 
@@ -202,8 +285,14 @@ class MainApplication(ttk.Window):
         else:
              # Este caso é um fallback, mas não deve ocorrer se o monitor estiver ativo
              messagebox.showerror("Erro de Inicialização do Rádio", "O cliente de rádio não foi inicializado corretamente. Verifique se as dependências (PyAudio, SocketIO) foram instaladas.")
-             print("[DIAG] Falha na inicialização: self.monitor.radio_client é None.")
+             log.error("Falha na inicialização: self.monitor.radio_client é None.")
             
+    def _replay_last_radio_transmission(self):
+        """Repete a última transmissão recebida, se o rádio do monitor estiver ativo."""
+        radio_client = self.monitor.radio_client if self.monitor else None
+        if radio_client is None or not radio_client.replay_last_transmission():
+            log.info("Repetição indisponível: rádio inativo ou nenhuma transmissão gravada.")
+
     def _on_radio_config_closing(self):
         """Callback de fechamento da janela de rádio para atualizar o estado do cliente."""
         # A janela de rádio é responsável por salvar a config no client_config.json
@@ -211,20 +300,20 @@ class MainApplication(ttk.Window):
             self.monitor.radio_client.update_audio_streams() # Re-inicia os streams com novos dispositivos, se necessário
 
     # --- LÓGICA DA BANDEJA ---
-    def _show_window_from_tray(self, icon: pystray.Icon, item: pystray.MenuItem):
+    def _show_window_from_tray(self, icon: 'pystray.Icon', item: 'pystray.MenuItem'):
         if self.tray_icon: icon.stop(); self.tray_icon = None
         self.after(0, self.deiconify); self.minimized_to_tray = False
 
-    def _on_logoff_from_tray(self, icon: pystray.Icon, item: pystray.MenuItem):
+    def _on_logoff_from_tray(self, icon: 'pystray.Icon', item: 'pystray.MenuItem'):
         if self.tray_icon: icon.stop(); self.tray_icon = None
         self.minimized_to_tray = False; self.after(0, self._handle_logoff)
 
-    def _on_quit_from_tray(self, icon: pystray.Icon, item: pystray.MenuItem):
+    def _on_quit_from_tray(self, icon: 'pystray.Icon', item: 'pystray.MenuItem'):
         if self.tray_icon: icon.stop(); self.tray_icon = None
         self.minimized_to_tray = False; self.after(0, self._on_app_closing)
 
     def _start_tray_icon(self):
-        if not PYSTRAY_AVAILABLE or self.tray_icon: return
+        if self.tray_icon or not _load_tray_stack(): return
         self.withdraw(); self.minimized_to_tray = True
         menu = (
             pystray.MenuItem('Mostrar Monitor', self._show_window_from_tray, default=True),
@@ -242,10 +331,7 @@ class MainApplication(ttk.Window):
     # --- LÓGICA DE GERENCIAMENTO DE ESTADO ---
     def stop_monitor_and_simconnect(self):
         if self.monitor: self.monitor.stop()
-        global sm
-        if CONN_STATUS == "REAL" and sm: 
-            try: sm.exit(); sm = None
-            except Exception: pass
+        sim_data.disconnect_simconnect()
 
     def start_periodic_update_check(self):
         if not self.winfo_exists() or self._update_in_progress: return
@@ -255,7 +341,6 @@ class MainApplication(ttk.Window):
 
     def _attempt_auto_login(self, email: str, password: str):
         self._show_login_form()
-        time.sleep(0.1) 
         self.login_frame.status_label.config(text="Tentando Login Automático...", bootstyle="info")
         threading.Thread(target=self.login_frame._process_login, args=(email, password, True), daemon=True).start()
 
@@ -271,6 +356,8 @@ class MainApplication(ttk.Window):
              
         self.stop_monitor_and_simconnect()
         # A linha de exclusão de credenciais (delete_credentials) DEVE ESTAR AUSENTE AQUI.
+        get_http_client().log_stats()
+        import_profiler.log_report("Encerramento")
         self.destroy()
 
     def _show_login_form(self):
@@ -283,6 +370,9 @@ class MainApplication(ttk.Window):
             delete_credentials_func=self._auth_funcs['delete']
         )
         self.login_frame.pack(fill=BOTH, expand=YES); self.current_frame = self.login_frame
+        if not self._import_report_logged:
+            self._import_report_logged = True
+            import_profiler.log_report("Janela de login exibida")
         if self.minimized_to_tray: self.deiconify(); self.minimized_to_tray = False
 
     def _on_login_success(self, email: str, password: str, display_name: str, pilot_data: Dict[str, Any]):
@@ -292,7 +382,7 @@ class MainApplication(ttk.Window):
         self.title(f"Monitor de Voo {VA_KEY} - Piloto: {display_name}")
         self.monitor = FlightMonitor(email, display_name, pilot_data, self, WEBSOCKET_URL, HEARTBEAT_INTERVAL)
         self.monitor.start_monitor()
-        monitor_frame = MonitorFrame(self, display_name, CONN_STATUS)
+        monitor_frame = MonitorFrame(self, display_name, sim_data.CONN_STATUS)
         monitor_frame.pack(fill=BOTH, expand=YES); self.current_frame = monitor_frame
         self.after(500, self._start_tray_icon)
 
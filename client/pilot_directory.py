@@ -0,0 +1,119 @@
+# Arquivo: client/pilot_directory.py
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List
+
+import requests
+
+from http_client import get_http_client
+from log_utils import get_logger
+
+log = get_logger('auth')
+
+# --- CONSTANTES DO DIRETÓRIO DE PILOTOS ---
+CACHE_FILE = 'validated_pilots_cache.json'
+MIN_REVALIDATE_INTERVAL_S = 60.0    # Login e auto-login em sequência reutilizam a mesma validação
+REQUEST_TIMEOUT = 10
+
+
+class PilotDirectory:
+    """
+    Cópia local da lista de pilotos validados da VA: snapshot em disco revalidado
+    por ETag/Last-Modified e índice e-mail -> registro reconstruído apenas quando a lista muda.
+    """
+    def __init__(self, url: str, cache_path: str):
+        self.url = url
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._last_validated: float | None = None
+        self._snapshot_loaded = False
+
+    @staticmethod
+    def _build_index(pilots: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Índice por e-mail em minúsculas (o primeiro registro vence, como na busca linear original)."""
+        index: Dict[str, Dict[str, Any]] = {}
+        for pilot in pilots:
+            email = pilot.get('_email_contato') or ''
+            if email:
+                index.setdefault(email.lower(), pilot)
+        return index
+
+    def _load_snapshot(self):
+        """Carrega o snapshot salvo (uma vez por processo)."""
+        self._snapshot_loaded = True
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self._index = self._build_index(snapshot.get('pilots', []))
+            self._etag = snapshot.get('etag')
+            self._last_modified = snapshot.get('last_modified')
+        except (OSError, ValueError):
+            pass
+
+    def _save_snapshot(self, pilots: List[Dict[str, Any]]):
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)."""
+        tmp_path = self.cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'etag': self._etag, 'last_modified': self._last_modified, 'pilots': pilots}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            log.warning("Falha ao salvar cache de pilotos: %s", e)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Revalida a lista no servidor (304 mantém o índice atual). Retorna True se há índice utilizável."""
+        with self._lock:
+            if not self._snapshot_loaded:
+                self._load_snapshot()
+            if not force and self._index and self._last_validated is not None and (time.monotonic() - self._last_validated) < MIN_REVALIDATE_INTERVAL_S:
+                return True
+
+            headers = {}
+            if self._index:
+                if self._etag: headers['If-None-Match'] = self._etag
+                if self._last_modified: headers['If-Modified-Since'] = self._last_modified
+            try:
+                response = get_http_client().get(self.url, headers=headers, timeout=REQUEST_TIMEOUT)
+                if response.status_code == 304:
+                    self._last_validated = time.monotonic()
+                    log.debug("Lista de pilotos validados inalterada (304).")
+                    return True
+                response.raise_for_status()
+                pilots = response.json()
+                if not isinstance(pilots, list):
+                    raise ValueError("Resposta inesperada do endpoint de pilotos")
+                self._index = self._build_index(pilots)
+                self._etag = response.headers.get('ETag')
+                self._last_modified = response.headers.get('Last-Modified')
+                self._last_validated = time.monotonic()
+                self._save_snapshot(pilots)
+                log.info("Lista de pilotos validados atualizada: %d registros.", len(self._index))
+                return True
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # Mantém o último snapshot (se houver) quando o servidor não responde
+                log.warning("Falha ao atualizar lista de pilotos validados: %s", e)
+                return bool(self._index)
+
+    def lookup(self, email: str) -> Dict[str, Any] | None:
+        """Busca O(1) do piloto pelo e-mail, revalidando a lista quando necessário."""
+        if not self.refresh():
+            return None
+        return self._index.get(email.lower())
+
+
+_directories: Dict[str, PilotDirectory] = {}
+_directories_lock = threading.Lock()
+
+
+def get_pilot_directory(url: str, cache_path: str) -> PilotDirectory:
+    """Retorna o diretório compartilhado para a URL informada."""
+    with _directories_lock:
+        if url not in _directories:
+            _directories[url] = PilotDirectory(url, cache_path)
+        return _directories[url]
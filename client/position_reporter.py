@@ -0,0 +1,84 @@
+# Arquivo: client/position_reporter.py
+
+import math
+import time
+from typing import Dict, Any
+
+# --- CONSTANTES DO REPORTE DE POSIÇÃO (DEAD RECKONING) ---
+EARTH_RADIUS_KM = 6371
+KT_TO_KMS = 1.852 / 3600        # Nós -> km/s
+DR_ERROR_MIN_KM = 0.1           # Erro tolerado perto do solo (aproximação, táxi): atualizações densas
+DR_ERROR_MAX_KM = 1.0           # Erro tolerado em cruzeiro: atualizações esparsas
+DR_ERROR_FULL_AGL_FT = 10000    # Altura (AGL) a partir da qual vale o erro máximo (interpolação linear abaixo)
+TRACK_CHANGE_DEG = 10.0         # Mudança de rumo que força atualização (início de curva)
+GS_CHANGE_KT = 20.0             # Mudança de velocidade que força atualização
+STATIONARY_GS_KT = 1.0          # Abaixo disso a aeronave é considerada parada (sem extrapolação)
+MIN_INTERVAL_S = 1.0            # Intervalo mínimo entre atualizações
+MAX_INTERVAL_S = 30.0           # Atualização de manutenção mesmo sem movimento (relay reiniciado, reconexão)
+EXTRAPOLATION_MAX_S = 60.0      # O relay não extrapola além disso (cliente parou de reportar)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlmb = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def extrapolate(lat: float, lng: float, gs_kt: float, track_deg: float, elapsed_s: float):
+    """Posição após `elapsed_s` segundos em rumo e velocidade constantes (mesma conta do relay)."""
+    if gs_kt < STATIONARY_GS_KT or elapsed_s <= 0:
+        return lat, lng
+    delta = gs_kt * KT_TO_KMS * min(elapsed_s, EXTRAPOLATION_MAX_S) / EARTH_RADIUS_KM
+    phi1, lmb1, theta = math.radians(lat), math.radians(lng), math.radians(track_deg)
+    phi2 = math.asin(math.sin(phi1) * math.cos(delta) + math.cos(phi1) * math.sin(delta) * math.cos(theta))
+    lmb2 = lmb1 + math.atan2(math.sin(theta) * math.sin(delta) * math.cos(phi1),
+                             math.cos(delta) - math.sin(phi1) * math.sin(phi2))
+    return math.degrees(phi2), (math.degrees(lmb2) + 540) % 360 - 180
+
+
+def error_threshold_km(agl_ft: float) -> float:
+    """Erro de posição tolerado: pequeno perto do solo, grande em cruzeiro."""
+    fraction = min(max(agl_ft, 0.0) / DR_ERROR_FULL_AGL_FT, 1.0)
+    return DR_ERROR_MIN_KM + (DR_ERROR_MAX_KM - DR_ERROR_MIN_KM) * fraction
+
+
+class PositionReporter:
+    """
+    Decide quando enviar a posição ao relay do rádio. O relay extrapola a última posição recebida
+    com a velocidade (gs) e o rumo (track) enviados; este lado roda a mesma extrapolação e só envia
+    quando a posição real se afasta da prevista além do erro tolerado, ou quando rumo/velocidade
+    mudam. Em cruzeiro reto quase nada é enviado; parado, só a atualização de manutenção.
+    """
+    def __init__(self):
+        self._last: Dict[str, Any] | None = None    # lat, lng, gs, track e instante do último envio
+        self.sent = 0
+        self.skipped = 0
+
+    def reset(self):
+        """Força o envio na próxima chamada (reconexão ao relay)."""
+        self._last = None
+
+    def should_send(self, lat: float, lng: float, gs_kt: float, track_deg: float, agl_ft: float = 0.0,
+                    now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        last = self._last
+        if last is not None:
+            elapsed = now - last['time']
+            if elapsed < MIN_INTERVAL_S:
+                return False
+            if elapsed < MAX_INTERVAL_S and not self._diverged(last, lat, lng, gs_kt, track_deg, agl_ft, elapsed):
+                self.skipped += 1
+                return False
+        self._last = {'lat': lat, 'lng': lng, 'gs': gs_kt, 'track': track_deg, 'time': now}
+        self.sent += 1
+        return True
+
+    @staticmethod
+    def _diverged(last, lat, lng, gs_kt, track_deg, agl_ft, elapsed) -> bool:
+        if abs(gs_kt - last['gs']) >= GS_CHANGE_KT:
+            return True
+        if gs_kt >= STATIONARY_GS_KT and abs((track_deg - last['track'] + 180) % 360 - 180) >= TRACK_CHANGE_DEG:
+            return True
+        predicted = extrapolate(last['lat'], last['lng'], last['gs'], last['track'], elapsed)
+        return haversine_km(lat, lng, *predicted) >= error_threshold_km(agl_ft)
@@ -1,8 +1,16 @@
 # Arquivo: client/radio_dsp.py
 
+import functools
+import math
+
 import numpy as np
 from scipy import signal
-import pyaudio 
+
+try:
+    # Núcleo Cython do sosfilt: filtra no próprio buffer (a API pública sempre copia a entrada)
+    from scipy.signal._sosfilt import _sosfilt as _sosfilt_inplace
+except ImportError:
+    _sosfilt_inplace = None
 
 # --- Constantes do Rádio de Aviação ---
 # Frequências típicas de voz de rádio: 300 Hz a 3000 Hz (banda estreita)
@@ -21,31 +29,316 @@ OUTPUT_GAIN = 8.0
 
 # Máximo valor de 16-bit para normalização
 MAX_INT_16 = np.iinfo(np.int16).max
+INT16_MIN = np.iinfo(np.int16).min
 
 # Constantes para o limite de degradação
 MAX_DEGRADATION_NOISE_LEVEL = 0.5  # Nível máximo de ruído para degradação total
 MIN_VOICE_GAIN = 0.0 # Ganho mínimo da voz para degradação total (10% do original)
 
+# Ordem do filtro (define a inclinação do corte)
+FILTER_ORDER = 7
+
+# Duração do banco de ruído pré-filtrado (por taxa de amostragem)
+NOISE_BANK_SECONDS = 3.0
+
+
+def degradation_noise_level(degradation_factor):
+    """Nível de ruído para o fator de degradação (0.0 a 1.0): aumenta o ruído com o fator."""
+    return NOISE_LEVEL + (MAX_DEGRADATION_NOISE_LEVEL - NOISE_LEVEL) * degradation_factor
 
-def apply_bandpass_filter(data_np, sample_rate):
-    """Aplica o filtro passa-banda de 300-3000 Hz."""
+
+@functools.lru_cache(maxsize=8)
+def design_bandpass_sos(sample_rate):
+    """
+    Projeta (uma única vez por taxa de amostragem) o Butterworth passa-banda em seções de
+    segunda ordem (SOS), numericamente estável na ordem 7. Compartilhado entre streams: não modificar.
+    Retorna None se a taxa não suportar o filtro.
+    """
     nyquist = 0.5 * sample_rate
     low = LOW_CUT / nyquist
     high = HIGH_CUT / nyquist
-    
-    # Ordem do filtro (define a inclinação do corte)
-    order = 7 
-    
     try:
-        # Filtro Butterworth (btype='band' para corte de banda)
-        b, a = signal.butter(order, [low, high], btype='band', analog=False)
-        return signal.lfilter(b, a, data_np)
+        sos = signal.butter(FILTER_ORDER, [low, high], btype='band', analog=False, output='sos')
     except ValueError:
+        return None
+    return sos
+
+
+class BandpassFilter:
+    """Filtro passa-banda de um stream: carrega o estado (zi) entre chunks, eliminando o clique nas bordas."""
+    def __init__(self, sample_rate, dtype=np.float64):
+        self.sample_rate = sample_rate
+        sos = design_bandpass_sos(sample_rate)
+        self.sos = sos.astype(dtype, copy=False) if sos is not None else None
+        self.zi = np.zeros((self.sos.shape[0], 2), dtype=dtype) if self.sos is not None else None
+
+    def process(self, data_np):
+        if self.sos is None:
+            return data_np
+        filtered, self.zi = signal.sosfilt(self.sos, data_np, zi=self.zi)
+        return filtered
+
+    def process_inplace(self, buffer):
+        """Filtra `buffer` (1-D, contíguo, mesmo dtype do filtro) sobre ele mesmo."""
+        if self.sos is None:
+            return
+        if _sosfilt_inplace is not None:
+            _sosfilt_inplace(self.sos, buffer.reshape(1, -1), self.zi.reshape(1, -1, 2))
+        else:
+            filtered, self.zi = signal.sosfilt(self.sos, buffer, zi=self.zi)
+            buffer[:] = filtered
+
+    def reset(self):
+        """Zera o estado (início de uma nova transmissão)."""
+        if self.zi is not None:
+            self.zi.fill(0.0)
+
+
+class RadioFilterState:
+    """Estado de filtro da voz de um stream de áudio (TX, RX, loopback). O ruído vem do NoiseBank já filtrado."""
+    def __init__(self, sample_rate, dtype=np.float64):
+        self.voice = BandpassFilter(sample_rate, dtype)
+
+    def reset(self):
+        self.voice.reset()
+
+
+class NoiseBank:
+    """
+    Alguns segundos de ruído branco (variância unitária antes do filtro) já passados pelo passa-banda,
+    gerados uma vez por taxa de amostragem. Cada chunk lê uma janela circular a partir de uma fase
+    aleatória e a escala pelo nível desejado: uma fatia e uma multiplicação em vez de RNG + IIR.
+    """
+    def __init__(self, sample_rate, seconds=NOISE_BANK_SECONDS, seed=None):
+        self.sample_rate = sample_rate
+        self._rng = np.random.default_rng(seed)
+        length = int(sample_rate * seconds)
+        raw = self._rng.standard_normal(length)
+        sos = design_bandpass_sos(sample_rate)
+        if sos is not None:
+            # Filtra duas voltas e fica com a segunda: convolução circular, o laço emenda sem clique
+            raw = signal.sosfilt(sos, np.concatenate((raw, raw)))[length:]
+        self.length = length
+        # Duas cópias seguidas: qualquer janela de até `length` amostras é uma fatia contígua (sem cópia)
+        self._bank = np.concatenate((raw, raw)).astype(np.float32)
+
+    def window(self, count):
+        """Visão (somente leitura por convenção) de `count` amostras a partir de uma fase aleatória."""
+        if count > self.length:
+            return np.resize(self._bank, count) # Janela maior que o banco: repete (caso raro)
+        offset = int(self._rng.integers(self.length))
+        return self._bank[offset:offset + count]
+
+    def read(self, count, level, out=None):
+        """Janela escalada por `level`, gravada em `out` (float32) quando informado."""
+        return np.multiply(self.window(count), np.float32(level), out=out)
+
+
+@functools.lru_cache(maxsize=4)
+def get_noise_bank(sample_rate):
+    """Banco de ruído compartilhado da taxa de amostragem (criado no primeiro uso)."""
+    return NoiseBank(sample_rate)
+
+
+@functools.lru_cache(maxsize=8)
+def design_resampler_taps(up, down):
+    """
+    Filtro anti-aliasing da reamostragem up/down (mesmo projeto do scipy.signal.resample_poly),
+    já organizado por fase: linha p = coeficientes h[p], h[p + up], h[p + 2*up], ...
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * up
+    per_phase = -(-taps.shape[0] // up)
+    padded = np.zeros(per_phase * up)
+    padded[:taps.shape[0]] = taps
+    phases = padded.reshape(per_phase, up).T.astype(np.float32)
+    phases.flags.writeable = False # Compartilhado entre reamostradores
+    return phases
+
+
+class PolyphaseResampler:
+    """
+    Reamostrador polifásico com estado (equivalente a upfirdn aplicado ao stream inteiro):
+    guarda o histórico de entrada e a fase entre chunks, então chunks consecutivos emendam sem clique.
+    """
+    def __init__(self, rate_in, rate_out):
+        g = math.gcd(int(rate_in), int(rate_out))
+        self.rate_in, self.rate_out = rate_in, rate_out
+        self.up, self.down = int(rate_out) // g, int(rate_in) // g
+        self._phases = design_resampler_taps(self.up, self.down)
+        self._taps_per_phase = self._phases.shape[1]
+        self._offsets = np.arange(self._taps_per_phase)
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self._taps_per_phase - 1, dtype=np.float32)
+        self._in_pos = 0   # Índice global da próxima amostra de entrada
+        self._out_pos = 0  # Índice global da próxima amostra de saída
+
+    def process(self, samples):
+        """Reamostra um chunk float32 e devolve as amostras de saída disponíveis (float32)."""
+        if self.up == self.down:
+            return samples
+        ext = np.concatenate((self._history, samples.astype(np.float32, copy=False)))
+        end_pos = self._in_pos + samples.shape[0]
+        out_end = (end_pos * self.up + self.down - 1) // self.down
+        k = np.arange(self._out_pos, out_end, dtype=np.int64) * self.down
+        phase = k % self.up
+        # Posição em `ext` da amostra de entrada mais recente de cada saída (ext[0] = in_pos - histórico)
+        newest = k // self.up - self._in_pos + self._history.shape[0]
+        window = ext[newest[:, None] - self._offsets[None, :]]
+        out = np.einsum('ij,ij->i', window, self._phases[phase])
+        self._history = ext[ext.shape[0] - self._history.shape[0]:].copy()
+        self._in_pos = end_pos
+        self._out_pos = out_end
+        return out
+
+
+def float_to_int16(samples):
+    """Arredonda e satura amostras float na escala int16."""
+    return np.clip(np.rint(samples), INT16_MIN, MAX_INT_16).astype(np.int16)
+
+
+class FrameResampler:
+    """
+    Lado da captura: converte os chunks do microfone (taxa nativa do dispositivo) para a taxa de
+    rede e devolve blocos int16 de exatamente `frame_size` amostras; a sobra espera o próximo chunk.
+    """
+    def __init__(self, rate_in, rate_out, frame_size):
+        self.resampler = PolyphaseResampler(rate_in, rate_out)
+        self.frame_size = frame_size
+        self._pending = np.empty(0, dtype=np.float32)
+
+    def reset(self):
+        self.resampler.reset()
+        self._pending = np.empty(0, dtype=np.float32)
+
+    def process(self, pcm):
+        """Reamostra um chunk int16 e retorna a lista (possivelmente vazia) de blocos completos em bytes."""
+        converted = self.resampler.process(np.frombuffer(pcm, dtype=np.int16).astype(np.float32))
+        pending = np.concatenate((self._pending, converted)) if self._pending.shape[0] else converted
+        size = self.frame_size
+        count = pending.shape[0] // size
+        frames = [float_to_int16(pending[i * size:(i + 1) * size]).tobytes() for i in range(count)]
+        self._pending = pending[count * size:].copy()
+        return frames
+
+
+class PullResampler:
+    """
+    Lado da reprodução: o callback do dispositivo pede `frame_count` quadros na taxa nativa; a fonte
+    (mixer, na taxa de rede) é lida apenas o necessário e a sobra fica para o próximo período.
+    Com `channels` > 1 a fonte entrega quadros intercalados e cada canal tem seu reamostrador (estado próprio).
+    """
+    def __init__(self, source, rate_in, rate_out, channels=1):
+        self.source = source # source(n) -> bytes int16 (n quadros) na taxa de entrada
+        self.channels = channels
+        self.resamplers = [PolyphaseResampler(rate_in, rate_out) for _ in range(channels)]
+        self.resampler = self.resamplers[0]
+        self._pending = np.empty((channels, 0), dtype=np.float32)
+
+    def pull(self, frame_count):
+        pending = self._pending
+        if pending.shape[1] < frame_count:
+            # ceil(falta * down / up) amostras de entrada rendem ao menos `falta` amostras de saída
+            need = frame_count - pending.shape[1]
+            count_in = -(-need * self.resampler.down // self.resampler.up)
+            source = np.frombuffer(self.source(count_in), dtype=np.int16).astype(np.float32)
+            source = source.reshape(-1, self.channels)
+            fresh = [resampler.process(source[:, ch]) for ch, resampler in enumerate(self.resamplers)]
+            pending = np.concatenate((pending, np.stack(fresh)), axis=1)
+        self._pending = pending[:, frame_count:]
+        out = pending[:, :frame_count]
+        return float_to_int16(out[0] if self.channels == 1 else out.T).tobytes()
+
+
+def apply_bandpass_filter(data_np, sample_rate, filter_state: BandpassFilter | None = None):
+    """Aplica o filtro passa-banda de 300-3000 Hz (com estado, se `filter_state` for informado)."""
+    if filter_state is not None:
+        return filter_state.process(data_np)
+    sos = design_bandpass_sos(sample_rate)
+    if sos is None:
         # Retorna o áudio original se o filtro falhar (ocorre com taxas de amostragem incomuns)
         return data_np
+    return signal.sosfilt(sos, data_np)
 
 
-def apply_radio_effect(audio_data, sample_rate):
+class RadioDSPChain:
+    """
+    Cadeia DSP de um stream (TX, RX ou loopback) sem alocações por chunk: buffers float32
+    pré-alocados e ufuncs com `out=` para normalização -> filtro -> ganho de voz -> ruído ->
+    clipping -> volume -> int16. O resultado é um memoryview do buffer de saída reutilizável,
+    válido apenas até a próxima chamada (converta com bytes() na hora de entregar ao PyAudio/Socket.IO).
+    """
+    def __init__(self, sample_rate, chunk_size):
+        self.sample_rate = sample_rate
+        self.filters = RadioFilterState(sample_rate, np.float32)
+        self.noise_bank = get_noise_bank(sample_rate)
+        self._allocate(chunk_size)
+
+    def _allocate(self, chunk_size):
+        self.chunk_size = chunk_size
+        self._work = np.empty(chunk_size, dtype=np.float32)
+        self._noise = np.empty(chunk_size, dtype=np.float32)
+        self._out = np.empty(chunk_size, dtype=np.int16)
+        self._out_bytes = memoryview(self._out).cast('B')
+
+    def _load(self, audio_data, scale):
+        """Converte o chunk int16 para o buffer de trabalho (já escalado). Retorna a visão usada."""
+        src = np.frombuffer(audio_data, dtype=np.int16)
+        n = src.shape[0]
+        if n > self.chunk_size:
+            self._allocate(n) # Chunk maior que o previsto: cresce uma vez e reutiliza
+        work = self._work[:n]
+        np.multiply(src, np.float32(scale), out=work)
+        return work
+
+    def _store(self, work, gain):
+        """Aplica o ganho final, satura no intervalo de 16 bits e grava no buffer de saída."""
+        n = work.shape[0]
+        work *= np.float32(gain)
+        np.clip(work, INT16_MIN, MAX_INT_16, out=work)
+        np.copyto(self._out[:n], work, casting='unsafe')
+        return self._out_bytes[:n * 2]
+
+    def process(self, audio_data, degradation_factor=0.0, input_gain=1.0, volume=1.0):
+        """
+        Efeito de rádio completo. Com fator 0.0 equivale a apply_radio_effect; acima disso, a apply_degradation.
+        `input_gain` é o ganho do microfone (antes do filtro) e `volume` o volume RX (após o clipping).
+        """
+        if not audio_data:
+            return audio_data
+
+        # 1. Normalização (int16 -> float32) já com o ganho de entrada
+        work = self._load(audio_data, input_gain / MAX_INT_16)
+        n = work.shape[0]
+
+        # 2. Filtro de voz e ganho de voz reduzido pela degradação
+        self.filters.voice.process_inplace(work)
+        voice_gain = 1.0 - (1.0 - MIN_VOICE_GAIN) * degradation_factor
+        if voice_gain != 1.0:
+            work *= np.float32(voice_gain)
+
+        # 3. Ruído (já filtrado, do banco), somado à voz
+        noise_level = degradation_noise_level(degradation_factor)
+        work += self.noise_bank.read(n, noise_level, out=self._noise[:n])
+
+        # 4. Clipping (distorção AM), depois OUTPUT_GAIN e volume -> int16
+        np.clip(work, -CLIPPING_FACTOR, CLIPPING_FACTOR, out=work)
+        return self._store(work, OUTPUT_GAIN * MAX_INT_16 * volume)
+
+    def apply_volume(self, audio_data, volume):
+        """Apenas o volume (áudio sem degradação ou squelch tail), com saturação em vez de estouro."""
+        if not audio_data:
+            return audio_data
+        return self._store(self._load(audio_data, 1.0), volume)
+
+    def reset(self):
+        self.filters.reset()
+
+
+def apply_radio_effect(audio_data, sample_rate, state: RadioFilterState | None = None):
     """
     Aplica os efeitos de rádio de aviação (filtro, ruído e clipping) com o OUTPUT_GAIN fixo.
     """
@@ -57,14 +350,10 @@ def apply_radio_effect(audio_data, sample_rate):
     audio_norm = audio_np / MAX_INT_16
     
     # 2. FILTRAGEM DE VOZ: Aplica o corte de banda para o som metálico/abafado
-    audio_filtered_voice = apply_bandpass_filter(audio_norm, sample_rate)
-    
-    # 3. GERAÇÃO E FILTRAGEM DO RUÍDO:
-    # Gera ruído branco
-    noise_raw = np.random.normal(0, NOISE_LEVEL, audio_filtered_voice.shape).astype(np.float32)
+    audio_filtered_voice = apply_bandpass_filter(audio_norm, sample_rate, state.voice if state else None)
     
-    # FILTRAGEM DO RUÍDO: Aplica o mesmo filtro para remover agudos excessivos do chiado.
-    noise_filtered = apply_bandpass_filter(noise_raw, sample_rate)
+    # 3. RUÍDO: janela do banco de ruído branco já filtrado pelo mesmo passa-banda (sem agudos excessivos)
+    noise_filtered = get_noise_bank(sample_rate).read(audio_filtered_voice.shape[0], NOISE_LEVEL)
     
     # 4. SOMA: Combina a voz filtrada com o ruído filtrado
     audio_with_noise = audio_filtered_voice + noise_filtered
@@ -81,7 +370,7 @@ def apply_radio_effect(audio_data, sample_rate):
 
     return audio_final.tobytes()
 
-def apply_degradation(audio_data, sample_rate, degradation_factor):
+def apply_degradation(audio_data, sample_rate, degradation_factor, state: RadioFilterState | None = None):
     """
     Aplica degradação ajustando o ruído e o volume da voz, usando o OUTPUT_GAIN fixo.
     """
@@ -93,12 +382,12 @@ def apply_degradation(audio_data, sample_rate, degradation_factor):
     audio_norm = audio_np / MAX_INT_16
     
     # 2. FILTRAGEM DE VOZ: Aplica o corte de banda
-    audio_filtered_voice = apply_bandpass_filter(audio_norm, sample_rate)
+    audio_filtered_voice = apply_bandpass_filter(audio_norm, sample_rate, state.voice if state else None)
     
     # --- Lógica de Degradação Baseada no Fator (0.0 a 1.0) ---
     
     # A. Ajuste do Nível de Ruído (aumenta o ruído com o fator)
-    current_noise_level = NOISE_LEVEL + (MAX_DEGRADATION_NOISE_LEVEL - NOISE_LEVEL) * degradation_factor
+    current_noise_level = degradation_noise_level(degradation_factor)
     
     # B. Ajuste do Ganho de Voz (reduz o ganho de voz com o fator)
     voice_gain_factor = 1.0 - (1.0 - MIN_VOICE_GAIN) * degradation_factor
@@ -106,9 +395,8 @@ def apply_degradation(audio_data, sample_rate, degradation_factor):
     # Aplica o novo ganho na voz filtrada
     audio_filtered_voice *= voice_gain_factor 
 
-    # 3. GERAÇÃO E FILTRAGEM DO RUÍDO:
-    noise_raw = np.random.normal(0, current_noise_level, audio_filtered_voice.shape).astype(np.float32)
-    noise_filtered = apply_bandpass_filter(noise_raw, sample_rate)
+    # 3. RUÍDO (banco pré-filtrado):
+    noise_filtered = get_noise_bank(sample_rate).read(audio_filtered_voice.shape[0], current_noise_level)
     
     # 4. SOMA: Combina a voz degradada com o ruído ajustado
     audio_with_noise = audio_filtered_voice + noise_filtered
@@ -136,9 +424,8 @@ def add_static_noise_only(audio_data, sample_rate):
     audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
     audio_norm = audio_np / MAX_INT_16
 
-    # Adiciona ruído filtrado
-    noise_raw = np.random.normal(0, NOISE_LEVEL * 1.5, audio_norm.shape).astype(np.float32)
-    noise_filtered = apply_bandpass_filter(noise_raw, sample_rate)
+    # Adiciona ruído filtrado (banco pré-filtrado)
+    noise_filtered = get_noise_bank(sample_rate).read(audio_norm.shape[0], NOISE_LEVEL * 1.5)
     
     audio_with_noise = audio_norm + noise_filtered
     
@@ -152,19 +439,17 @@ def add_static_noise_only(audio_data, sample_rate):
     
     return audio_final.tobytes()
 
+@functools.lru_cache(maxsize=4)
 def generate_squelch_tail_burst(chunk_size: int, sample_rate: int) -> bytes:
     """
-    Gera um burst de ruído estático filtrado para o 'squelch tail' de rádio.
+    Gera um burst de ruído estático filtrado para o 'squelch tail' de rádio
+    (calculado uma vez por tamanho de chunk/taxa e reutilizado a cada liberação do PTT).
     """
-    # 1. Cria uma base de silêncio para simular o buffer
-    audio_norm = np.zeros(chunk_size, dtype=np.float32)
+    # 1-2. RUÍDO DO BANCO (10x mais alto que o NOISE_LEVEL padrão para o burst)
+    noise_filtered = get_noise_bank(sample_rate).read(chunk_size, NOISE_LEVEL * 10)
     
-    # 2. GERAÇÃO E FILTRAGEM DO RUÍDO (Ruído 1.5x mais alto que o NOISE_LEVEL padrão para o burst)
-    noise_raw = np.random.normal(0, NOISE_LEVEL * 10, audio_norm.shape).astype(np.float32)
-    noise_filtered = apply_bandpass_filter(noise_raw, sample_rate)
-    
-    # 3. SOMA: Apenas o ruído, já que o audio_norm é zero
-    audio_with_noise = audio_norm + noise_filtered
+    # 3. SOMA: Apenas o ruído (base de silêncio)
+    audio_with_noise = noise_filtered
     
     # 4. Clipping (MANTIDO)
     audio_clipped = np.clip(audio_with_noise, -CLIPPING_FACTOR, CLIPPING_FACTOR)
@@ -1,60 +1,121 @@
 # Arquivo: client/radio_ui_logic.py
 
-import pyaudio
-import socketio
 import threading
-import keyboard
 import time
+import math
+import collections
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-import os
-import numpy as np
 import sys # Para diagnósticos
-from datetime import datetime # ADICIONADO PARA USO NO PRINT DE DIAGNÓSTICO
+import logging
 
-# --- Importação e Verificação de Módulos (Inicialização Resiliente) ---
-# Variáveis globais de controle
+from log_utils import get_logger
+from config_store import JsonConfigStore
+
+log = get_logger('radio')
+rx_log = get_logger('radio.rx')
+
+# --- Importação e Verificação de Módulos (Inicialização Resiliente e TARDIA) ---
+# A pilha de áudio (PyAudio, PyGame, NumPy/SciPy via DSP, keyboard) só é importada e inicializada
+# no primeiro uso do rádio (ensure_radio_stack), para não atrasar a abertura da janela de login.
 JOYSTICK_AVAILABLE = False
 radio_dsp = None
 pygame = None
+pyaudio = None
+keyboard = None
+np = None
+rx_mixer = None
+rx_recorder = None
+audio_codecs = None
+warm_capture = None
+voice_activity = None
+frame_controller = None
+audio_host = None
+_radio_stack_loaded = False
+_radio_stack_lock = threading.Lock()
+
+
+def ensure_radio_stack(open_audio: bool = True) -> bool:
+    """
+    Importa e inicializa a pilha de áudio uma única vez. Retorna JOYSTICK_AVAILABLE.
+    Com `open_audio=False` o PortAudio não é aberto: o processo da UI com o motor de áudio separado
+    só precisa do teclado e do joystick (o motor é o dono dos dispositivos).
+    """
+    global JOYSTICK_AVAILABLE, radio_dsp, rx_mixer, rx_recorder, audio_codecs, warm_capture, voice_activity, frame_controller, audio_host, pygame, pyaudio, keyboard, np, FORMAT, _radio_stack_loaded
+    with _radio_stack_lock:
+        if not _radio_stack_loaded:
+            _radio_stack_loaded = True
+            try:
+                import numpy as np_module
+                import pyaudio as pyaudio_module
+                import keyboard as keyboard_module
+                np, pyaudio, keyboard = np_module, pyaudio_module, keyboard_module
+                FORMAT = pyaudio.paInt16
+
+                # 1. Importação do PyGame e inicialização
+                import pygame as pygame_module
+                from pygame import locals
+                pygame = pygame_module
+
+                # 2. Importação do módulo local DSP (deve estar no diretório 'client/')
+                import radio_dsp as dsp_module  # CORRIGIDO para importação direta
+                import rx_mixer as mixer_module
+                import warm_capture as capture_module
+                import audio_codecs as codecs_module
+                import voice_activity as vad_module
+                import frame_controller as frame_module
+                import audio_host as host_module
+                import rx_recorder as recorder_module
+                radio_dsp, rx_mixer, warm_capture, audio_codecs = dsp_module, mixer_module, capture_module, codecs_module
+                voice_activity, frame_controller, audio_host, rx_recorder = vad_module, frame_module, host_module, recorder_module
+
+                # 3. Inicialização de recursos (Pygame)
+                pygame.init()
+
+                JOYSTICK_AVAILABLE = True
+                log.info("Módulos DSP, PyAudio e PyGame importados e inicializados com sucesso.")
 
-try:
-    # 1. Importação do PyGame e inicialização
-    import pygame
-    from pygame import locals
-
-    # 2. Importação do módulo local DSP (deve estar no diretório 'client/')
-    import radio_dsp as dsp_module  # CORRIGIDO para importação direta
-    radio_dsp = dsp_module
-
-    # 3. Inicialização de recursos (Pygame)
-    pygame.init()
-
-    # Tentativa de inicializar PyAudio (pode falhar se não houver drivers ou permissão)
-    p_check = pyaudio.PyAudio()
-    p_check.terminate() # Termina imediatamente após a checagem
-
-    JOYSTICK_AVAILABLE = True
-    print("[RÁDIO INFO] Módulos DSP, PyAudio e PyGame importados e inicializados com sucesso.")
+            except Exception as e:
+                # Este bloco captura falhas no import (ModuleNotFoundError) ou na inicialização (pygame.init)
+                log.critical("Falha na importação/inicialização do Rádio (%s): %s. O rádio não funcionará.", type(e).__name__, e)
+                JOYSTICK_AVAILABLE = False
 
-except Exception as e:
-    # Este bloco captura falhas no import (ModuleNotFoundError) ou na inicialização (pygame.init/pyaudio)
-    print(f"[RÁDIO CRÍTICO] Falha na importação/inicialização do Rádio ({type(e).__name__}): {e}. O rádio não funcionará.")
-    JOYSTICK_AVAILABLE = False
+        if JOYSTICK_AVAILABLE and open_audio:
+            # Tentativa de inicializar PyAudio (pode falhar se não houver drivers ou permissão): a instância
+            # fica aberta e é compartilhada por todos os RadioClients e pela janela de configuração
+            try:
+                audio_host.get_audio_host()
+            except Exception as e:
+                log.critical("Falha ao inicializar o PyAudio (%s): %s. O rádio não funcionará.", type(e).__name__, e)
+                JOYSTICK_AVAILABLE = False
+        return JOYSTICK_AVAILABLE
 
 
 # --- CONSTANTES DE CONFIGURAÇÃO ---
 CONFIG_FILE = 'client_config.json'
 DEFAULT_SERVER_URL = 'https://www.kafly.com.br:3000'
 PTT_KEY_DEFAULT = 'space'
+JOYSTICK_EVENT_TIMEOUT_MS = 500 # Espera máxima por evento do joystick (a thread dorme no SDL, sem polling)
+
+# --- Dual-watch (COM2 transmite e recebe; COM1 só recebe, na mesma conexão) ---
+COM_TX = 'com2'
+COM_MONITOR = 'com1'
+COM_PAN_DEADZONE = 0.05 # Pan abaixo disso é centro (saída mono, sem custo do estéreo)
 
 # --- Configurações de Áudio (Herdadas do projeto rádio) ---
-CHUNK = 2048 # Alterado para máxima estabilidade
-FORMAT = pyaudio.paInt16
+CHUNK = 2048 # Squelch tail e pré-alocação do DSP (na taxa RATE; em outras taxas de rede a duração é mantida).
+             # O quadro de TX/captura é adaptativo (frame_controller), até essa mesma duração.
+FORMAT = 8 # pyaudio.paInt16 (redefinido em ensure_radio_stack)
 CHANNELS = 1
-RATE = 23000
-MAX_INT_16 = np.iinfo(np.int16).max # Assumindo numpy está instalado
+RATE = 23000 # Taxa de rede padrão (relays/clientes antigos); os dispositivos abrem na taxa nativa
+OUTPUT_FRAMES = 512 # Frames por callback de saída (~22 ms): o jitter buffer absorve a variação da rede
+PTT_LATENCY_SAMPLES = 50 # Últimas medições de latência PTT -> primeiro chunk (média no log)
+MAX_INT_16 = 32767 # np.iinfo(np.int16).max
+
+
+def chunk_for_rate(rate: int) -> int:
+    """Tamanho do chunk com a mesma duração de CHUNK amostras a RATE (~89 ms)."""
+    return max(1, round(CHUNK * rate / RATE))
 
 # NOVO: Constantes de Alcance (Replicando o Servidor)
 MAX_RANGE_KM = 4000.0
@@ -85,40 +146,26 @@ def reverse_degradation_factor(factor: float) -> float:
 
 # --- LÓGICA DE GERENCIAMENTO DE ÁUDIO ---
 
-def get_audio_devices():
-    """Lista todos os dispositivos de entrada e saída disponíveis."""
-    try:
-        p = pyaudio.PyAudio()
-    except Exception:
-        return {}, {} # Retorna vazio se PyAudio falhar
-
-    input_devs = {}
-    output_devs = {}
-
-    for i in range(p.get_device_count()):
-        info = p.get_device_info_by_index(i)
-        if info.get('maxInputChannels') > 0:
-            input_devs[f"{info.get('name')} (Index {i})"] = i
-        if info.get('maxOutputChannels') > 0:
-            output_devs[f"{info.get('name')} (Index {i})"] = i
-
-    p.terminate()
-    return input_devs, output_devs
-
-def load_config():
-    """Carrega as configurações salvas do ficheiro JSON."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                pass
-    return {}
+def get_audio_devices(catalog):
+    """Dispositivos de entrada e saída do catálogo (AudioHost local ou a lista recebida do motor de áudio)."""
+    if catalog is None:
+        return {}, {}
+    return catalog.device_map(audio_host.INPUT), catalog.device_map(audio_host.OUTPUT)
+
+_config_store = JsonConfigStore(CONFIG_FILE)
+
+def load_config(reload: bool = False):
+    """Carrega as configurações salvas do ficheiro JSON (`reload`: relê o disco, gravado por outro processo)."""
+    return _config_store.load(reload)
 
 def save_config(config_data):
-    """Salva a URL, os índices dos dispositivos, a tecla PTT e o volume TX/RX e o Loopback."""
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config_data, f, indent=4)
+    """Salva a URL, os índices dos dispositivos, a tecla PTT e o volume TX/RX e o Loopback.
+    Aplica na memória na hora; o arquivo é gravado em segundo plano, agrupando alterações seguidas (knobs)."""
+    _config_store.save(config_data)
+
+def flush_config():
+    """Grava imediatamente as alterações pendentes (antes de outro processo ler o client_config.json)."""
+    _config_store.flush()
 
 # Função para calcular o fator de degradação localmente (replicando o servidor)
 def calculate_loopback_factor(distance_km: float) -> float:
@@ -157,8 +204,8 @@ class VolumeKnob(tk.Canvas):
                          self.center + self.radius, self.center + self.radius,
                          fill='#7F8C8D', outline='#34495E', width=1)
 
-        x = self.center + self.radius * 0.7 * np.sin(np.deg2rad(self.angle))
-        y = self.center - self.radius * 0.7 * np.cos(np.deg2rad(self.angle))
+        x = self.center + self.radius * 0.7 * math.sin(math.radians(self.angle))
+        y = self.center - self.radius * 0.7 * math.cos(math.radians(self.angle))
 
         self.create_line(self.center, self.center, x, y, fill='#E74C3C', width=3, tags="pointer")
 
@@ -197,20 +244,243 @@ class VolumeKnob(tk.Canvas):
         self._draw_knob()
 
 
+# --- CONFIGURAÇÃO E ENTRADA PTT (comuns ao RadioClient e ao proxy do motor de áudio) ---
+
+class RadioControlsMixin:
+    """
+    Valores da config usados em tempo de execução (volumes, PTT, loopback, dual-watch), os métodos
+    chamados pela janela de configuração e a entrada do PTT (hook do teclado e thread do joystick).
+    Quem herda define `config`, `ptt_input`, o estado do PTT e `_apply_settings(changes)`, que aplica
+    as alterações salvas (no RadioClient, direto no áudio; no proxy, pelo canal de controle do motor).
+    """
+
+    def _apply_config_values(self):
+        """Copia da config os valores usados em tempo de execução."""
+        config = self.config
+        self.mic_volume_factor = config.get('mic_volume_factor', 1.0)
+        self.rx_volume_factor = config.get('rx_volume_factor', 1.0)
+        self.ptt_key = config.get('ptt_key', PTT_KEY_DEFAULT)
+        self.replay_key = (config.get('replay_key') or '').lower()
+        self.loopback_active = config.get('loopback_active', False)
+        self.loopback_distance_km = config.get('loopback_distance_km', 0.0)
+        self.dual_watch_enabled = config.get('dual_watch', True)
+        self._load_com_settings()
+
+    def _load_com_settings(self):
+        """Volume e pan de cada COM (client_config.json: 'com_volumes' e 'com_pans') e o número de canais da saída."""
+        self.com_volumes = {COM_MONITOR: 1.0, COM_TX: 1.0}
+        self.com_volumes.update(self.config.get('com_volumes', {}))
+        self.com_pans = {COM_MONITOR: 0.0, COM_TX: 0.0}
+        self.com_pans.update(self.config.get('com_pans', {}))
+        self.output_channels = 2 if any(abs(pan) >= COM_PAN_DEADZONE for pan in self.com_pans.values()) else 1
+
+    # --- Métodos de Configuração (Volume, PTT Key) ---
+
+    def _update_settings(self, changes):
+        """Grava as alterações da janela de configuração e as aplica."""
+        self.config.update(changes)
+        save_config(self.config)
+        self._apply_settings(changes)
+
+    def update_mic_volume_config(self, value):
+        self._update_settings({'mic_volume_factor': float(value)})
+
+    def update_rx_volume_config(self, value):
+        self._update_settings({'rx_volume_factor': float(value)})
+
+    def update_dual_watch_config(self, enabled: bool):
+        self._update_settings({'dual_watch': bool(enabled)})
+
+    def update_com_volume_config(self, com: str, value):
+        self._update_settings({'com_volumes': dict(self.com_volumes, **{com: float(value)})})
+
+    def update_com_pan_config(self, com: str, value):
+        """Pan do COM (-1 esquerda, +1 direita). A saída só é reaberta quando muda entre mono e estéreo."""
+        pan = float(value)
+        self._update_settings({'com_pans': dict(self.com_pans, **{com: 0.0 if abs(pan) < COM_PAN_DEADZONE else pan})})
+
+    def update_loopback_config(self, active: bool):
+        self._update_settings({'loopback_active': bool(active)})
+
+    # NOVO: Método de atualização da distância virtual
+    def update_loopback_distance(self, value):
+        self._update_settings({'loopback_distance_km': float(value)})
+
+    # --- Lógica PTT e Joystick (MODIFICADA) ---
+    
+    def ptt_key_handler(self, event):
+        if self.replay_key and event.name.lower() == self.replay_key:
+            if event.event_type == keyboard.KEY_DOWN:
+                self.replay_last_transmission()
+            return
+        if event.name.lower() != self.ptt_key.lower():
+            return
+
+        if event.event_type == keyboard.KEY_DOWN and not self.is_ptt_active:
+            self.start_transmission_ptt()
+        elif event.event_type == keyboard.KEY_UP:
+            if self.is_ptt_active:
+                self.stop_transmission()
+
+    def set_ptt_hotkeys(self, key_name, register):
+        """Registra/desregistra as hotkeys PTT (apenas para TECLADO)."""
+        if not JOYSTICK_AVAILABLE or not self.ptt_input:
+            return
+
+        if key_name.lower().startswith('joy_button_') and not self.replay_key:
+            return # PTT no joystick: o teclado só é ouvido para a tecla de repetição
+
+        # Remove o hook anterior, se existir.
+        if self._ptt_hook:
+            try:
+                keyboard.unhook(self._ptt_hook)
+            except (KeyError, AttributeError):
+                pass  # Ignora erros se o hook já foi removido.
+            self._ptt_hook = None
+
+        # Se a intenção é registrar, cria um novo hook.
+        if register:
+            try:
+                self._ptt_hook = keyboard.hook(self.ptt_key_handler, suppress=False)
+            except Exception as e:
+                log.critical("Falha ao registrar o hook do teclado: %s", e)
+
+
+    def start_joystick_monitor(self):
+        """Inicia a thread de monitoramento de joystick se não estiver ativa."""
+        if not JOYSTICK_AVAILABLE or not self.ptt_input: return
+
+        if (self.joystick_thread is None or not self.joystick_thread.is_alive()):
+            # Um sinal de parada por thread: a thread antiga, se ainda estiver saindo, não é revivida
+            self._joystick_stop = threading.Event()
+            self.joystick_thread = threading.Thread(target=self.joystick_monitor_loop, args=(self._joystick_stop,), daemon=True)
+            self.joystick_thread.start()
+
+    def stop_joystick_monitor(self):
+        """
+        Para a thread do joystick e espera por ela. Obrigatório ao descartar o cliente: todas as threads
+        leem a mesma fila de eventos do SDL, e uma thread antiga consumiria o JOYBUTTONUP do cliente novo
+        (que continuaria transmitindo).
+        """
+        thread = getattr(self, 'joystick_thread', None) # Ausente se o cliente subiu sem a pilha de áudio
+        if thread is None:
+            return
+        self._joystick_stop.set()
+        if thread is not threading.current_thread():
+            thread.join(JOYSTICK_EVENT_TIMEOUT_MS / 1000 * 2)
+        self.joystick_thread = None
+
+    def joystick_monitor_loop(self, stop: threading.Event):
+        """Thread dedicada para monitorar o estado do joystick (COMPLETO), até `stop` ser sinalizado."""
+        if not JOYSTICK_AVAILABLE:
+            return
+
+        try:
+            # 1. Inicialização e Busca do Joystick
+            pygame.joystick.init()
+            self._acquire_joystick(0 if pygame.joystick.get_count() else None)
+        except Exception:
+            self.current_joystick = None
+
+        JOYBUTTONDOWN, JOYBUTTONUP = pygame.locals.JOYBUTTONDOWN, pygame.locals.JOYBUTTONUP
+        JOYDEVICEADDED, JOYDEVICEREMOVED = pygame.locals.JOYDEVICEADDED, pygame.locals.JOYDEVICEREMOVED
+        try:
+            # Só eventos de botão/dispositivo acordam a thread (eixos e hats geram dezenas de eventos por segundo):
+            # set_allowed(None) liberaria todos; bloqueia tudo e libera só os necessários
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed([JOYBUTTONDOWN, JOYBUTTONUP, JOYDEVICEADDED, JOYDEVICEREMOVED])
+        except Exception:
+            pass
+
+        # Lógica de PTT e Captura orientada a eventos: bloqueia em event.wait (CPU ~0 em repouso) e
+        # age na borda do botão, chamando o PTT direto desta thread (como o hook do teclado; sem Tk no caminho)
+        while not stop.is_set():
+            try:
+                event = pygame.event.wait(JOYSTICK_EVENT_TIMEOUT_MS)
+                if stop.is_set():
+                    break # Cliente descartado: o evento não é dele
+
+                if event.type == JOYDEVICEADDED:
+                    if self.current_joystick is None:
+                        self._acquire_joystick(event.device_index) # Reconectado (ou conectado depois do início)
+                    continue
+
+                if event.type == JOYDEVICEREMOVED:
+                    if self.current_joystick is not None and event.instance_id == self._joystick_instance_id:
+                        if self.is_ptt_active and self.ptt_key.lower().startswith('joy_button_'):
+                            self.stop_transmission() # Joystick desconectado com o botão pressionado
+                        log.info("Joystick desconectado: %s", self.current_joystick.get_name())
+                        self.current_joystick = None
+                    continue
+
+                if (event.type not in (JOYBUTTONDOWN, JOYBUTTONUP) or self.current_joystick is None
+                        or getattr(event, 'instance_id', event.joy) != self._joystick_instance_id):
+                    continue # Timeout (NOEVENT) ou outro dispositivo
+
+                # A) Lógica de Captura (Prioridade)
+                if self.is_listening_for_ptt:
+                    if event.type == JOYBUTTONDOWN and self.radio_config_window:
+                        self.radio_config_window.after(0, lambda e=event: self.radio_config_window._end_ptt_capture(f"JOY_BUTTON_{e.button}"))
+                    continue
+
+                # B) Lógica de Ativação PTT (borda do botão configurado)
+                if not self.ptt_key.lower().startswith('joy_button_'):
+                    continue
+                try:
+                    target_button_index = int(self.ptt_key.split('_')[-1])
+                except (ValueError, IndexError):
+                    continue # PTT Key mal formatada
+
+                if event.button == target_button_index:
+                    if event.type == JOYBUTTONDOWN and not self.is_ptt_active:
+                        self.start_transmission_ptt()
+                    elif event.type == JOYBUTTONUP and self.is_ptt_active:
+                        self.stop_transmission()
+
+            except Exception:
+                break # Sai do loop em caso de erro no joystick
+
+        # Cleanup: só o dispositivo deste cliente. O SDL e o módulo de joystick são do processo inteiro
+        # (a thread do cliente seguinte continua usando) e são encerrados na saída do processo.
+        joystick, self.current_joystick = self.current_joystick, None
+        if joystick is not None:
+            try:
+                joystick.quit()
+            except Exception:
+                pass
+
+    def _acquire_joystick(self, device_index):
+        """Abre o joystick `device_index` como dispositivo do PTT (None: nenhum conectado ainda)."""
+        if device_index is None:
+            self.current_joystick = None
+            return
+        joystick = pygame.joystick.Joystick(device_index)
+        joystick.init()
+        # pygame 2 identifica o dispositivo nos eventos pelo instance_id (estável até a desconexão)
+        self._joystick_instance_id = joystick.get_instance_id() if hasattr(joystick, 'get_instance_id') else joystick.get_id()
+        self.current_joystick = joystick
+        log.info("Joystick do PTT: %s", joystick.get_name())
+
+
 # --- CLASSE PRINCIPAL DO CLIENTE RÁDIO ---
 
-class RadioClient:
-    def __init__(self, master_app=None, pilot_id="N/A"): # ADICIONADO pilot_id
+class RadioClient(RadioControlsMixin):
+    def __init__(self, master_app=None, pilot_id="N/A", ptt_input: bool = True): # ADICIONADO pilot_id
+        import socketio # Importação tardia (primeiro uso do rádio)
+        # Gancho do motor de áudio em processo separado (audio_engine): distância para a UI
+        self.on_distance = None
+        # Hook do teclado e thread do joystick (desligados no motor: a entrada do PTT fica no processo da UI)
+        self.ptt_input = ptt_input
         # Apenas inicializa PyAudio se a importação foi bem-sucedida
-        if not JOYSTICK_AVAILABLE:
-            self.p = None
+        if not ensure_radio_stack():
+            self.audio_host = None
             self.sio = socketio.Client() # SocketIO é necessário para a UI, mesmo que o áudio falhe
             return
 
         self.master_app = master_app # NOVO: Armazena a referência do app principal
         self.pilot_id = pilot_id # NOVO: Armazena o ID do piloto (o ID da rede)
         self.config = load_config()
-        self.p = pyaudio.PyAudio()
+        self.audio_host = audio_host.get_audio_host() # PortAudio compartilhado (self.p) e catálogo de dispositivos
         self.sio = socketio.Client()
         self.is_ptt_active = False
         # ALTERADO: Remove a dependência de 'last_freq' do config, pois a frequência inicial
@@ -218,19 +488,64 @@ class RadioClient:
         self.current_frequency = 'N/A'
         self.stream_in = None
         self.stream_out = None
+        self.capture = None # Captura contínua (modo 'warm_capture'): substitui o stream_in aberto a cada PTT
         self.joystick_thread = None
+        self._joystick_stop = threading.Event()
         self.is_listening_for_ptt = False
         self.current_joystick = None
         self._ptt_hook = None
 
-        # Variáveis de volume/PTT
-        self.mic_volume_factor = self.config.get('mic_volume_factor', 1.0)
-        self.rx_volume_factor = self.config.get('rx_volume_factor', 1.0)
-        self.ptt_key = self.config.get('ptt_key', PTT_KEY_DEFAULT)
-        self.loopback_active = self.config.get('loopback_active', False)
-
-        # Configuração para Loopback com Distância
-        self.loopback_distance_km = self.config.get('loopback_distance_km', 0.0)
+        # Taxa de rede (negociada com o relay) e conversão de/para a taxa nativa dos dispositivos
+        self.wire_rate = RATE
+        self.chunk = CHUNK
+        self._pending_selection = None
+        self.native_rate_enabled = self.config.get('native_rate', True)
+        self.offered_rates = audio_codecs.supported_rates(self.config.get('wire_rates'))
+        self.output_rate = RATE
+        self._output_resampler = None
+        self._capture_resampler = None
+        self._capture_frames = CHUNK
+
+        # Tamanho de quadro adaptativo (overflow do microfone, underrun da saída, RTT do emit)
+        self.frame_controller = frame_controller.FrameSizeController(
+            self.config.get('frame_start_ms', frame_controller.FRAME_START_MS),
+            self.config.get('frame_ladder_ms', frame_controller.FRAME_LADDER_MS))
+
+        # Cadeia DSP por stream (filtros com estado e buffers pré-alocados): TX e loopback (RX: uma por remetente, no mixer)
+        self.tx_chain = radio_dsp.RadioDSPChain(RATE, CHUNK)
+        self.loopback_chain = radio_dsp.RadioDSPChain(RATE, CHUNK)
+
+        # Volumes, PTT, loopback e dual-watch: frequência do COM1 monitorada, volume e pan por COM
+        # (pan fora do centro -> saída estéreo)
+        self._apply_config_values()
+        self.monitored_frequency = None
+
+        # Mixer de recepção (um jitter buffer por remetente e COM) entre o Socket.IO e o callback de saída do PyAudio
+        self.rx_mixer = rx_mixer.RxMixer(RATE, CHUNK, self.config.get('jitter_target_ms', rx_mixer.JITTER_TARGET_MS),
+                                         channels=self.output_channels)
+
+        # Gravador dos últimos segundos de recepção (repetição da última transmissão; arquivo da sessão opcional)
+        self.rx_recorder = None
+        self._replay_generation = 0
+        if self.config.get('rx_recorder', True):
+            self.rx_recorder = rx_recorder.RxRecorder(self.config.get('rx_recorder_seconds', rx_recorder.RECORDER_SECONDS),
+                                                      self.config.get('rx_archive_dir'))
+            self.rx_mixer.on_processed = self._record_rx
+
+        # Codec de áudio negociado com o relay no connect (PCM cru até a resposta, ou com relays antigos)
+        self.offered_codecs = audio_codecs.supported_codecs(self.config.get('audio_codecs'))
+        self.tx_codec = audio_codecs.create_codec(audio_codecs.PCM16, RATE)
+        self.codec_negotiated = False
+
+        # Captura contínua do microfone e pré-roll do PTT
+        self.warm_capture_enabled = self.config.get('warm_capture', False)
+        self.ptt_preroll_ms = self.config.get('ptt_preroll_ms', warm_capture.PREROLL_MS_DEFAULT)
+        self._ptt_down_time = None
+        self.ptt_latencies_ms = collections.deque(maxlen=PTT_LATENCY_SAMPLES)
+
+        # Detector de voz no TX: chunks sem fala viram marcadores de silêncio (só com relay que negociou codec)
+        self.vad = voice_activity.VoiceActivityDetector(RATE, self.config.get('vad_hangover_ms', voice_activity.VAD_HANGOVER_MS)) \
+            if self.config.get('vad_enabled', True) else None
 
         # **NOVO**: Referência para a janela de configuração para o callback do joystick
         self.radio_config_window = None
@@ -241,40 +556,59 @@ class RadioClient:
 
         # Pygame já foi inicializado no bloco try/except
 
+    @property
+    def p(self):
+        """Instância atual do PyAudio (muda quando os dispositivos são reenumerados); None sem pilha de áudio."""
+        return self.audio_host.pa if self.audio_host is not None else None
+
     def setup_socketio_events(self):
         self.sio.on('connect', self._on_connect)
         self.sio.on('disconnect', self._on_disconnect)
         self.sio.on('broadcast_audio', self._on_broadcast_audio)
         self.sio.on('frequency_changed', self._on_frequency_changed)
+        self.sio.on('codec_selected', self._on_codec_selected)
 
     # REMOVIDO: update_com_volume
 
     # --- Métodos SocketIO ---
 
     def _on_connect(self):
-        print("--- CONECTADO ao Servidor de Rádio ---")
+        log.info("CONECTADO ao Servidor de Rádio")
+        try:
+            self.sio.emit('codec_offer', {'codecs': self.offered_codecs, 'rates': self.offered_rates})
+        except Exception:
+            pass # Sem negociação: continua em PCM cru
         # REMOVIDO: Não emite mais a frequência inicial aqui. O ws_monitor fará isso com os dados do simulador.
         # self.sio.emit('change_frequency', self.current_frequency)
+        self._emit_monitored_frequencies() # Reconexão: o relay não guarda as frequências monitoradas
         if JOYSTICK_AVAILABLE:
             self.set_ptt_hotkeys(self.ptt_key, True)
             self.start_joystick_monitor()
 
     def _on_disconnect(self):
-        print("--- DESCONECTADO do Servidor de Rádio ---")
+        log.info("DESCONECTADO do Servidor de Rádio")
+        self.codec_negotiated = False
         self.stop_transmission()
+        self.set_wire_rate(RATE) # Um relay antigo não negocia: volta à taxa padrão
+        self.tx_codec = audio_codecs.create_codec(audio_codecs.PCM16, self.wire_rate)
         if JOYSTICK_AVAILABLE:
             self.set_ptt_hotkeys(self.ptt_key, False)
 
     # NOVO MÉTODO: Envia a posição para o servidor de rádio
-    def send_position(self, lat: float, lng: float):
-        """Envia a posição atual para o servidor para cálculo de degradação."""
+    def send_position(self, lat: float, lng: float, gs: float | None = None, track: float | None = None):
+        """Envia a posição atual para o servidor para cálculo de degradação.
+        Com velocidade (gs, nós) e rumo (track, graus), o relay extrapola a posição entre atualizações."""
         if self.sio.connected and lat != 0.0 and lng != 0.0:
             try:
-                self.sio.emit('update_position', {
+                position = {
                     'lat': lat,
                     'lng': lng,
                     'pilot_id': self.pilot_id # ADICIONADO: Envia o ID do piloto para mapeamento
-                })
+                }
+                if gs is not None and track is not None:
+                    position['gs'] = gs
+                    position['track'] = track
+                self.sio.emit('update_position', position)
             except Exception:
                 pass # Ignora erros de emissão
 
@@ -282,50 +616,168 @@ class RadioClient:
     def _on_broadcast_audio(self, data):
         if not JOYSTICK_AVAILABLE or self.p is None: return
 
-        # ADIÇÃO CRÍTICA PARA DIAGNÓSTICO E CONFIRMAÇÃO DE RECEBIMENTO
+        # Diagnóstico por chunk: só formata quando o nível DEBUG de 'radio.rx' estiver ativo
         degradation_factor = data.get('factor', 0.0)
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [RÁDIO RX] Áudio recebido. Fator: {degradation_factor:.4f}")
+        if rx_log.isEnabledFor(logging.DEBUG):
+            rx_log.debug("Áudio recebido. Fator: %.4f", degradation_factor)
 
-        # NOVO: Recebe um objeto { audio: Buffer, factor: float }
+        # NOVO: Recebe um objeto { audio: Buffer, factor: float, sender: pilot_id } (sender ausente em servidores antigos)
         audio_data = data.get('audio')
 
         # 1. CALCULA A DISTÂNCIA PARA EXIBIÇÃO
         calculated_distance = reverse_degradation_factor(degradation_factor)
 
         # 2. ATUALIZA A DISTÂNCIA NA INTERFACE (SEGURANÇA CONTRA RACE CONDITION)
-        if self.master_app and self.master_app.current_frame:
+        if self.on_distance:
+            self.on_distance(calculated_distance)
+        elif self.master_app and self.master_app.current_frame:
              current_frame = self.master_app.current_frame
              # Checagem de segurança para garantir que o MonitorFrame está ativo
              if hasattr(current_frame, 'update_radio_distance'):
                 # Chama a função de atualização no thread principal (UI Thread)
                 self.master_app.after(0, lambda: current_frame.update_radio_distance(calculated_distance))
 
+        # COM de origem (relays antigos não indicam a frequência: tudo é do COM2) e volume/pan dele
+        com = self._com_for_frequency(data.get('frequency'))
+        sender = (com, data.get('sender')) # Mesmo piloto nos dois COMs: buffers separados
+        volume = self.rx_volume_factor * self.com_volumes[com]
+
+        if data.get('silence'):
+            # Remetente com PTT pressionado, mas sem fala (VAD): ruído de conforto local em vez de áudio
+            if self.stream_out and self.stream_out.is_active() and not self.is_ptt_active:
+                self.rx_mixer.push_silence(sender, degradation_factor, volume)
+            return
+
         if not audio_data: return
 
         if self.stream_out and self.stream_out.is_active() and not self.is_ptt_active:
             try:
-                processed_data = audio_data
-
-                # 3. APLICAÇÃO DE DEGRADAÇÃO BASEADA NA DISTÂNCIA (Recebida do Server)
-                if degradation_factor > 0.0 and radio_dsp:
-                     # O DSP aplica a degradação (ajustando voz e ruído) e o ganho final (OUTPUT_GAIN fixo)
-                     processed_data = radio_dsp.apply_degradation(audio_data, RATE, degradation_factor)
-
-                # 4. APLICA O VOLUME RX DO KNOB DA UI (Se houver degradação, é aplicado sobre o áudio degradado/reconstruído)
-                if self.rx_volume_factor != 1.0 and hasattr(np, 'frombuffer'):
-                    audio_np = np.frombuffer(processed_data, dtype=np.int16)
-                    audio_np = (audio_np * self.rx_volume_factor).astype(np.int16)
-                    processed_data = audio_np.tobytes()
-
-                self.stream_out.write(processed_data)
+                # 3-4. DEGRADAÇÃO BASEADA NA DISTÂNCIA (Recebida do Server) e VOLUME RX do knob, por remetente,
+                # enfileirados no buffer do remetente (o callback de saída mixa): não bloqueia o thread do Socket.IO
+                self.rx_mixer.push(sender, audio_data, degradation_factor, volume,
+                                   codec=data.get('codec', audio_codecs.PCM16), rate=data.get('rate', RATE),
+                                   frame_ms=data.get('frame_ms'), pan=self.com_pans[com])
 
             except Exception:
                 pass
 
+    def _com_for_frequency(self, frequency) -> str:
+        """COM que recebeu o áudio: o monitorado só quando a frequência é a dele e não a do TX."""
+        if frequency is not None and frequency == self.monitored_frequency and frequency != self.current_frequency:
+            return COM_MONITOR
+        return COM_TX
+
+    def _record_rx(self, sender, pcm, rate):
+        """Gancho do mixer: chunk recebido já processado -> gravador, com a frequência do COM que o recebeu."""
+        com, pilot = sender if isinstance(sender, tuple) else (COM_TX, sender)
+        if pilot == rx_mixer.LOCAL_SENDER: # Squelch tail do próprio PTT não é recepção
+            return
+        frequency = self.monitored_frequency if com == COM_MONITOR else self.current_frequency
+        self.rx_recorder.record(sender, pilot, frequency, com, pcm, rate)
+
+    def replay_last_transmission(self) -> bool:
+        """Repete a última transmissão recebida ("say again?") pelo mixer, junto com a recepção ao vivo."""
+        if self.rx_recorder is None or not (self.stream_out and self.stream_out.is_active()):
+            return False
+        marker, pcm, rate = self.rx_recorder.transmission_audio()
+        if marker is None or not pcm:
+            log.info("Nenhuma transmissão gravada para repetir.")
+            return False
+        wire_rate = self.wire_rate
+        if rate != wire_rate: # Gravada antes de uma renegociação da taxa de rede
+            resampled = radio_dsp.PolyphaseResampler(rate, wire_rate).process(np.frombuffer(pcm, dtype=np.int16).astype(np.float32))
+            pcm = radio_dsp.float_to_int16(resampled).tobytes()
+        self._replay_generation += 1
+        threading.Thread(target=self._replay_loop, args=(self._replay_generation, pcm, wire_rate, self.com_pans.get(marker['com'], 0.0)),
+                         daemon=True).start()
+        log.info("Repetindo a transmissão de %s em %s (%.1f s).", marker['sender'], marker['frequency'], marker['duration_s'])
+        return True
+
+    def _replay_loop(self, generation, pcm, wire_rate, pan):
+        """Entrega a repetição ao mixer em tempo real, um chunk por vez (o jitter buffer descartaria o bloco inteiro)."""
+        step = self.chunk * 2
+        period = self.chunk / wire_rate
+        deadline = time.monotonic()
+        for offset in range(0, len(pcm), step):
+            # Nova repetição, PTT pressionado ou saída fechada interrompem esta
+            if generation != self._replay_generation or self.is_ptt_active or self.stream_out is None:
+                return
+            self.rx_mixer.push(rx_recorder.REPLAY_SENDER, pcm[offset:offset + step], processed=True, rate=wire_rate, pan=pan)
+            deadline += period
+            time.sleep(max(0.0, deadline - time.monotonic()))
+
+    def _on_codec_selected(self, data):
+        """O relay escolheu o codec e a taxa de rede comuns a todos os clientes (mudam quando clientes entram/saem)."""
+        if self.is_ptt_active:
+            self._pending_selection = data # Aplicada quando o PTT for liberado (o thread de TX usa o codec atual)
+            return
+        name = (data or {}).get('codec', audio_codecs.PCM16)
+        rate = (data or {}).get('rate', RATE)
+        if rate not in self.offered_rates:
+            log.warning("Taxa de rede %s indicada pelo relay não é suportada; usando %d Hz.", rate, RATE)
+            rate = RATE
+        self.set_wire_rate(rate)
+        try:
+            codec = audio_codecs.create_codec(name, rate)
+        except ValueError:
+            log.warning("Codec '%s' indicado pelo relay não é suportado; usando PCM cru.", name)
+            codec = audio_codecs.create_codec(audio_codecs.PCM16, rate)
+        self.tx_codec = codec
+        self.codec_negotiated = True
+        log.info("Codec de áudio negociado: %s a %d Hz", codec.name, rate)
+
+    def set_wire_rate(self, rate: int):
+        """Troca a taxa de rede (fora de uma transmissão): recria as cadeias DSP, o mixer e o conversor da saída."""
+        if rate == self.wire_rate:
+            return
+        self.wire_rate = rate
+        self.chunk = chunk_for_rate(rate)
+        self.tx_chain = radio_dsp.RadioDSPChain(rate, self.chunk)
+        self.loopback_chain = radio_dsp.RadioDSPChain(rate, self.chunk)
+        if self.vad:
+            self.vad.sample_rate = rate
+        self.rx_mixer.set_sample_rate(rate, self.chunk)
+        self._output_resampler = self._make_output_resampler()
+        log.info("Taxa de rede: %d Hz (chunk de %d amostras).", rate, self.chunk)
+
+    def _device_index(self, direction: str, allow_refresh: bool = False):
+        """
+        Índice atual do dispositivo configurado (input/output), localizado pelo nome e API salvos.
+        Com `allow_refresh` (sem streams abertos), reenumera uma vez se o dispositivo salvo não estiver
+        no catálogo (conectado depois do início do programa).
+        """
+        index = self.config.get(f'{direction}_device_index')
+        name = self.config.get(f'{direction}_device_name')
+        host_api = self.config.get(f'{direction}_device_host_api')
+        resolved = self.audio_host.resolve(direction, index, name, host_api)
+        if resolved is None and name and allow_refresh:
+            self.audio_host.refresh()
+            resolved = self.audio_host.resolve(direction, index, name, host_api)
+        if resolved is None and index is not None:
+            log.warning("Dispositivo de %s configurado não encontrado: %s", direction, name or index)
+        return resolved
+
+    def _device_rate(self, device_index) -> int:
+        """Taxa nativa do dispositivo (defaultSampleRate); a taxa de rede se desativado ou desconhecida."""
+        if not self.native_rate_enabled:
+            return self.wire_rate
+        info = self.audio_host.device_info(device_index)
+        return info['default_rate'] if info and info['default_rate'] > 0 else self.wire_rate
+
+    def _candidate_rates(self, device_index):
+        """Taxas tentadas ao abrir um dispositivo: a nativa e, se ela falhar, a de rede (conversão pelo driver)."""
+        native = self._device_rate(device_index)
+        return [native] if native == self.wire_rate else [native, self.wire_rate]
+
+    def _make_output_resampler(self):
+        if self.output_rate == self.wire_rate:
+            return None
+        return radio_dsp.PullResampler(self.rx_mixer.pull, self.wire_rate, self.output_rate, self.output_channels)
+
     def _on_frequency_changed(self, freq):
         self.current_frequency = freq
         # O MonitorFrame do Skymetrics não é atualizado diretamente aqui, apenas o estado interno.
-        print(f"[RÁDIO] Frequência sintonizada: {self.current_frequency}")
+        log.info("Frequência sintonizada: %s", self.current_frequency)
 
     # --- Métodos de Conexão e Desconexão ---
 
@@ -345,14 +797,17 @@ class RadioClient:
         self.stop_transmission()
 
         if JOYSTICK_AVAILABLE:
+            self._replay_generation += 1 # Interrompe uma repetição em andamento
             self.stop_audio_streams()
             self.set_ptt_hotkeys(self.ptt_key, False)
+            if self.rx_recorder:
+                log.info("Gravador RX encerrado.", extra={'fields': self.rx_recorder.get_stats()})
+                self.rx_recorder.close()
 
         if self.sio.connected:
             self.sio.disconnect()
 
-        if self.joystick_thread and self.joystick_thread.is_alive():
-            pass
+        self.stop_joystick_monitor()
 
     def tune_frequency(self, new_freq_str):
         """Envia a nova frequência ao servidor (chamada pelo ws_monitor)."""
@@ -362,8 +817,30 @@ class RadioClient:
             if self.sio.connected:
                 self.sio.emit('change_frequency', new_freq)
                 self.current_frequency = new_freq
+                self._emit_monitored_frequencies() # O COM1 pode ter deixado de coincidir com o COM2
+        except ValueError:
+            log.warning("Tentativa de sintonizar frequência inválida: %s", new_freq_str)
+
+    def monitor_frequency(self, new_freq_str):
+        """Frequência do COM1, recebida na mesma conexão que o COM2 (dual-watch; chamada pelo ws_monitor)."""
+        new_freq = new_freq_str.strip()
+        try:
+            float(new_freq)
         except ValueError:
-            print(f"[RÁDIO] Tentativa de sintonizar frequência inválida: {new_freq_str}")
+            log.warning("Tentativa de monitorar frequência inválida: %s", new_freq_str)
+            return
+        self.monitored_frequency = new_freq
+        self._emit_monitored_frequencies()
+
+    def _emit_monitored_frequencies(self):
+        """Envia ao relay as frequências só de escuta (vazia sem dual-watch ou com COM1 = COM2)."""
+        monitored = self.monitored_frequency
+        frequencies = [monitored] if self.dual_watch_enabled and monitored and monitored != self.current_frequency else []
+        if self.sio.connected:
+            try:
+                self.sio.emit('monitor_frequencies', frequencies)
+            except Exception:
+                pass # Relay antigo: o evento é ignorado e só o COM2 é recebido
 
     # --- Métodos de Áudio e Streaming ---
 
@@ -373,20 +850,70 @@ class RadioClient:
 
         self.stop_audio_streams()
 
-        output_index = self.config.get('output_device_index')
+        for attempt in range(2):
+            # Dispositivos pelo nome/API salvos (o índice muda quando algo é conectado ou removido)
+            input_index = self._device_index(audio_host.INPUT, allow_refresh=not attempt) if self.warm_capture_enabled else None
+            output_index = self._device_index(audio_host.OUTPUT, allow_refresh=not attempt)
+            if self._open_streams(input_index, output_index) or output_index is None or attempt:
+                return self.stream_out is not None
+            # O catálogo pode estar desatualizado (dispositivo reconectado): reenumera e tenta mais uma vez
+            self.stop_audio_streams()
+            self.audio_host.refresh()
+        return False
+
+    def _open_streams(self, input_index, output_index) -> bool:
+        """Abre a captura contínua (se ativa) e o stream de saída. Retorna True se a saída abriu."""
+        if input_index is not None:
+            self.start_warm_capture(input_index)
 
         if output_index is not None:
-            try:
-                self.stream_out = self.p.open(format=FORMAT, channels=CHANNELS, rate=RATE, output=True, output_device_index=output_index)
-                return True
-            except Exception as e:
-                print(f"[RÁDIO] ERRO ao iniciar Saída: {e}")
-                return False
+            self.rx_mixer.set_channels(self.output_channels)
+            self.rx_mixer.reset()
+            error = None
+            for rate in self._candidate_rates(output_index):
+                try:
+                    # Período com a mesma duração de OUTPUT_FRAMES a RATE (~22 ms)
+                    frames = max(1, round(OUTPUT_FRAMES * rate / RATE))
+                    self.output_rate = rate
+                    self._output_resampler = self._make_output_resampler()
+                    self.stream_out = self.p.open(format=FORMAT, channels=self.output_channels, rate=rate, output=True,
+                                                  output_device_index=output_index, frames_per_buffer=frames,
+                                                  stream_callback=self._output_callback)
+                    log.info("Saída de áudio a %d Hz, %d canal(is) (rede a %d Hz).", rate, self.output_channels, self.wire_rate)
+                    return True
+                except Exception as e:
+                    error = e
+            log.error("ERRO ao iniciar Saída: %s", error)
+            return False
         return False
 
+    def _output_callback(self, in_data, frame_count, time_info, status):
+        """Callback do PyAudio (thread do PortAudio): mixa um período dos buffers de recepção (convertido à taxa do dispositivo)."""
+        if status & pyaudio.paOutputUnderflow:
+            self.frame_controller.record_underrun()
+        resampler = self._output_resampler
+        out = resampler.pull(frame_count) if resampler is not None else self.rx_mixer.pull(frame_count)
+        return out, pyaudio.paContinue
+
+    def start_warm_capture(self, input_index):
+        """Abre o microfone em modo contínuo no dispositivo `input_index`."""
+        for rate in self._candidate_rates(input_index):
+            # Bloco do driver no quadro atual; o TX remonta os quadros se o controle mudar o tamanho depois
+            capture = warm_capture.WarmCapture(self.p, input_index, rate, self.frame_controller.frame_samples(rate), CHANNELS,
+                                               self.ptt_preroll_ms, on_overflow=self.frame_controller.record_overflow)
+            if capture.start():
+                self.capture = capture
+                log.info("Captura contínua do microfone ativa a %d Hz (pré-roll de %d ms).", rate, self.ptt_preroll_ms)
+                return
+
     def stop_audio_streams(self):
         """Fecha os streams de PyAudio."""
         if self.p is None: return
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+        if self.stream_out:
+            log.info("Mixer RX encerrado.", extra={'fields': self.rx_mixer.get_stats()})
         for stream in [self.stream_in, self.stream_out]:
             if stream:
                 try:
@@ -405,17 +932,46 @@ class RadioClient:
             return
 
         self.is_ptt_active = True
+        self._ptt_down_time = time.perf_counter()
 
-        input_index = self.config.get('input_device_index')
+        input_index = self.capture.device_index if self.capture else self._device_index(audio_host.INPUT)
         if input_index is None:
             self.is_ptt_active = False
             return
 
         try:
-            self.stream_in = self.p.open(format=FORMAT, channels=CHANNELS, rate=RATE, input=True, frames_per_buffer=CHUNK, input_device_index=input_index)
+            self.update_frame_size()
+            if self.capture and self.capture.is_active():
+                # Captura contínua: o microfone já está aberto, o PTT só libera os chunks (com o pré-roll)
+                self.capture.open_gate()
+                capture_rate = self.capture.rate
+            else:
+                self.stream_in, capture_rate, error = None, None, None
+                for rate in self._candidate_rates(input_index):
+                    try:
+                        self.stream_in = self.p.open(format=FORMAT, channels=CHANNELS, rate=rate, input=True,
+                                                     frames_per_buffer=self.frame_controller.frame_samples(rate),
+                                                     input_device_index=input_index)
+                        capture_rate = rate
+                        break
+                    except Exception as e:
+                        error = e
+                if self.stream_in is None:
+                    raise error
+                self._capture_frames = self.frame_controller.frame_samples(capture_rate)
+            # Microfone -> quadros exatos do tamanho atual na taxa de rede (reamostrados se o dispositivo
+            # estiver em outra taxa; filtro em cache, estado por transmissão)
+            self._capture_resampler = radio_dsp.FrameResampler(capture_rate, self.wire_rate,
+                                                               self.frame_controller.frame_samples(self.wire_rate))
+            # Nova transmissão: o estado do filtro não deve carregar o fim da anterior
+            self.tx_chain.reset()
+            self.loopback_chain.reset()
+            self.tx_codec.reset()
+            if self.vad:
+                self.vad.start()
             threading.Thread(target=self.transmit_audio, daemon=True).start()
         except Exception as e:
-            print(f"[RÁDIO] ERRO ao iniciar Microfone: {e}")
+            log.error("ERRO ao iniciar Microfone: %s", e)
             self.is_ptt_active = False
 
     def transmit_audio(self):
@@ -424,51 +980,120 @@ class RadioClient:
             self.stop_transmission()
             return
 
+        capture = self.capture if self.capture and self.capture.is_active() else None
+        first_chunk = True
+        in_silence = False
+        last_marker = 0.0
+        sent_chunks = suppressed_chunks = 0
+        # Cadeias, codec e taxa fixos durante a transmissão (uma renegociação só vale após o PTT)
+        tx_chain, loopback_chain, tx_codec = self.tx_chain, self.loopback_chain, self.tx_codec
+        wire_rate, resampler = self.wire_rate, self._capture_resampler
+
         while self.is_ptt_active and self.sio.connected:
             try:
-                raw_audio_data = self.stream_in.read(CHUNK, exception_on_overflow=False)
-
-                # 1. APLICAÇÃO DE GANHO DE MICROFONE
-                if self.mic_volume_factor != 1.0:
-                    audio_np = np.frombuffer(raw_audio_data, dtype=np.int16)
-                    audio_np = (audio_np * self.mic_volume_factor).astype(np.int16)
-                    raw_audio_data = audio_np.tobytes()
-
-                # 2. PROCESSAMENTO DSP (filtro, ruído, clipping - Standard Radio Effect)
-                # Usa o OUTPUT_GAIN fixo
-                processed_audio_data = radio_dsp.apply_radio_effect(raw_audio_data, RATE)
-
-                # 3. CONTROLE DE LOOPBACK (AJUSTADO)
-                if self.loopback_active and self.stream_out and self.stream_out.is_active():
-
-                    # Calcula o fator de degradação com a distância virtual
-                    degradation_factor = calculate_loopback_factor(self.loopback_distance_km)
-
-                    # Aplica a degradação e o volume RX do cliente
-                    if radio_dsp:
-                         # 1. Aplica a degradação (usa OUTPUT_GAIN fixo)
-                         loopback_audio = radio_dsp.apply_degradation(raw_audio_data, RATE, degradation_factor)
-
-                         # 2. Aplica o volume RX da UI por cima
-                         if self.rx_volume_factor != 1.0 and hasattr(np, 'frombuffer'):
-                             audio_np = np.frombuffer(loopback_audio, dtype=np.int16)
-                             audio_np = (audio_np * self.rx_volume_factor).astype(np.int16)
-                             loopback_audio = audio_np.tobytes()
+                if capture:
+                    raw_audio_data = capture.read()
+                    if raw_audio_data is None:
+                        continue # Nenhum chunk ainda: reavalia o PTT
+                else:
+                    try:
+                        raw_audio_data = self.stream_in.read(self._capture_frames, exception_on_overflow=True)
+                    except OSError as e:
+                        if e.errno != pyaudio.paInputOverflowed:
+                            raise
+                        # Overflow: o thread não acompanhou o driver (o bloco foi perdido); quadros maiores
+                        self.frame_controller.record_overflow()
+                        continue
+
+                # Quadro adaptativo: a mudança vale a partir do próximo quadro remontado
+                if self.update_frame_size():
+                    resampler.frame_size = self.frame_controller.frame_samples(wire_rate)
+                frame_ms = self.frame_controller.frame_ms
+
+                # Microfone -> quadros exatos na taxa de rede (nenhum ou mais de um por leitura)
+                for raw_audio_data in resampler.process(raw_audio_data):
+
+                    # 0. VAD: sem fala, nada de DSP nem áudio; só um marcador de silêncio periódico para o
+                    # receptor manter a transmissão aberta com ruído de conforto (relays antigos não o repassam)
+                    if self.vad and self.codec_negotiated and not self.vad.is_speech(raw_audio_data, self.mic_volume_factor):
+                        now = time.monotonic()
+                        if not in_silence or now - last_marker >= voice_activity.SILENCE_KEEPALIVE_S:
+                            self.sio.emit('audio_chunk', {'silence': True, 'codec': tx_codec.name, 'rate': wire_rate, 'frame_ms': frame_ms})
+                            last_marker = now
+                        in_silence = True
+                        suppressed_chunks += 1
+                        continue
+                    if in_silence:
+                        # A fala recomeça do silêncio: sem a cauda do filtro/reamostrador de antes da pausa
+                        in_silence = False
+                        tx_chain.reset()
+                        loopback_chain.reset()
+                        tx_codec.reset()
+
+                    # 1-2. GANHO DE MICROFONE + PROCESSAMENTO DSP (filtro, ruído, clipping - Standard Radio Effect)
+                    # Usa o OUTPUT_GAIN fixo
+                    processed_audio_data = tx_chain.process(raw_audio_data, input_gain=self.mic_volume_factor)
+
+                    # 3. CONTROLE DE LOOPBACK (AJUSTADO)
+                    if self.loopback_active and self.stream_out and self.stream_out.is_active():
+
+                        # Calcula o fator de degradação com a distância virtual
+                        degradation_factor = calculate_loopback_factor(self.loopback_distance_km)
+
+                        # Aplica a degradação (usa OUTPUT_GAIN fixo), o ganho do microfone e o volume RX do cliente
+                        loopback_audio = loopback_chain.process(raw_audio_data, degradation_factor,
+                                                                input_gain=self.mic_volume_factor, volume=self.rx_volume_factor)
+                        self.rx_mixer.push(rx_mixer.LOCAL_SENDER, loopback_audio, processed=True)
+
+                    # 4. Codifica e envia o chunk processado (volume 1.0) ao servidor (Socket.IO só envia binário como bytes)
+                    payload = tx_codec.encode(processed_audio_data)
+                    if self.codec_negotiated:
+                        # O quadro segue no chunk para o receptor dimensionar o jitter buffer
+                        self._emit_chunk({'audio': payload, 'codec': tx_codec.name, 'rate': wire_rate, 'frame_ms': frame_ms},
+                                         self.frame_controller.rtt_due(time.monotonic()))
                     else:
-                        loopback_audio = raw_audio_data # Fallback
-
-                    self.stream_out.write(loopback_audio)
+                        self.sio.emit('audio_chunk', payload) # Relay sem negociação: PCM cru, como antes
+                    sent_chunks += 1
 
-                # 4. Envia o chunk processado (volume 1.0) ao servidor
-                self.sio.emit('audio_chunk', processed_audio_data)
+                    if first_chunk:
+                        first_chunk = False
+                        self._record_ptt_latency('warm' if capture else 'cold')
 
             except Exception as e:
                 # CORREÇÃO: Trata a exceção e limpa os streams antes de quebrar o loop.
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [RÁDIO CRÍTICO] Falha no thread de transmissão: {e}. Executando stop_transmission().")
+                log.critical("Falha no thread de transmissão: %s. Executando stop_transmission().", e)
                 self.stop_transmission()
                 break
 
-            time.sleep(CHUNK / RATE / 2)
+        if suppressed_chunks:
+            log.debug("TX: %d chunks enviados, %d suprimidos pelo VAD.", sent_chunks, suppressed_chunks)
+
+    def update_frame_size(self) -> bool:
+        """Avalia o controle de quadro (janela vencida) e registra a mudança. Retorna True se o quadro mudou."""
+        controller = self.frame_controller
+        if not controller.update():
+            return False
+        log.info("Quadro de áudio ajustado para %d ms.", controller.frame_ms, extra={'fields': controller.get_stats()})
+        return True
+
+    def _emit_chunk(self, payload: dict, rtt_probe: bool):
+        """Envia um chunk negociado; com `rtt_probe`, pede ack ao relay e mede o RTT do emit."""
+        if not rtt_probe:
+            self.sio.emit('audio_chunk', payload)
+            return
+        sent = time.perf_counter()
+        controller = self.frame_controller
+        self.sio.emit('audio_chunk', payload, callback=lambda *args: controller.record_rtt((time.perf_counter() - sent) * 1000))
+
+    def _record_ptt_latency(self, mode: str):
+        """Registra o tempo entre o aperto do PTT e o primeiro chunk emitido."""
+        if self._ptt_down_time is None:
+            return
+        latency_ms = (time.perf_counter() - self._ptt_down_time) * 1000
+        self.ptt_latencies_ms.append(latency_ms)
+        avg_ms = sum(self.ptt_latencies_ms) / len(self.ptt_latencies_ms)
+        log.info("PTT: primeiro chunk emitido em %.0f ms.", latency_ms,
+                 extra={'fields': {'mode': mode, 'preroll_ms': self.ptt_preroll_ms if mode == 'warm' else 0, 'avg_ms': round(avg_ms)}})
 
     def stop_transmission(self):
         """Para a gravação e transmissão de áudio (PTT desativado) e envia o squelch tail."""
@@ -479,22 +1104,19 @@ class RadioClient:
         if JOYSTICK_AVAILABLE and self.stream_out and self.stream_out.is_active() and radio_dsp:
             # O burst é 1 chunk longo (aprox. 89ms com CHUNK=2048, RATE=23000)
             try:
-                # O módulo DSP precisa de CHUNK e RATE. Eles estão disponíveis globalmente aqui.
+                # O módulo DSP precisa do chunk e da taxa de rede atuais.
                 # A função generate_squelch_tail_burst foi adicionada ao radio_dsp.py
-                squelch_burst = radio_dsp.generate_squelch_tail_burst(CHUNK, RATE)
-
-                # Aplica o volume RX do knob da UI (se houver degradação, é aplicado sobre o áudio degradado/reconstruído)
-                if self.rx_volume_factor != 1.0 and hasattr(np, 'frombuffer'):
-                    audio_np = np.frombuffer(squelch_burst, dtype=np.int16)
-                    audio_np = (audio_np * self.rx_volume_factor).astype(np.int16)
-                    squelch_burst = audio_np.tobytes()
+                squelch_burst = radio_dsp.generate_squelch_tail_burst(self.chunk, self.wire_rate)
 
-                self.stream_out.write(squelch_burst)
+                # Aplica o volume RX do knob da UI e enfileira junto do loopback
+                self.rx_mixer.push(rx_mixer.LOCAL_SENDER, squelch_burst, volume=self.rx_volume_factor)
             except Exception as e:
                 # Se falhar, continua o processo de desligamento
-                print(f"[RÁDIO] Falha ao gerar/enviar Squelch Tail: {e}")
+                log.warning("Falha ao gerar/enviar Squelch Tail: %s", e)
 
         self.is_ptt_active = False
+        if self.capture:
+            self.capture.close_gate()
 
         if self.stream_in:
             try:
@@ -503,129 +1125,21 @@ class RadioClient:
             except: pass
             self.stream_in = None
 
-    # --- Lógica PTT e Joystick (MODIFICADA) ---
-    
-    def ptt_key_handler(self, event):
-        if event.name.lower() != self.ptt_key.lower():
-            return
-
-        if event.event_type == keyboard.KEY_DOWN and not self.is_ptt_active:
-            self.start_transmission_ptt()
-        elif event.event_type == keyboard.KEY_UP:
-            if self.is_ptt_active:
-                self.stop_transmission()
-
-    def set_ptt_hotkeys(self, key_name, register):
-        """Registra/desregistra as hotkeys PTT (apenas para TECLADO)."""
-        if not JOYSTICK_AVAILABLE:
-            return
-
-        if key_name.lower().startswith('joy_button_'):
-            return
-
-        # Remove o hook anterior, se existir.
-        if self._ptt_hook:
-            try:
-                keyboard.unhook(self._ptt_hook)
-            except (KeyError, AttributeError):
-                pass  # Ignora erros se o hook já foi removido.
-            self._ptt_hook = None
-
-        # Se a intenção é registrar, cria um novo hook.
-        if register:
-            try:
-                self._ptt_hook = keyboard.hook(self.ptt_key_handler, suppress=False)
-            except Exception as e:
-                print(f"[RÁDIO CRÍTICO] Falha ao registrar o hook do teclado: {e}")
-
-
-    def start_joystick_monitor(self):
-        """Inicia a thread de monitoramento de joystick se não estiver ativa."""
-        if not JOYSTICK_AVAILABLE: return
-
-        if (self.joystick_thread is None or not self.joystick_thread.is_alive()):
-            self.joystick_thread = threading.Thread(target=self.joystick_monitor_loop, daemon=True)
-            self.joystick_thread.start()
-
-    def joystick_monitor_loop(self):
-        """Thread dedicada para monitorar o estado do joystick (COMPLETO)."""
-        if not JOYSTICK_AVAILABLE:
-            return
-
-        try:
-            # 1. Inicialização e Busca do Joystick
-            pygame.joystick.init()
-            joysticks = [pygame.joystick.Joystick(i) for i in range(pygame.joystick.get_count())]
-        except Exception:
-            joysticks = []
-
-        if not joysticks:
-            self.current_joystick = None
-            return
-
-        self.current_joystick = joysticks[0]
-        self.current_joystick.init()
-
-        # Lógica de PTT e Captura no Loop
-        while True:
-            try:
-                pygame.event.pump() # Permite ao Pygame processar eventos
-
-                # A) Lógica de Captura (Prioridade)
-                if self.is_listening_for_ptt:
-                    for event in pygame.event.get():
-                        if event.type == pygame.locals.JOYBUTTONDOWN:
-                            if event.joy == self.current_joystick.get_id():
-                                if self.radio_config_window:
-                                    self.radio_config_window.after(0, lambda e=event: self.radio_config_window._end_ptt_capture(f"JOY_BUTTON_{e.button}"))
-                                return
-
-                # B) Lógica de Ativação PTT (Polling de Estado)
-                elif self.ptt_key.lower().startswith('joy_button_'):
-                    try:
-                        target_button_index = int(self.ptt_key.split('_')[-1])
-                    except (ValueError, IndexError):
-                        time.sleep(0.01); continue # PTT Key mal formatada
-
-                    if 0 <= target_button_index < self.current_joystick.get_numbuttons():
-                        button_state = self.current_joystick.get_button(target_button_index)
-
-                        if button_state and not self.is_ptt_active:
-                            tk.get_default_root().after(0, self.start_transmission_ptt)
-
-                        elif not button_state and self.is_ptt_active:
-                            tk.get_default_root().after(0, self.stop_transmission)
-                    else:
-                        time.sleep(0.01); continue # Índice de botão inválido
-
-                else:
-                     pygame.event.get() # Limpa o buffer de eventos se PTT não for Joystick
-
-            except Exception:
-                break # Sai do loop em caso de erro no joystick
-
-            time.sleep(0.01) # Poll rate (100 vezes por segundo)
-
-        # Cleanup
-        try:
-            pygame.joystick.quit()
-            pygame.quit()
-        except Exception:
-            pass
-        self.current_joystick = None
+        # Renegociação recebida durante a transmissão
+        if self._pending_selection is not None:
+            selection, self._pending_selection = self._pending_selection, None
+            self._on_codec_selected(selection)
 
-
-    # --- Métodos de Configuração (Volume, PTT Key) ---
-
-    def update_mic_volume_config(self, value):
-        self.mic_volume_factor = float(value)
-        self.config['mic_volume_factor'] = self.mic_volume_factor
-        save_config(self.config)
-
-    def update_rx_volume_config(self, value):
-        self.rx_volume_factor = float(value)
-        self.config['rx_volume_factor'] = self.rx_volume_factor
-        save_config(self.config)
+    def refresh_audio_devices(self):
+        """Reenumera os dispositivos (hot-plug) e reabre os streams que estavam ativos."""
+        if self.audio_host is None: return
+        if self.is_ptt_active:
+            self.stop_transmission()
+        was_running = self.stream_out is not None or self.capture is not None
+        self.stop_audio_streams()
+        self.audio_host.refresh()
+        if was_running:
+            self.start_audio_streams()
 
     def update_audio_streams(self):
         """Re-inicializa os streams após a mudança de dispositivos na config UI."""
@@ -636,18 +1150,36 @@ class RadioClient:
         self.set_ptt_hotkeys(self.ptt_key, False)
         self.set_ptt_hotkeys(self.ptt_key, True)
 
-    # NOVO: Método de atualização da distância virtual
-    def update_loopback_distance(self, value):
-        self.loopback_distance_km = float(value)
-        self.config['loopback_distance_km'] = self.loopback_distance_km
-        save_config(self.config)
+    def _apply_settings(self, changes):
+        """Aplica as alterações já gravadas na config: dual-watch ao relay e a saída reaberta se mudar entre mono e estéreo."""
+        dual_watch, channels = self.dual_watch_enabled, self.output_channels
+        self._apply_config_values()
+        if self.dual_watch_enabled != dual_watch:
+            self._emit_monitored_frequencies()
+        if self.output_channels != channels and self.stream_out is not None:
+            self.update_audio_streams()
+
+    def apply_settings(self, changes):
+        """Alterações feitas pela janela de configuração em outro processo (motor de áudio): aplica sem gravar."""
+        if not JOYSTICK_AVAILABLE: return
+        self.config.update(changes)
+        self._apply_settings(changes)
+
+    def reload_config(self):
+        """Relê o client_config.json gravado por outro processo (dispositivos trocados com o motor de áudio separado)."""
+        if not JOYSTICK_AVAILABLE: return
+        self.set_ptt_hotkeys(self.ptt_key, False)
+        self.config = load_config(reload=True)
+        self._apply_config_values()
+        self._emit_monitored_frequencies()
+        self.update_audio_streams()
 
 
 # --- CLASSE DA JANELA DE CONFIGURAÇÃO TKINTER (Mantida) ---
 
 class RadioConfigWindow(tk.Toplevel):
     def __init__(self, master, client: RadioClient):
-        print("[DIAG:WND] 1. Tentando criar TopLevel...") # Diagnóstico
+        log.debug("Janela de configuração: 1. Tentando criar TopLevel...")
         super().__init__(master)
         self.title("KAFly Comm Radio Configurações")
         self.client = client
@@ -657,7 +1189,7 @@ class RadioConfigWindow(tk.Toplevel):
         # **NOVO**: Estabelece a referência cruzada para o callback do joystick
         self.client.radio_config_window = self
 
-        if not JOYSTICK_AVAILABLE:
+        if not ensure_radio_stack(open_audio=False): # Os dispositivos vêm do cliente (o motor de áudio pode ser o dono deles)
              messagebox.showerror("Erro de Dependência", "O cliente de rádio não pode ser configurado. PyAudio ou PyGame falharam ao carregar na inicialização.")
              self.destroy()
              return
@@ -673,22 +1205,26 @@ class RadioConfigWindow(tk.Toplevel):
         # NOVO: Variável para Distância Virtual
         self.loopback_distance_var = tk.DoubleVar(self, value=client.loopback_distance_km)
 
+        # Dual-watch: COM1 monitorado, volume e pan por COM
+        self.dual_watch_var = tk.BooleanVar(self, value=client.dual_watch_enabled)
+        self.com_volume_vars = {com: tk.DoubleVar(self, value=client.com_volumes[com]) for com in (COM_MONITOR, COM_TX)}
+        self.com_pan_vars = {com: tk.DoubleVar(self, value=client.com_pans[com]) for com in (COM_MONITOR, COM_TX)}
+
         # Estilos (Usando o tema do Master)
         self.configure(bg=master.cget('bg'))
 
-        print("[DIAG:WND] 2. Iniciando carregamento de dispositivos...") # Diagnóstico
+        log.debug("Janela de configuração: 2. Iniciando carregamento de dispositivos...")
         self._load_and_setup_devices()
 
-        print("[DIAG:WND] 3. Criando widgets e botões...") # Diagnóstico
+        log.debug("Janela de configuração: 3. Criando widgets e botões...")
         self._create_widgets()
 
-        print("[DIAG:WND] 4. Janela criada com sucesso.") # Diagnóstico
+        log.debug("Janela de configuração: 4. Janela criada com sucesso.")
 
 
     def _load_and_setup_devices(self):
         """Carrega e define as variáveis com os dispositivos e configurações atuais."""
-        # Se PyAudio falhar aqui, o programa travará.
-        self.input_devices, self.output_devices = get_audio_devices()
+        self.input_devices, self.output_devices = get_audio_devices(self.client.audio_host)
 
         # Tratamento de erro se nenhum dispositivo for encontrado
         if not self.input_devices or not self.output_devices:
@@ -696,9 +1232,9 @@ class RadioConfigWindow(tk.Toplevel):
              self.destroy()
              return
 
-        # Definições iniciais de variáveis
-        self.input_var.set(get_device_name_by_index(self.client.config.get('input_device_index'), self.input_devices) or list(self.input_devices.keys())[0])
-        self.output_var.set(get_device_name_by_index(self.client.config.get('output_device_index'), self.output_devices) or list(self.output_devices.keys())[0])
+        # Definições iniciais de variáveis (dispositivo salvo localizado pelo nome/API, não só pelo índice)
+        self.input_var.set(get_device_name_by_index(self.client._device_index(audio_host.INPUT), self.input_devices) or list(self.input_devices.keys())[0])
+        self.output_var.set(get_device_name_by_index(self.client._device_index(audio_host.OUTPUT), self.output_devices) or list(self.output_devices.keys())[0])
         self.ptt_key_var.set(self.client.ptt_key.upper())
 
 
@@ -713,10 +1249,14 @@ class RadioConfigWindow(tk.Toplevel):
         audio_frame.pack(fill='x', pady=5)
 
         ttk.Label(audio_frame, text="Microfone:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-        ttk.OptionMenu(audio_frame, self.input_var, self.input_var.get(), *self.input_devices.keys(), command=self._on_device_change).grid(row=0, column=1, padx=5, sticky='ew')
+        self.input_menu = ttk.OptionMenu(audio_frame, self.input_var, self.input_var.get(), *self.input_devices.keys(), command=self._on_device_change)
+        self.input_menu.grid(row=0, column=1, padx=5, sticky='ew')
 
         ttk.Label(audio_frame, text="Alto-falante:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
-        ttk.OptionMenu(audio_frame, self.output_var, self.output_var.get(), *self.output_devices.keys(), command=self._on_device_change).grid(row=1, column=1, padx=5, sticky='ew')
+        self.output_menu = ttk.OptionMenu(audio_frame, self.output_var, self.output_var.get(), *self.output_devices.keys(), command=self._on_device_change)
+        self.output_menu.grid(row=1, column=1, padx=5, sticky='ew')
+
+        ttk.Button(audio_frame, text="Atualizar", command=self._on_refresh_devices).grid(row=0, column=2, rowspan=2, padx=5)
 
         audio_frame.columnconfigure(1, weight=1)
 
@@ -752,6 +1292,22 @@ class RadioConfigWindow(tk.Toplevel):
 
         ttk.Separator(main_frame).pack(fill='x', pady=10)
 
+        # --- Seção 2.5: Dual-watch (COM1 só recepção + COM2) ---
+        ttk.Label(main_frame, text="Dual-watch (COM1 + COM2)", font=('TkDefaultFont', 12, 'bold')).pack(anchor='w', pady=(0, 5))
+
+        com_frame = ttk.Frame(main_frame)
+        com_frame.pack(fill='x', pady=5)
+
+        ttk.Checkbutton(com_frame, text="Monitorar COM1 (só recepção)", variable=self.dual_watch_var, command=self._on_dual_watch_change).grid(row=0, column=0, columnspan=2, pady=(0, 5), sticky='w')
+        for column, com in enumerate((COM_MONITOR, COM_TX)):
+            ttk.Label(com_frame, text=f"{com.upper()}:").grid(row=1, column=column, sticky='w', padx=10)
+            VolumeKnob(com_frame, self.com_volume_vars[com], lambda value, com=com: self._on_com_volume_change(com, value), size=50).grid(row=2, column=column, padx=10, pady=5)
+            ttk.Label(com_frame, text="Pan (E / D):").grid(row=3, column=column, sticky='w', padx=10)
+            ttk.Scale(com_frame, from_=-1.0, to=1.0, orient='horizontal', variable=self.com_pan_vars[com], length=120,
+                      command=lambda value, com=com: self._on_com_pan_change(com, value)).grid(row=4, column=column, padx=10, sticky='ew')
+
+        ttk.Separator(main_frame).pack(fill='x', pady=10)
+
         # --- Seção 3: PTT ---
 
         ttk.Label(main_frame, text="Tecla PTT Atual:").pack(anchor='w', pady=(0, 5))
@@ -771,28 +1327,49 @@ class RadioConfigWindow(tk.Toplevel):
     def _on_device_change(self, selected_device):
         """Atualiza a config do cliente e notifica o RadioClient para reiniciar streams."""
 
-        # 1. Atualiza IDs na Config do Cliente
-        input_index = self.input_devices[self.input_var.get()]
-        output_index = self.output_devices[self.output_var.get()]
-
-        self.client.config['input_device_index'] = input_index
-        self.client.config['output_device_index'] = output_index
+        # 1. Atualiza IDs na Config do Cliente (com nome e API, que identificam o dispositivo após hot-plug)
+        host = self.client.audio_host
+        for direction, index in ((audio_host.INPUT, self.input_devices[self.input_var.get()]),
+                                 (audio_host.OUTPUT, self.output_devices[self.output_var.get()])):
+            info = host.device_info(index) or {}
+            self.client.config[f'{direction}_device_index'] = index
+            self.client.config[f'{direction}_device_name'] = info.get('name')
+            self.client.config[f'{direction}_device_host_api'] = info.get('host_api')
         save_config(self.client.config)
 
         # 2. Re-inicializa os streams de áudio no cliente
         self.client.update_audio_streams()
 
 
+    def _on_refresh_devices(self):
+        """Reenumera os dispositivos (headset conectado/removido com a janela aberta) e atualiza as listas."""
+        self.client.refresh_audio_devices()
+        self.input_devices, self.output_devices = get_audio_devices(self.client.audio_host)
+        for var, menu, devices, direction in ((self.input_var, self.input_menu, self.input_devices, audio_host.INPUT),
+                                              (self.output_var, self.output_menu, self.output_devices, audio_host.OUTPUT)):
+            labels = list(devices.keys())
+            if not labels:
+                continue
+            current = get_device_name_by_index(self.client._device_index(direction), devices) or labels[0]
+            menu.set_menu(current, *labels)
+
     def _on_mic_volume_change(self, value):
         self.client.update_mic_volume_config(value)
 
     def _on_rx_volume_change(self, value):
         self.client.update_rx_volume_config(value)
 
+    def _on_dual_watch_change(self):
+        self.client.update_dual_watch_config(self.dual_watch_var.get())
+
+    def _on_com_volume_change(self, com, value):
+        self.client.update_com_volume_config(com, value)
+
+    def _on_com_pan_change(self, com, value):
+        self.client.update_com_pan_config(com, value)
+
     def _on_loopback_change(self):
-        self.client.config['loopback_active'] = self.loopback_active_var.get()
-        self.client.loopback_active = self.loopback_active_var.get()
-        save_config(self.client.config)
+        self.client.update_loopback_config(self.loopback_active_var.get())
 
     def _on_loopback_distance_change(self, value):
         """Callback para o ajuste da escala de distância."""
@@ -854,6 +1431,5 @@ class RadioConfigWindow(tk.Toplevel):
         if self.client:
             self.client.radio_config_window = None
 
-        self.client.config['loopback_active'] = self.loopback_active_var.get()
-        save_config(self.client.config)
+        self.client.update_loopback_config(self.loopback_active_var.get())
         self.destroy()
\ No newline at end of file
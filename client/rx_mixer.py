@@ -0,0 +1,231 @@
+# Arquivo: client/rx_mixer.py
+
+import threading
+from typing import Dict, Any
+
+import numpy as np
+
+import audio_codecs
+import radio_dsp
+from jitter_buffer import JitterBuffer, JITTER_TARGET_MS
+from log_utils import get_logger
+
+rx_log = get_logger('radio.rx')
+
+# --- CONSTANTES DO MIXER DE RECEPÇÃO ---
+MAX_TALKERS = 8             # Transmissões simultâneas mixadas; remetentes além disso são ignorados
+TALKER_IDLE_S = 5.0         # Remetente sem áudio por esse tempo sai do mixer
+LOCAL_SENDER = '__local__'  # Loopback e squelch tail do próprio cliente
+LIMITER_THRESHOLD = 0.9 * radio_dsp.MAX_INT_16
+LIMITER_RELEASE = 0.05      # Fração recuperada por período do dispositivo (~0,5 s até o ganho unitário)
+
+
+def pan_gains(pan: float):
+    """Ganhos (esquerda, direita) do balanço: 0 = centro (ganho unitário nos dois), -1 = só esquerda, +1 = só direita."""
+    pan = min(max(float(pan), -1.0), 1.0)
+    return min(1.0, 1.0 - pan), min(1.0, 1.0 + pan)
+
+
+class _Talker:
+    """Um remetente: jitter buffer, cadeia DSP e decodificador próprios (estados independentes)."""
+    def __init__(self, sample_rate: int, chunk_size: int, target_ms: float):
+        self.sample_rate = sample_rate
+        self.buffer = JitterBuffer(sample_rate, target_ms)
+        self.chain = radio_dsp.RadioDSPChain(sample_rate, chunk_size)
+        self.decoder = None
+        self.pan = 0.0
+
+    def decode(self, payload, codec: str):
+        """Decodifica o chunk para PCM int16 (o codec pode mudar após uma renegociação)."""
+        if codec == audio_codecs.PCM16:
+            return payload
+        if self.decoder is None or self.decoder.name != codec:
+            self.decoder = audio_codecs.create_codec(codec, self.sample_rate)
+        return self.decoder.decode(payload)
+
+
+class RxMixer:
+    """
+    Mixer da recepção: cada remetente tem seu buffer e sua degradação (`factor`); o callback de
+    saída retira um período de cada um e soma tudo em uma única passada float32, com limitador
+    de pico. Transmissões simultâneas tocam ao mesmo tempo em vez de enfileiradas.
+    Com `channels=2` a saída é estéreo intercalada e cada remetente é posicionado pelo seu `pan`
+    (dual-watch: COM1 e COM2 em lados diferentes).
+    """
+    def __init__(self, sample_rate: int, chunk_size: int, target_ms: float = JITTER_TARGET_MS, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.target_ms = target_ms
+        self.channels = channels
+        self._lock = threading.Lock()
+        self._talkers: Dict[Any, _Talker] = {}
+        self._frames = np.zeros((MAX_TALKERS, 0), dtype=np.int16)
+        self._mix = np.empty(0, dtype=np.float32)
+        self._peak = np.empty(0, dtype=np.float32)
+        self._out = np.empty(0, dtype=np.int16)
+        self._pans = np.zeros((MAX_TALKERS, 2), dtype=np.float32)
+        self._mix2 = np.empty((2, 0), dtype=np.float32)
+        self._out2 = np.empty((0, 2), dtype=np.int16)
+        self._gain = 1.0
+        self.limited_periods = 0
+        self.rejected_chunks = 0
+        self.on_processed = None # on_processed(sender, pcm, taxa): áudio de rede após o DSP (gravador RX)
+
+    def reset(self):
+        """Remove todos os remetentes (novo stream de saída)."""
+        with self._lock:
+            self._talkers.clear()
+            self._gain = 1.0
+            self.limited_periods = 0
+            self.rejected_chunks = 0
+
+    def set_channels(self, channels: int):
+        """Mono ou estéreo (novo stream de saída)."""
+        with self._lock:
+            self.channels = channels
+            self._talkers.clear()
+
+    def set_sample_rate(self, sample_rate: int, chunk_size: int):
+        """Nova taxa de rede negociada: os remetentes são recriados na nova taxa."""
+        with self._lock:
+            self.sample_rate = sample_rate
+            self.chunk_size = chunk_size
+            self._talkers.clear()
+
+    def _talker(self, sender) -> _Talker | None:
+        with self._lock:
+            talker = self._talkers.get(sender)
+            if talker is None:
+                if len(self._talkers) >= MAX_TALKERS:
+                    self.rejected_chunks += 1
+                    return None
+                talker = self._talkers[sender] = _Talker(self.sample_rate, self.chunk_size, self.target_ms)
+                rx_log.debug("Novo remetente no mixer: %s (%d ativos)", sender, len(self._talkers))
+            return talker
+
+    def push(self, sender, pcm, degradation_factor: float = 0.0, volume: float = 1.0, processed: bool = False,
+             codec: str = audio_codecs.PCM16, rate: int | None = None, frame_ms: float | None = None, pan: float = 0.0):
+        """
+        Decodifica o chunk (`codec` negociado), aplica a degradação e o volume do remetente e enfileira no buffer dele
+        (`pan` só tem efeito na saída estéreo).
+        Com `processed=True` o áudio já passou pelo DSP (loopback, squelch tail) e é enfileirado como está.
+        Chunks em outra taxa de rede (`rate`, durante uma renegociação) são descartados; `frame_ms`
+        (quadro sinalizado pelo remetente) limita a profundidade mínima do buffer dele.
+        """
+        if rate is not None and rate != self.sample_rate:
+            self.rejected_chunks += 1
+            return
+        talker = self._talker(sender)
+        if talker is None:
+            return
+        try:
+            pcm = talker.decode(pcm, codec)
+        except ValueError:
+            self.rejected_chunks += 1 # Codec desconhecido (cliente mais novo na rede)
+            return
+        if not processed:
+            if degradation_factor > 0.0:
+                pcm = talker.chain.process(pcm, degradation_factor, volume=volume)
+            elif volume != 1.0:
+                pcm = talker.chain.apply_volume(pcm, volume)
+            talker.buffer.set_comfort_noise(radio_dsp.degradation_noise_level(degradation_factor), volume)
+            hook = self.on_processed
+            if hook is not None:
+                hook(sender, pcm, self.sample_rate)
+        if frame_ms:
+            talker.buffer.set_frame_ms(frame_ms)
+        talker.pan = pan
+        talker.buffer.push(pcm)
+
+    def push_silence(self, sender, degradation_factor: float = 0.0, volume: float = 1.0):
+        """Marcador de silêncio do remetente (VAD no TX): o receptor sintetiza ruído de conforto no lugar do áudio."""
+        talker = self._talker(sender)
+        if talker is None:
+            return
+        talker.buffer.set_comfort_noise(radio_dsp.degradation_noise_level(degradation_factor), volume)
+        talker.buffer.mark_silence()
+
+    def pull(self, frame_count: int) -> bytes:
+        """Um período do dispositivo: soma os remetentes ativos (float32), limita e converte para int16."""
+        if self.channels == 2:
+            return self._pull_stereo(frame_count)
+        if self._mix.shape[0] < frame_count:
+            if self._frames.shape[1] < frame_count:
+                self._frames = np.zeros((MAX_TALKERS, frame_count), dtype=np.int16)
+            self._mix = np.empty(frame_count, dtype=np.float32)
+            self._peak = np.empty(frame_count, dtype=np.float32)
+            self._out = np.empty(frame_count, dtype=np.int16)
+        out = self._out[:frame_count]
+
+        with self._lock:
+            for sender in [s for s, t in self._talkers.items() if t.buffer.is_idle(TALKER_IDLE_S)]:
+                del self._talkers[sender]
+            talkers = list(self._talkers.values())
+
+        if not talkers:
+            out.fill(0)
+            return out.tobytes()
+        if len(talkers) == 1:
+            talkers[0].buffer.pull_into(out) # Caso comum: sem soma nem limitador
+            return out.tobytes()
+
+        frames = self._frames[:len(talkers), :frame_count]
+        for row, talker in zip(frames, talkers):
+            talker.buffer.pull_into(row)
+        mix = self._mix[:frame_count]
+        np.sum(frames, axis=0, dtype=np.float32, out=mix)
+        self._limit(mix, float(np.abs(mix, out=self._peak[:frame_count]).max()))
+        np.copyto(out, mix, casting='unsafe')
+        return out.tobytes()
+
+    def _pull_stereo(self, frame_count: int) -> bytes:
+        """Período estéreo: cada remetente entra nos dois canais com os ganhos do seu pan (uma multiplicação de matriz)."""
+        if self._mix2.shape[1] < frame_count:
+            if self._frames.shape[1] < frame_count:
+                self._frames = np.zeros((MAX_TALKERS, frame_count), dtype=np.int16)
+            self._mix2 = np.empty((2, frame_count), dtype=np.float32)
+            self._out2 = np.empty((frame_count, 2), dtype=np.int16)
+        out = self._out2[:frame_count]
+
+        with self._lock:
+            for sender in [s for s, t in self._talkers.items() if t.buffer.is_idle(TALKER_IDLE_S)]:
+                del self._talkers[sender]
+            talkers = list(self._talkers.values())
+
+        if not talkers:
+            out.fill(0)
+            return out.tobytes()
+
+        frames = self._frames[:len(talkers), :frame_count]
+        pans = self._pans[:len(talkers)]
+        for row, gains, talker in zip(frames, pans, talkers):
+            talker.buffer.pull_into(row)
+            gains[:] = pan_gains(talker.pan)
+        mix = self._mix2[:, :frame_count]
+        np.matmul(pans.T, frames, out=mix)
+        self._limit(mix, float(np.abs(mix).max()))
+        np.copyto(out, mix.T, casting='unsafe')
+        return out.tobytes()
+
+    def _limit(self, mix, peak: float):
+        """Limitador: ataque imediato ao pico, liberação gradual entre períodos (e saturação final em int16)."""
+        target_gain = LIMITER_THRESHOLD / peak if peak > LIMITER_THRESHOLD else 1.0
+        if target_gain < self._gain:
+            self._gain = target_gain
+        else:
+            self._gain += (1.0 - self._gain) * LIMITER_RELEASE
+        if self._gain < 1.0:
+            self.limited_periods += 1
+            mix *= np.float32(self._gain)
+        np.clip(mix, radio_dsp.INT16_MIN, radio_dsp.MAX_INT_16, out=mix)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores somados dos remetentes ativos, número de remetentes e atuação do limitador."""
+        with self._lock:
+            talkers = list(self._talkers.values())
+        stats: Dict[str, Any] = {'talkers': len(talkers), 'limited_periods': self.limited_periods, 'rejected_chunks': self.rejected_chunks}
+        for talker in talkers:
+            for key, value in talker.buffer.get_stats().items():
+                if key not in ('depth_ms', 'target_ms'):
+                    stats[key] = stats.get(key, 0) + value
+        return stats
@@ -0,0 +1,216 @@
+# Arquivo: client/rx_recorder.py
+
+import collections
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Dict, Any, List, Iterator, Tuple
+
+import audio_codecs
+from log_utils import get_logger
+
+log = get_logger('radio.rx')
+
+# --- CONSTANTES DO GRAVADOR DE RECEPÇÃO ---
+RECORDER_SECONDS = 60           # Janela mantida em memória ("say again?")
+RECORDER_CODEC = audio_codecs.ULAW # 8 bits/amostra e sem estado: cada quadro decodifica sozinho
+RECORDER_OVERLAP = 2            # Transmissões simultâneas cabem na janela (o anel é dimensionado para 2 vozes)
+TX_GAP_S = 1.0                  # Pausa do mesmo remetente que encerra a transmissão (marcador novo na próxima)
+MAX_FRAMES_PER_S = 100          # Tamanho do índice de quadros (8 remetentes x ~11 quadros/s, com folga)
+MAX_TRANSMISSIONS = 256         # Marcadores mantidos (os mais antigos saem junto com o áudio)
+REPLAY_SENDER = '__replay__'    # Remetente do mixer usado na repetição
+
+# --- ARQUIVO DA SESSÃO (opcional, só acrescenta) ---
+# Cabeçalho ARCHIVE_MAGIC seguido de registros <tipo:1 byte><tamanho:uint32><conteúdo>:
+#   b'T' marcador da transmissão (JSON: id, sender, frequency, com, start, rate, codec)
+#   b'F' quadro (uint32 id da transmissão + float64 instante epoch + áudio no codec do marcador)
+# Um arquivo interrompido (queda do programa) continua legível até o último registro completo.
+ARCHIVE_MAGIC = b'SKRX1\n'
+ARCHIVE_EXTENSION = '.skrx'
+ARCHIVE_QUEUE_MAX = 512         # Registros aguardando a thread de gravação; além disso são descartados
+_RECORD_HEADER = struct.Struct('<cI')
+_FRAME_HEADER = struct.Struct('<Id')
+
+
+class RxRecorder:
+    """
+    Gravador dos últimos RECORDER_SECONDS de recepção, já processados pelo DSP (um quadro por chunk
+    de cada remetente), comprimidos em μ-law num anel de bytes de tamanho fixo. Cada transmissão tem
+    um marcador (remetente, frequência, COM, início); a memória não cresce com a duração da sessão.
+    Com `archive_dir`, os mesmos registros são acrescentados a um arquivo da sessão por uma thread de fundo.
+    """
+    def __init__(self, seconds: float = RECORDER_SECONDS, archive_dir: str | None = None):
+        self.seconds = seconds
+        self.capacity = int(seconds * max(audio_codecs.WIRE_RATE_PREFERENCE) * RECORDER_OVERLAP)
+        self._ring = bytearray(self.capacity)
+        self._write_pos = 0 # Bytes escritos desde a criação (posição absoluta)
+        self._lock = threading.Lock()
+        self._frames = collections.deque(maxlen=int(seconds * MAX_FRAMES_PER_S)) # (posição, tamanho, marcador, instante)
+        self._transmissions = collections.deque(maxlen=MAX_TRANSMISSIONS)
+        self._open: Dict[Any, Dict[str, Any]] = {} # Transmissão em andamento por chave do mixer
+        self._codec = audio_codecs.create_codec(RECORDER_CODEC, max(audio_codecs.WIRE_RATE_PREFERENCE))
+        self._next_id = 1
+        self.archive_path = None
+        self.archive_dropped = 0
+        self._archive_queue = None
+        self._archive_thread = None
+        if archive_dir:
+            self._start_archive(archive_dir)
+
+    # --- Gravação (thread do Socket.IO, via RxMixer.on_processed) ---
+
+    def record(self, key, sender, frequency, com, pcm, rate: int):
+        """Acrescenta um chunk pós-DSP do remetente `key` (abre um marcador novo após TX_GAP_S sem áudio dele)."""
+        encoded = self._codec.encode(pcm)
+        size = len(encoded)
+        if size == 0 or size > self.capacity:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tx = self._open.get(key)
+            if tx is None or now - tx['_last'] > TX_GAP_S or tx['rate'] != rate:
+                tx = {'id': self._next_id, 'sender': sender, 'frequency': frequency, 'com': com, 'start': time.time(),
+                      'rate': rate, 'codec': RECORDER_CODEC, 'samples': 0, '_last': now}
+                self._next_id += 1
+                self._transmissions.append(tx)
+                self._open[key] = tx
+                self._archive(b'T', json.dumps(self._public(tx)).encode('utf-8'))
+
+            start = self._write_pos % self.capacity
+            first = min(size, self.capacity - start)
+            self._ring[start:start + first] = encoded[:first]
+            self._ring[:size - first] = encoded[first:]
+            self._frames.append((self._write_pos, size, tx, now))
+            self._write_pos += size
+            tx['samples'] += size # μ-law: 1 byte por amostra
+            tx['_last'] = now
+            self._evict(now)
+        self._archive(b'F', _FRAME_HEADER.pack(tx['id'], time.time()) + encoded)
+
+    def _evict(self, now: float):
+        """Remove quadros sobrescritos no anel ou fora da janela, marcadores sem áudio e transmissões encerradas."""
+        oldest_pos = self._write_pos - self.capacity
+        frames = self._frames
+        while frames and (frames[0][0] < oldest_pos or now - frames[0][3] > self.seconds):
+            frames.popleft()
+        oldest_time = frames[0][3] if frames else now
+        while self._transmissions and self._transmissions[0]['_last'] < oldest_time:
+            self._transmissions.popleft()
+        for key in [k for k, tx in self._open.items() if now - tx['_last'] > TX_GAP_S]:
+            del self._open[key]
+
+    # --- Consulta e repetição ---
+
+    @staticmethod
+    def _public(tx: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in tx.items() if not k.startswith('_') and k != 'samples'}
+
+    def transmissions(self) -> List[Dict[str, Any]]:
+        """Marcadores ainda na janela, do mais antigo ao mais recente (com a duração gravada)."""
+        with self._lock:
+            return [dict(self._public(tx), duration_s=round(tx['samples'] / tx['rate'], 2)) for tx in self._transmissions]
+
+    def transmission_audio(self, tx_id: int | None = None) -> Tuple[Dict[str, Any] | None, bytes, int]:
+        """(marcador, PCM int16, taxa) da transmissão `tx_id` (padrão: a última); (None, b'', 0) se não houver."""
+        with self._lock:
+            if not self._transmissions:
+                return None, b'', 0
+            tx = self._transmissions[-1] if tx_id is None else next((t for t in self._transmissions if t['id'] == tx_id), None)
+            if tx is None:
+                return None, b'', 0
+            oldest_pos = self._write_pos - self.capacity
+            chunks = []
+            for pos, size, frame_tx, _ in self._frames:
+                if frame_tx is tx and pos >= oldest_pos:
+                    start = pos % self.capacity
+                    first = min(size, self.capacity - start)
+                    chunks.append(bytes(self._ring[start:start + first]) + bytes(self._ring[:size - first]))
+            marker = dict(self._public(tx), duration_s=round(tx['samples'] / tx['rate'], 2))
+        return marker, b''.join(self._codec.decode(chunk) for chunk in chunks), tx['rate']
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'transmissions': len(self._transmissions), 'frames': len(self._frames),
+                    'buffer_bytes': self.capacity, 'archive_dropped': self.archive_dropped}
+
+    # --- Arquivo da sessão ---
+
+    def _start_archive(self, archive_dir: str):
+        try:
+            os.makedirs(archive_dir, exist_ok=True)
+            base = os.path.join(archive_dir, time.strftime('rx_%Y%m%d_%H%M%S'))
+            path, suffix = base + ARCHIVE_EXTENSION, 1
+            while os.path.exists(path): # Duas sessões no mesmo segundo (reconexão): arquivos separados
+                path, suffix = f"{base}_{suffix}{ARCHIVE_EXTENSION}", suffix + 1
+            archive_file = open(path, 'xb')
+            archive_file.write(ARCHIVE_MAGIC)
+        except OSError as e:
+            log.error("Arquivo de gravação do rádio indisponível (%s): %s", archive_dir, e)
+            return
+        self.archive_path = path
+        self._archive_queue = queue.Queue(ARCHIVE_QUEUE_MAX)
+        self._archive_thread = threading.Thread(target=self._archive_loop, args=(archive_file,), daemon=True)
+        self._archive_thread.start()
+        log.info("Gravando a recepção do rádio em %s", path)
+
+    def _archive(self, kind: bytes, payload: bytes):
+        if self._archive_queue is None:
+            return
+        try:
+            self._archive_queue.put_nowait(_RECORD_HEADER.pack(kind, len(payload)) + payload)
+        except queue.Full:
+            self.archive_dropped += 1
+
+    def _archive_loop(self, archive_file):
+        """Thread de gravação: escreve os registros na ordem e descarrega o buffer quando a fila esvazia."""
+        with archive_file:
+            while True:
+                record = self._archive_queue.get()
+                if record is None:
+                    break
+                try:
+                    archive_file.write(record)
+                    if self._archive_queue.empty():
+                        archive_file.flush()
+                except OSError as e:
+                    log.error("Falha ao gravar %s: %s", self.archive_path, e)
+                    break
+
+    def close(self):
+        """Conclui o arquivo da sessão (o áudio em memória continua disponível)."""
+        archive_queue, self._archive_queue = self._archive_queue, None
+        if archive_queue is not None:
+            archive_queue.put(None)
+            self._archive_thread.join(timeout=2.0)
+            self._archive_thread = None
+
+
+def read_archive(path: str) -> Iterator[Tuple]:
+    """
+    Lê um arquivo de sessão: ('transmission', marcador) e ('frame', id, instante epoch, PCM int16).
+    Um registro final incompleto (gravação interrompida) é ignorado.
+    """
+    codecs: Dict[int, Any] = {}
+    with open(path, 'rb') as f:
+        if f.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+            raise ValueError(f"{path} não é um arquivo de gravação do rádio")
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            kind, size = _RECORD_HEADER.unpack(header)
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+            if kind == b'T':
+                marker = json.loads(payload.decode('utf-8'))
+                codecs[marker['id']] = audio_codecs.create_codec(marker['codec'], marker['rate'])
+                yield 'transmission', marker
+            elif kind == b'F':
+                tx_id, timestamp = _FRAME_HEADER.unpack_from(payload)
+                codec = codecs.get(tx_id)
+                if codec is not None:
+                    yield 'frame', tx_id, timestamp, codec.decode(payload[_FRAME_HEADER.size:])
@@ -1,19 +1,28 @@
 # Arquivo: client/sim_data.py
 
 import time
+import math
 import random
+import threading
 from datetime import datetime
 from typing import Any, Dict, Tuple
 from typing import Callable # Importação necessária para Python < 3.9
 
+from log_utils import get_logger
+
+log = get_logger('simconnect')
+
 # --- CONSTANTES E ESTADO GLOBAL (Inicialização Simulado) ---
 # O status inicial é SIMULADO, a conexão REAL é feita via check_and_connect_simconnect()
 CONN_STATUS = "SIMULADO" 
 sm = None 
 aq = None 
+# Serializa conectar/desconectar: a sonda da inicialização (main.py) e o primeiro fetch_all_data()
+# do monitor podem tentar ao mesmo tempo, e duas instâncias de SimConnect() vazariam uma delas.
+_connect_lock = threading.Lock()
 
 DATA_PRECISION = { 
-    "alt_ind": 0, "vs": 0, "ias": 1, "gs": 1, "tas": 1, "agl": 0, "on_ground": 0, 
+    "alt_ind": 0, "vs": 0, "ias": 1, "gs": 1, "tas": 1, "agl": 0, "on_ground": 0, "track": 0,
     "total_fuel": 0, "gear_left_pos": 0, "g_force": 1, 
     "engine_count": 0, "lat": 3, "lng": 3, "eng_combustion": 0, 
     "light_beacon_on": 0, "light_landing_on": 0, "light_strobe_on": 0, 
@@ -23,7 +32,7 @@ DATA_PRECISION = {
 }
 
 flight_data: Dict[str, Any] = {
-    "alt_ind": 0, "vs": 0.0, "ias": 0, "gs": 0.0, "tas": 0, "agl": 0, "on_ground": 0, "total_fuel": 0, 
+    "alt_ind": 0, "vs": 0.0, "ias": 0, "gs": 0.0, "tas": 0, "agl": 0, "on_ground": 0, "track": 0.0, "total_fuel": 0, 
     "gear_left_pos": 0, "g_force": 1.0, "engine_count": 0, "lat": 0.0, "lng": 0.0, 
     "eng_combustion": 0, "light_beacon_on": 0, "light_landing_on": 0, "light_strobe_on": 0, 
     "plane_bank_degrees": 0.0, "engine_vibration_1": 0.0,
@@ -68,6 +77,7 @@ class MockAircraftRequests:
         if var == "PLANE_ALTITUDE": return 10000 if t > 10 else 0
         if var == "AIRSPEED_INDICATED": return 215 if t > 10 else 0
         if var == "GPS_GROUND_SPEED": return 250 if t > 10 else (12 if t > 5 and t < 15 and t % 60 > 50 else 0) 
+        if var == "GPS_GROUND_TRUE_TRACK": return math.radians(90) # Radianos, como no SimConnect
         if var == "SIM_ON_GROUND": return 1 if t < 20 or t % 60 > 50 else 0
         if var == "GENERAL_ENG_COMBUSTION:1": return 1 if t > 5 else 0
         if var == "G_FORCE": return 1.0 + 0.1 * random.random()
@@ -102,27 +112,43 @@ def check_and_connect_simconnect():
     if CONN_STATUS == "REAL":
         return
 
-    try:
-        from SimConnect import SimConnect, AircraftRequests
-        # Tenta conectar. Se for bem-sucedido, substitui os mocks.
-        sm_temp = SimConnect() 
-        aq_temp = AircraftRequests(sm_temp)
-        
-        # SUCESSO: Atualiza o estado global
-        sm = sm_temp
-        aq = aq_temp
-        CONN_STATUS = "REAL"
-        print(f"[SIMCONNECT] Conexão REAL estabelecida com sucesso.")
-        
-    except Exception as e:
-        # FALHA: Garante que os mocks estejam configurados.
-        if sm is None or not hasattr(aq, 'get'): # Verifica se aq é o mock
-            sm = MockSimConnect()
-            aq = MockAircraftRequests(sm)
-            CONN_STATUS = "SIMULADO"
-
-# --- Executa a checagem inicial no carregamento do módulo ---
-check_and_connect_simconnect()
+    with _connect_lock:
+        if CONN_STATUS == "REAL": # Outra thread conectou enquanto esta esperava
+            return
+        try:
+            from SimConnect import SimConnect, AircraftRequests
+            # Tenta conectar. Se for bem-sucedido, substitui os mocks.
+            sm_temp = SimConnect() 
+            aq_temp = AircraftRequests(sm_temp)
+            
+            # SUCESSO: Atualiza o estado global
+            sm = sm_temp
+            aq = aq_temp
+            CONN_STATUS = "REAL"
+            log.info("Conexão REAL estabelecida com sucesso.")
+            
+        except Exception as e:
+            # FALHA: Garante que os mocks estejam configurados.
+            if sm is None or not hasattr(aq, 'get'): # Verifica se aq é o mock
+                sm = MockSimConnect()
+                aq = MockAircraftRequests(sm)
+                CONN_STATUS = "SIMULADO"
+
+def disconnect_simconnect() -> bool:
+    """Encerra a conexão REAL (se houver) e volta ao modo SIMULADO. Retorna True se havia conexão."""
+    global sm, aq, CONN_STATUS
+    with _connect_lock:
+        had_connection = CONN_STATUS == "REAL" and sm is not None
+        if had_connection:
+            try: sm.exit()
+            except Exception: pass
+        sm = None
+        aq = None
+        CONN_STATUS = "SIMULADO"
+    return had_connection
+
+# A checagem inicial NÃO é mais executada na importação: a primeira tentativa ocorre na
+# sonda paralela da inicialização (main.py) ou no primeiro fetch_all_data().
 
 def get_safe_value(var_name: str, default: Any = 0) -> Any:
     """Busca um valor do SimConnect/Mock, levantando exceção se a conexão real falhar."""
@@ -133,7 +159,7 @@ def get_safe_value(var_name: str, default: Any = 0) -> Any:
     except Exception as e: 
         # A conexão REAL falhou após ter sido estabelecida (Simulador fechado)
         if CONN_STATUS == "REAL": 
-            print(f"[SIMCONNECT] ERRO na leitura (Conexão REAL perdida): {e}")
+            log.error("ERRO na leitura (Conexão REAL perdida): %s", e)
             
             if sm:
                 try: sm.exit()
@@ -154,7 +180,14 @@ def fetch_all_data():
     
     # CHAVE: Tenta conectar se estiver em modo SIMULADO
     check_and_connect_simconnect()
-    
+    fill_flight_data(flight_data, get_safe_value)
+
+def fill_flight_data(flight_data: Dict[str, Any], get_safe_value: Callable[..., Any]):
+    """
+    Preenche `flight_data` lendo cada variável com `get_safe_value(var, default=0)`.
+    Separada de fetch_all_data para que outras fontes (um MockAircraftRequests por cliente no
+    gerador de carga) produzam o mesmo dicionário sem passar pelo estado global do SimConnect.
+    """
     # 1. Coleta de VS e Coerção de Zero 
     flight_data["vs"] = get_safe_value("VERTICAL_SPEED")
     if abs(flight_data["vs"]) < 0.5: flight_data["vs"] = 0.0 
@@ -167,6 +200,7 @@ def fetch_all_data():
     flight_data["alt_ind"] = get_safe_value("PLANE_ALTITUDE")
     flight_data["ias"] = get_safe_value("AIRSPEED_INDICATED")
     flight_data["gs"] = get_safe_value("GPS_GROUND_SPEED", default=0.0) 
+    flight_data["track"] = math.degrees(get_safe_value("GPS_GROUND_TRUE_TRACK", default=0.0)) % 360 # Rumo verdadeiro (graus)
     flight_data["tas"] = get_safe_value("AIRSPEED_TRUE")
     flight_data["agl"] = get_safe_value("PLANE_ALT_ABOVE_GROUND")
     flight_data["on_ground"] = get_safe_value("SIM_ON_GROUND")
@@ -0,0 +1,67 @@
+# Arquivo: client/startup.py
+
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, Iterable
+
+from log_utils import get_logger
+
+log = get_logger('app')
+
+
+class StartupOrchestrator:
+    """
+    Executa as etapas independentes da inicialização em paralelo (uma thread daemon por etapa).
+    Cada etapa pode declarar dependências e só começa quando elas terminam. Registra o tempo de cada etapa.
+    """
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._futures: Dict[str, Future] = {}
+        self._timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, func: Callable[..., Any], *args, depends_on: Iterable[str] = ()) -> Future:
+        """Agenda a etapa `name`. Falhas em dependências não impedem a execução (a etapa decide o que fazer)."""
+        future: Future = Future()
+        deps = [self._futures[d] for d in depends_on]
+        with self._lock:
+            self._futures[name] = future
+
+        def run():
+            wait(deps)
+            if not future.set_running_or_notify_cancel():
+                return
+            start = time.perf_counter()
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._timings[name] = (time.perf_counter() - start) * 1000
+
+        threading.Thread(target=run, name=f"startup-{name}", daemon=True).start()
+        return future
+
+    def result(self, name: str, timeout: float | None = None, default: Any = None) -> Any:
+        """Resultado da etapa (ou `default` se ela falhou ou não foi agendada)."""
+        future = self._futures.get(name)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            log.warning("Etapa de inicialização '%s' falhou: %s", name, e)
+            return default
+
+    def get_timings(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._timings)
+
+    def log_report(self, timeout: float | None = None):
+        """Aguarda as etapas e registra o tempo de cada uma e o tempo total de parede."""
+        wait(list(self._futures.values()), timeout=timeout)
+        total_ms = (time.perf_counter() - self._t0) * 1000
+        fields = {f"{name}_ms": round(ms) for name, ms in sorted(self.get_timings().items(), key=lambda kv: -kv[1])}
+        log.info("Inicialização concluída em %.0f ms.", total_ms, extra={'fields': fields})
@@ -0,0 +1,382 @@
+# Arquivo: client/telemetry_loadgen.py
+#
+# Gerador de carga da telemetria: muitos clientes simulados, cada um com a mesma lógica de envio do
+# FlightMonitor (identificação, START_TX/STOP_TX, quadro só com mudança significativa ou no heartbeat,
+# a cada 100 ms), distribuídos em um pool de processos. Cada cliente tem a própria fonte de dados:
+# o mock do sim_data (defasado por cliente) ou um replay de quadros gravados pelo dev_telemetry_server.
+# Reporta quadros/s sustentados, CPU do cliente por conexão e, contra o servidor local de teste,
+# a latência ponta a ponta (p50/p99). O registro de eventos do FlightEventLogger não é simulado
+# (ele envia logs por HTTP ao site), nem o rádio.
+#
+# Uso:  python telemetry_loadgen.py --local-server --clients 300 --duration 60
+#       python telemetry_loadgen.py --url ws://servidor:8765 --clients 500 --workers 8 --ignore-stop-tx
+#       python telemetry_loadgen.py --local-server --source replay --replay-file sessao.jsonl --json resultado.json
+
+import argparse
+import bisect
+import copy
+import json
+import os
+import select
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List
+
+import websocket
+
+import sim_data
+from log_utils import get_logger, setup_logging
+
+log = get_logger('monitor')
+
+# --- CONSTANTES DO GERADOR DE CARGA ---
+DEFAULT_URL = 'ws://127.0.0.1:8765'
+TICK_S = 0.1                    # Mesmo intervalo do _send_data_loop do FlightMonitor
+HEARTBEAT_INTERVAL_S = 5        # heartbeat_interval padrão do client_config.ini
+DEFAULT_RAMP_S = 5.0            # Conexões distribuídas nesse intervalo (sem rajada de handshakes)
+CONNECT_TIMEOUT_S = 10.0
+MOCK_SPREAD_S = 3600.0          # Defasagem máxima do mock entre clientes (fases de voo diferentes)
+SERVER_START_TIMEOUT_S = 10.0
+CONTROL_TIMEOUT_S = 5.0
+STRIPPED_REPLAY_KEYS = ('pilot_name', 'packets_sent', 'mb_sent', 'loadgen_sent_at')
+
+
+# =================================================================
+# FONTES DE DADOS (uma por cliente)
+# =================================================================
+
+class MockSource:
+    """MockAircraftRequests próprio, com o relógio defasado para que os clientes não voem em sincronia."""
+    def __init__(self, offset_s: float):
+        self.aq = sim_data.MockAircraftRequests()
+        self.aq._start_time -= offset_s
+
+    def _get(self, var: str, default: Any = 0) -> Any:
+        value = self.aq.get(var)
+        return value if value is not None else default
+
+    def read(self, flight_data: Dict[str, Any], now: float):
+        sim_data.fill_flight_data(flight_data, self._get)
+
+
+class ReplaySource:
+    """Reproduz uma sessão gravada (JSON Lines do dev_telemetry_server --record) no ritmo original, em loop."""
+    def __init__(self, track: List[Dict[str, Any]], offset_s: float):
+        self.times = [record['t'] for record in track]
+        self.frames = [record['data'] for record in track]
+        self.duration = max(self.times[-1], TICK_S)
+        self.offset_s = offset_s
+        self.start = time.monotonic()
+
+    def read(self, flight_data: Dict[str, Any], now: float):
+        elapsed = (now - self.start + self.offset_s) % self.duration
+        frame = self.frames[max(0, bisect.bisect_right(self.times, elapsed) - 1)]
+        flight_data.update(frame)
+
+
+def load_replay_tracks(path: str) -> List[List[Dict[str, Any]]]:
+    """Quadros gravados agrupados por piloto, com o tempo relativo ao primeiro quadro de cada um."""
+    tracks: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            data = {k: v for k, v in record['data'].items() if k not in STRIPPED_REPLAY_KEYS}
+            tracks.setdefault(record.get('pilot', ''), []).append({'t': record['t'], 'data': data})
+    result = []
+    for track in tracks.values():
+        t0 = track[0]['t']
+        result.append([{'t': record['t'] - t0, 'data': record['data']} for record in track])
+    if not result:
+        raise ValueError(f"Nenhum quadro gravado em {path}")
+    return result
+
+
+# =================================================================
+# CLIENTE SIMULADO (equivalente ao FlightMonitor, sem UI, SimConnect, eventos ou rádio)
+# =================================================================
+
+class SimulatedPilot:
+    def __init__(self, name: str, source, heartbeat_interval: float, ignore_stop_tx: bool):
+        self.name = name
+        self.source = source
+        self.heartbeat_interval = heartbeat_interval
+        self.ignore_stop_tx = ignore_stop_tx
+        self.flight_data = copy.deepcopy(sim_data.flight_data)
+        self.flight_data['pilot_name'] = name
+        self.ws = None
+        self.transmitting = False
+        self.last_sent_data: Dict[str, Any] | None = None
+        self.packets_sent_count = 0
+        self.total_bytes_sent = 0.0
+        self.last_send_time = time.time()
+
+    def connect(self, url: str):
+        self.ws = websocket.create_connection(url, timeout=CONNECT_TIMEOUT_S)
+        self.ws.send(json.dumps({
+            "pilot_name": self.name,
+            "vatsim_id": "N/A",
+            "ivao_id": "N/A",
+            "departureId": "N/A",
+            "arrivalId": "N/A",
+            "packets_sent": 0,
+            "mb_sent": 0.0
+        }))
+
+    def _poll_commands(self):
+        """START_TX/STOP_TX pendentes (sem bloquear: o socket só é lido se houver dados)."""
+        while select.select([self.ws.sock], [], [], 0)[0]:
+            message = self.ws.recv()
+            if not message:
+                raise websocket.WebSocketConnectionClosedException("Servidor fechou a conexão")
+            try:
+                command = json.loads(message).get("command")
+            except (ValueError, AttributeError):
+                continue
+            if command == "START_TX":
+                self.transmitting = True
+            elif command == "STOP_TX":
+                self.transmitting = False
+
+    def tick(self, now: float) -> int:
+        """Uma volta do _send_data_loop. Retorna os bytes enviados (0 se nada foi enviado)."""
+        self._poll_commands()
+        self.source.read(self.flight_data, now)
+        current_rounded = sim_data.create_rounded_data(self.flight_data)
+        if not (self.transmitting or self.ignore_stop_tx):
+            return 0
+
+        force_send = (time.time() - self.last_send_time) >= self.heartbeat_interval
+        if not (sim_data.has_significant_change(current_rounded, self.last_sent_data) or force_send):
+            return 0
+        self.last_sent_data = current_rounded.copy()
+        self.packets_sent_count += 1
+        payload_to_send = json.dumps({
+            **current_rounded,
+            'mb_sent': self.total_bytes_sent / (1024 * 1024),
+            'packets_sent': self.packets_sent_count,
+            'loadgen_sent_at': time.time() # Latência ponta a ponta medida pelo servidor local
+        })
+        message_size = len(payload_to_send.encode('utf-8'))
+        self.total_bytes_sent += message_size
+        self.ws.send(payload_to_send)
+        self.last_send_time = time.time()
+        return message_size
+
+    def close(self):
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+
+
+# =================================================================
+# PROCESSO DE TRABALHO
+# =================================================================
+
+def run_worker(worker_id: int, client_count: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Um processo do pool: conecta `client_count` clientes ao longo da rampa e roda todos numa única
+    thread, uma volta a cada TICK_S. Só a janela após a rampa entra nas medições.
+    """
+    tracks = load_replay_tracks(options['replay_file']) if options['source'] == 'replay' else None
+    pilots = []
+    for i in range(client_count):
+        index = worker_id + i * options['workers'] # Numeração global intercalada entre processos
+        offset = (index / max(options['clients'], 1)) * MOCK_SPREAD_S
+        if tracks:
+            track = tracks[index % len(tracks)]
+            source = ReplaySource(track, offset % max(track[-1]['t'], TICK_S))
+        else:
+            source = MockSource(offset)
+        pilots.append(SimulatedPilot(f"LOADGEN-{index:04d}", source, options['heartbeat'], options['ignore_stop_tx']))
+
+    start = options['start_time']
+    window_start = start + options['ramp_s']
+    window_end = window_start + options['duration_s']
+    connect_at = [start + options['ramp_s'] * i / max(client_count, 1) for i in range(client_count)]
+    stats = {'worker': worker_id, 'clients': client_count, 'connected': 0, 'connect_failures': 0, 'dropped': 0,
+             'frames': 0, 'bytes': 0, 'cpu_s': 0.0, 'window_s': 0.0, 'late_ticks': 0, 'ticks': 0}
+    active: List[SimulatedPilot] = []
+    pending = list(zip(connect_at, pilots))
+    cpu_start = None
+    in_window = False
+
+    while True:
+        now_wall = time.time()
+        if now_wall >= window_end:
+            break
+        if not in_window and now_wall >= window_start:
+            in_window = True
+            cpu_start = time.process_time()
+        while pending and pending[0][0] <= now_wall:
+            _, pilot = pending.pop(0)
+            try:
+                pilot.connect(options['url'])
+                active.append(pilot)
+                stats['connected'] += 1
+            except Exception:
+                stats['connect_failures'] += 1
+
+        tick_start = time.monotonic()
+        for pilot in list(active):
+            try:
+                sent = pilot.tick(tick_start)
+            except Exception:
+                active.remove(pilot)
+                pilot.close()
+                stats['dropped'] += 1
+                continue
+            if sent and in_window:
+                stats['frames'] += 1
+                stats['bytes'] += sent
+        if in_window:
+            stats['ticks'] += 1
+        remaining = TICK_S - (time.monotonic() - tick_start)
+        if remaining > 0:
+            time.sleep(remaining)
+        elif in_window:
+            stats['late_ticks'] += 1 # O processo não deu conta dos clientes em 100 ms
+
+    if cpu_start is not None:
+        stats['cpu_s'] = time.process_time() - cpu_start
+        stats['window_s'] = options['duration_s']
+    for pilot in active:
+        pilot.close()
+    return stats
+
+
+# =================================================================
+# SERVIDOR LOCAL E CONTROLE
+# =================================================================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(port: int, check_delay_ms: float):
+    """Sobe o dev_telemetry_server em outro processo (a CPU dele não entra na medição dos clientes)."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dev_telemetry_server.py')
+    process = subprocess.Popen([sys.executable, script, '--port', str(port), '--check-delay-ms', str(check_delay_ms)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_S
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Servidor de telemetria local não iniciou")
+
+
+def server_control(url: str, action: str) -> Dict[str, Any] | None:
+    """Mensagem de controle ao dev_telemetry_server ('reset' ou 'stats'); None contra o servidor real."""
+    try:
+        ws = websocket.create_connection(url, timeout=CONTROL_TIMEOUT_S)
+        try:
+            ws.send(json.dumps({'loadgen': action}))
+            reply = json.loads(ws.recv())
+        finally:
+            ws.close()
+    except Exception:
+        return None
+    return reply if isinstance(reply, dict) and reply.get('loadgen') == action else None
+
+
+def build_report(results: List[Dict[str, Any]], server_stats: Dict[str, Any] | None, options: Dict[str, Any]) -> Dict[str, Any]:
+    frames = sum(r['frames'] for r in results)
+    cpu_s = sum(r['cpu_s'] for r in results)
+    connected = sum(r['connected'] for r in results)
+    duration = options['duration_s']
+    report = {
+        'clients': options['clients'],
+        'workers': options['workers'],
+        'source': options['source'],
+        'connected': connected,
+        'connect_failures': sum(r['connect_failures'] for r in results),
+        'dropped': sum(r['dropped'] for r in results),
+        'duration_s': duration,
+        'frames_sent': frames,
+        'frames_per_s': round(frames / duration, 1),
+        'kbytes_per_s': round(sum(r['bytes'] for r in results) / 1024 / duration, 1),
+        'client_cpu_pct_per_connection': round(100 * cpu_s / duration / max(connected, 1), 3),
+        'client_cpu_us_per_frame': round(1e6 * cpu_s / max(frames, 1), 1),
+        'late_tick_pct': round(100 * sum(r['late_ticks'] for r in results) / max(sum(r['ticks'] for r in results), 1), 2),
+    }
+    if server_stats:
+        report.update({
+            'server_frames_per_s': server_stats['frames_per_s'],
+            'latency_p50_ms': server_stats['latency_p50_ms'],
+            'latency_p99_ms': server_stats['latency_p99_ms'],
+            'latency_max_ms': server_stats['latency_max_ms'],
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga da telemetria (clientes FlightMonitor simulados).")
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processos do pool")
+    parser.add_argument('--duration', type=float, default=30.0, help="Janela medida (s), após a rampa")
+    parser.add_argument('--ramp', type=float, default=DEFAULT_RAMP_S, help="Intervalo para conectar todos os clientes (s)")
+    parser.add_argument('--heartbeat', type=float, default=HEARTBEAT_INTERVAL_S)
+    parser.add_argument('--source', choices=('mock', 'replay'), default='mock')
+    parser.add_argument('--replay-file', help="JSON Lines gravado com dev_telemetry_server.py --record")
+    parser.add_argument('--ignore-stop-tx', action='store_true', help="Envia telemetria mesmo com STOP_TX (IDs fictícios no servidor real)")
+    parser.add_argument('--local-server', action='store_true', help="Sobe o dev_telemetry_server numa porta livre e mede a latência")
+    parser.add_argument('--check-delay-ms', type=float, default=0.0, help="Com --local-server: atraso simulado da checagem de rede")
+    parser.add_argument('--json', help="Grava o relatório neste arquivo")
+    args = parser.parse_args()
+    if args.source == 'replay' and not args.replay_file:
+        parser.error("--source replay requer --replay-file")
+
+    setup_logging(log_file='telemetry_loadgen.log')
+    server_process = None
+    url = args.url
+    if args.local_server:
+        port = _free_port()
+        server_process = start_local_server(port, args.check_delay_ms)
+        url = f'ws://127.0.0.1:{port}'
+
+    workers = max(1, min(args.workers, args.clients))
+    options = {
+        'url': url, 'clients': args.clients, 'workers': workers, 'source': args.source, 'replay_file': args.replay_file,
+        'heartbeat': args.heartbeat, 'ignore_stop_tx': args.ignore_stop_tx, 'ramp_s': args.ramp, 'duration_s': args.duration,
+        'start_time': time.time() + 1.0, # Margem para os processos do pool subirem
+    }
+    counts = [args.clients // workers + (1 if i < args.clients % workers else 0) for i in range(workers)]
+    log.info("Gerador de carga: %d clientes em %d processos contra %s (%s).", args.clients, workers, url, args.source)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_worker, i, count, options) for i, count in enumerate(counts)]
+            time.sleep(max(0.0, options['start_time'] + args.ramp - time.time()))
+            server_control(url, 'reset') # Início da janela medida (só o servidor local responde)
+            results = [future.result() for future in futures]
+        server_stats = server_control(url, 'stats')
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait(timeout=5)
+
+    report = build_report(results, server_stats, options)
+    log.info("Resultado da carga.", extra={'fields': report})
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
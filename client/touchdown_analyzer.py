@@ -0,0 +1,176 @@
+# Arquivo: client/touchdown_analyzer.py
+
+from array import array
+from typing import Dict, Any
+
+# --- CONSTANTES DA ANÁLISE DE TOQUE ---
+WINDOW_SIZE = 128               # Amostras pré-toque mantidas (~12.8 s a 10 Hz)
+THRESHOLD_AGL_FT = 50.0         # Altura de cruzamento da cabeceira (início do float)
+ARM_AGL_FT = 100.0              # Acima desta altura o analisador é armado para um novo toque
+PEAK_G_PRE_CONTACT_S = 0.5      # Janela antes do toque considerada para o pico de G
+ROLLOUT_END_GS_KTS = 10.0       # Fim da corrida de pouso (mesmo limiar do GS_TAXI_START_KTS)
+AGL_RATE_WINDOW_S = 1.0         # Base da razão de descida pela variação de AGL (1 ft de resolução -> 60 fpm)
+VS_AGL_MISMATCH_FPM = 250.0     # VS que diverge disso da razão pela AGL (leitura congelada/atrasada) é descartado
+KTS_TO_MPS = 0.514444
+
+
+class TouchdownAnalyzer:
+    """
+    Mantém uma janela circular de amostras pré-toque em arrays pré-alocados e,
+    na borda de contato com o solo, calcula VS no toque, pico de G, quiques,
+    distância de flutuação e corrida de pouso.
+    """
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self.window_size = window_size
+        # Arrays pré-alocados (sem alocação por amostra no loop de 100 ms)
+        self._t = array('d', bytes(8 * window_size))
+        self._vs = array('d', bytes(8 * window_size))
+        self._g = array('d', bytes(8 * window_size))
+        self._agl = array('d', bytes(8 * window_size))
+        self._gs = array('d', bytes(8 * window_size))
+        self._on_ground = array('b', bytes(window_size))
+        self.reset()
+
+    def reset(self):
+        """Descarta a janela e o resultado do último pouso."""
+        self._head = 0
+        self._count = 0
+        self._armed = False
+        self._last_on_ground = 1
+        self._last_t = None
+        self._last_gs = 0.0
+
+        self.touchdown_detected = False
+        self.rollout_complete = False
+        self.touchdown_time: float | None = None
+        self.touchdown_vs: float | None = None
+        self.peak_g = 0.0
+        self.bounces = 0
+        self.float_distance_m: float | None = None
+        self.rollout_distance_m = 0.0
+
+    def _index(self, offset_from_newest: int) -> int:
+        """Índice físico da amostra `offset_from_newest` posições antes da mais recente."""
+        return (self._head - 1 - offset_from_newest) % self.window_size
+
+    def add_sample(self, timestamp: float, vs: float, g_force: float, agl: float, gs: float, on_ground: int):
+        """Registra uma amostra do loop de telemetria e detecta a borda de contato."""
+        on_ground = 1 if on_ground else 0
+        i = self._head
+        self._t[i] = timestamp; self._vs[i] = vs; self._g[i] = g_force
+        self._agl[i] = agl; self._gs[i] = gs; self._on_ground[i] = on_ground
+        self._head = (i + 1) % self.window_size
+        if self._count < self.window_size: self._count += 1
+
+        # Arma o analisador quando a aeronave está claramente no ar
+        if not on_ground and agl > ARM_AGL_FT and not self.touchdown_detected:
+            self._armed = True
+
+        if self._armed and not self.touchdown_detected and on_ground and not self._last_on_ground:
+            self._analyze_contact_edge()
+        elif self.touchdown_detected and not self.rollout_complete:
+            self._accumulate_rollout(timestamp, g_force, gs, on_ground)
+
+        self._last_on_ground = on_ground
+        self._last_t = timestamp
+        self._last_gs = gs
+
+    def _analyze_contact_edge(self):
+        """Executa a análise da janela pré-toque na borda ar -> solo."""
+        self.touchdown_detected = True
+        contact_t = self._t[self._index(0)]
+
+        # 1. Instante e VS do toque, entre a última amostra no ar e a primeira no solo (até um tick de 100 ms)
+        if self._count >= 3 and not self._on_ground[self._index(2)]:
+            contact_t, self.touchdown_vs = self._estimate_contact(self._index(2), self._index(1), self._index(0))
+        elif self._count >= 2:
+            self.touchdown_vs = self._vs[self._index(1)]
+        else:
+            self.touchdown_vs = self._vs[self._index(0)]
+        self.touchdown_time = contact_t
+
+        # 2. Pico de G e distância de flutuação (do cruzamento de THRESHOLD_AGL_FT até o toque)
+        peak_g = self._g[self._index(0)]
+        float_m = 0.0
+        crossed_threshold = False
+        for k in range(1, self._count):
+            cur = self._index(k - 1); prev = self._index(k)
+            if contact_t - self._t[prev] <= PEAK_G_PRE_CONTACT_S:
+                peak_g = max(peak_g, self._g[prev])
+            dt = self._t[cur] - self._t[prev]
+            if dt > 0:
+                float_m += 0.5 * (self._gs[cur] + self._gs[prev]) * KTS_TO_MPS * dt
+            if self._agl[prev] >= THRESHOLD_AGL_FT:
+                crossed_threshold = True
+                break
+        self.peak_g = peak_g
+        self.float_distance_m = float_m if crossed_threshold else None
+
+    def _agl_rate(self) -> float | None:
+        """Razão de descida (fpm) pela variação de AGL no último AGL_RATE_WINDOW_S no ar antes da borda de contato."""
+        last_air = self._index(1)
+        t1 = self._t[last_air]
+        first = None
+        for k in range(2, self._count):
+            i = self._index(k)
+            if self._on_ground[i] or t1 - self._t[i] > AGL_RATE_WINDOW_S:
+                break
+            first = i
+        if first is None or t1 <= self._t[first]:
+            return None
+        return (self._agl[last_air] - self._agl[first]) / (t1 - self._t[first]) * 60.0
+
+    def _estimate_contact(self, prev_air: int, last_air: int, ground: int):
+        """
+        (instante, VS) do contato. A razão de descida vem do VS do simulador, ou da variação de AGL
+        no último segundo no ar quando o VS não indica descida ou diverge dela (leitura congelada ou
+        atrasada). O contato é onde a altura cai até a AGL lida no solo (altura do CG sobre o trem), e o
+        VS é extrapolado até esse instante pela tendência das duas últimas amostras (flare incluído).
+        """
+        t0, t1, t2 = self._t[prev_air], self._t[last_air], self._t[ground]
+        dt = t1 - t0
+        if dt <= 0:
+            return t2, self._vs[last_air]
+        vs0, vs1 = self._vs[prev_air], self._vs[last_air]
+        agl_rate = self._agl_rate()
+        if agl_rate is not None and (vs1 >= 0.0 or abs(vs1 - agl_rate) > VS_AGL_MISMATCH_FPM):
+            vs0 = vs1 = agl_rate # Só a razão média: sem tendência confiável
+
+        # Instante do contato pela altura restante até a AGL de solo, na razão da última amostra no ar
+        height = self._agl[last_air] - self._agl[ground]
+        contact_t = t2
+        if vs1 < 0.0 and height > 0.0:
+            contact_t = min(t2, t1 + height / (-vs1 / 60.0))
+        elif height <= 0.0:
+            contact_t = t1
+
+        vs_td = vs1 + (vs1 - vs0) / dt * (contact_t - t1)
+        if vs1 < 0.0:
+            vs_td = min(vs_td, 0.0) # O arredondamento do flare não vira subida no toque
+        return contact_t, vs_td
+
+    def _accumulate_rollout(self, timestamp: float, g_force: float, gs: float, on_ground: int):
+        """Acumula pico de G, quiques e corrida de pouso (integração de GS) após o toque."""
+        if g_force > self.peak_g: self.peak_g = g_force
+        if self._last_on_ground and not on_ground:
+            self.bounces += 1
+
+        if self._last_t is not None:
+            dt = timestamp - self._last_t
+            if dt > 0:
+                self.rollout_distance_m += 0.5 * (gs + self._last_gs) * KTS_TO_MPS * dt
+
+        if on_ground and gs < ROLLOUT_END_GS_KTS:
+            self.rollout_complete = True
+
+    def get_results(self) -> Dict[str, Any]:
+        """Retorna as métricas do último toque (valores arredondados para o log)."""
+        if not self.touchdown_detected:
+            return {}
+        return {
+            "touchdown_vs": round(self.touchdown_vs, 0) if self.touchdown_vs is not None else None,
+            "touchdown_peak_g": round(self.peak_g, 2),
+            "touchdown_bounces": self.bounces,
+            "float_distance_m": round(self.float_distance_m, 0) if self.float_distance_m is not None else None,
+            "rollout_distance_m": round(self.rollout_distance_m, 0),
+        }
@@ -4,7 +4,10 @@ import requests
 import threading
 from typing import Tuple, Optional
 from tkinter import messagebox
-from datetime import datetime
+from log_utils import get_logger
+from http_client import get_http_client
+
+log = get_logger('update')
 
 DECISION_PROCEED_TO_LOGIN = 1
 DECISION_INITIATE_UPDATE = 2
@@ -47,20 +50,20 @@ def check_for_update_sync(app_instance, current_v: str, url: str) -> Tuple[int,
     """Verifica a versão mais recente."""
     try:
         app_instance.after(0, lambda: app_instance.title(f"Monitor de Voo - Verificando Atualização..."))
-        response = requests.get(url, timeout=5)
+        response = get_http_client().get(url, timeout=5)
         response.raise_for_status()
         latest_version = response.text.strip()
         
         if _compare_versions(current_v, latest_version):
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [ALERTA] Nova versão {latest_version} disponível.")
+            log.warning("Nova versão %s disponível.", latest_version)
             decision = initiate_update_and_exit_sync(app_instance, current_v, latest_version)
             return decision, latest_version
         else:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [INFO] A versão atual ({current_v}) é a mais recente.")
+            log.info("A versão atual (%s) é a mais recente.", current_v)
             return DECISION_PROCEED_TO_LOGIN, None
     except requests.exceptions.RequestException as e:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [AVISO] Falha ao verificar atualização: {e}")
+        log.warning("Falha ao verificar atualização: %s", e)
         return DECISION_PROCEED_TO_LOGIN, None
     except Exception as e:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [ERRO] inesperado ao verificar atualização: {e}")
+        log.exception("Erro inesperado ao verificar atualização: %s", e)
         return DECISION_PROCEED_TO_LOGIN, None
\ No newline at end of file
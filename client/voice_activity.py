@@ -0,0 +1,86 @@
+# Arquivo: client/voice_activity.py
+
+import math
+
+import numpy as np
+
+import radio_dsp
+
+# --- CONSTANTES DO DETECTOR DE VOZ (VAD) ---
+VAD_MARGIN_DB = 9.0             # Energia acima do ruído de fundo para considerar fala
+VAD_MIN_SPEECH_DBFS = -50.0     # Abaixo disso nunca é fala (microfone mudo, gate do driver)
+VAD_ZCR_VOICED_MAX = 0.12       # Cruzamentos por zero/amostra típicos de fala vozeada (chiado fica perto de 0,5)
+VAD_FLOOR_INIT_DBFS = -60.0     # Ruído de fundo inicial, antes de medir o microfone
+VAD_FLOOR_MAX_DBFS = -25.0      # O ruído de fundo estimado nunca sobe acima disso
+VAD_FLOOR_RISE_S = 4.5          # Constante de tempo da subida do ruído de fundo
+VAD_FLOOR_RISE_NOISY_S = 0.3    # Subida em chunks com cara de ruído (muitos cruzamentos por zero): novo chiado/motor
+VAD_ZCR_NOISE_MIN = 0.3         # Cruzamentos por zero/amostra a partir dos quais o chunk parece ruído de banda larga
+VAD_HANGOVER_MS = 350           # Continua transmitindo por esse tempo após a última fala (fim de palavras)
+SILENCE_KEEPALIVE_S = 0.25      # Intervalo entre marcadores de silêncio (menor que o TALK_GAP_MS do receptor)
+
+
+class VoiceActivityDetector:
+    """
+    Detector de voz por energia e cruzamentos por zero, com ruído de fundo adaptativo e hangover.
+    Chunks com energia bem acima do fundo são fala; chunks só um pouco acima contam como fala se
+    forem vozeados (poucos cruzamentos por zero), o que rejeita chiado e ventilação do cockpit.
+    O ruído de fundo desce imediatamente e sobe devagar (por tempo, não por chunk), então persiste
+    entre transmissões.
+    """
+    def __init__(self, sample_rate: int, hangover_ms: float = VAD_HANGOVER_MS, margin_db: float = VAD_MARGIN_DB):
+        self.sample_rate = sample_rate
+        self.margin_db = margin_db
+        self.hangover_s = hangover_ms / 1000
+        self.noise_floor_db = VAD_FLOOR_INIT_DBFS
+        self._hang_left = 0.0
+        self._rise_cache = {}
+        self._scratch = np.empty(0, dtype=np.float32)
+
+    def start(self):
+        """Início de transmissão: os primeiros chunks sempre passam (pré-roll, clique do PTT)."""
+        self._hang_left = self.hangover_s
+
+    def analyze(self, audio_data, gain: float = 1.0):
+        """Nível (dBFS, após o ganho do microfone) e cruzamentos por zero por amostra do chunk int16."""
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        n = samples.shape[0]
+        if n == 0:
+            return -math.inf, 0.0
+        if self._scratch.shape[0] < n:
+            self._scratch = np.empty(n, dtype=np.float32)
+        x = self._scratch[:n]
+        np.multiply(samples, np.float32(gain / radio_dsp.MAX_INT_16), out=x)
+        level_db = 10 * math.log10(float(np.dot(x, x)) / n + 1e-12)
+        signs = np.signbit(x)
+        zcr = np.count_nonzero(signs[1:] != signs[:-1]) / n
+        return level_db, zcr
+
+    def is_speech(self, audio_data, gain: float = 1.0) -> bool:
+        """Decide se o chunk deve ser transmitido (fala ou hangover) e atualiza o ruído de fundo."""
+        level_db, zcr = self.analyze(audio_data, gain)
+        duration = memoryview(audio_data).nbytes / 2 / self.sample_rate
+        excess = level_db - self.noise_floor_db
+        speech = level_db > VAD_MIN_SPEECH_DBFS and (
+            excess >= self.margin_db or (excess >= self.margin_db / 2 and zcr <= VAD_ZCR_VOICED_MAX))
+
+        if level_db < self.noise_floor_db:
+            self.noise_floor_db = max(level_db, VAD_FLOOR_INIT_DBFS * 2)
+        else:
+            rise = self._rise(duration, VAD_FLOOR_RISE_NOISY_S if zcr >= VAD_ZCR_NOISE_MIN else VAD_FLOOR_RISE_S)
+            self.noise_floor_db = min(self.noise_floor_db + excess * rise, VAD_FLOOR_MAX_DBFS)
+
+        if speech:
+            self._hang_left = self.hangover_s
+            return True
+        if self._hang_left > 0:
+            self._hang_left -= duration
+            return True
+        return False
+
+    def _rise(self, duration: float, time_constant: float) -> float:
+        """Fração de subida para um chunk de `duration` segundos (independe do tamanho do quadro)."""
+        key = (duration, time_constant)
+        rise = self._rise_cache.get(key)
+        if rise is None:
+            rise = self._rise_cache[key] = 1.0 - math.exp(-duration / time_constant)
+        return rise
@@ -0,0 +1,100 @@
+# Arquivo: client/warm_capture.py
+
+import collections
+import queue
+import threading
+
+import pyaudio
+
+from log_utils import get_logger
+
+log = get_logger('radio')
+
+# --- CONSTANTES DA CAPTURA CONTÍNUA ---
+PREROLL_MS_DEFAULT = 90     # Áudio anterior ao aperto do PTT enviado no início da transmissão (client_config.json: ptt_preroll_ms)
+READ_TIMEOUT_S = 0.2        # Espera máxima do thread de transmissão por um chunk (permite reavaliar o PTT)
+
+
+class WarmCapture:
+    """
+    Stream de entrada mantido aberto em modo callback (captura "quente"): o PTT apenas abre a
+    porta dos chunks, sem o custo de abrir o dispositivo a cada transmissão. Com a porta fechada
+    os chunks alimentam um pequeno anel de pré-roll, entregue no início da próxima transmissão.
+    """
+    def __init__(self, p, device_index: int, rate: int, chunk: int, channels: int = 1, preroll_ms: float = PREROLL_MS_DEFAULT,
+                 on_overflow=None):
+        self.p = p
+        self.device_index = device_index
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        # Pré-roll em chunks inteiros (o mais próximo do pedido; ao menos um se houver pré-roll)
+        preroll_chunks = max(1, round(preroll_ms / (chunk / rate * 1000))) if preroll_ms > 0 else 0
+        self._preroll = collections.deque(maxlen=max(preroll_chunks, 1))
+        self._preroll_enabled = preroll_chunks > 0
+        self._frames: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._gate_open = False
+        self.on_overflow = on_overflow # Chamado (thread do PortAudio) quando o driver sinaliza overflow de entrada
+        self.stream = None
+
+    def start(self) -> bool:
+        """Abre o stream de entrada em modo callback. Retorna False se o dispositivo não abrir."""
+        try:
+            self.stream = self.p.open(format=pyaudio.paInt16, channels=self.channels, rate=self.rate, input=True,
+                                      frames_per_buffer=self.chunk, input_device_index=self.device_index,
+                                      stream_callback=self._callback)
+            return True
+        except Exception as e:
+            log.error("ERRO ao iniciar captura contínua do Microfone: %s", e)
+            self.stream = None
+            return False
+
+    def stop(self):
+        self.close_gate()
+        if self.stream:
+            try:
+                if self.stream.is_active():
+                    self.stream.stop_stream()
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
+
+    def is_active(self) -> bool:
+        return self.stream is not None and self.stream.is_active()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        """Thread do PortAudio: encaminha o chunk para a transmissão ou para o anel de pré-roll."""
+        if status & pyaudio.paInputOverflow and self.on_overflow:
+            self.on_overflow()
+        with self._lock:
+            if self._gate_open:
+                self._frames.put(in_data)
+            else:
+                self._preroll.append(in_data)
+        return None, pyaudio.paContinue
+
+    def open_gate(self) -> int:
+        """PTT pressionado: descarta sobras, enfileira o pré-roll e passa a entregar os chunks. Retorna os chunks de pré-roll."""
+        with self._lock:
+            while not self._frames.empty():
+                self._frames.get_nowait()
+            preroll = list(self._preroll) if self._preroll_enabled else []
+            self._preroll.clear()
+            for frame in preroll:
+                self._frames.put(frame)
+            self._gate_open = True
+        return len(preroll)
+
+    def close_gate(self):
+        """PTT liberado: os chunks voltam para o anel de pré-roll."""
+        with self._lock:
+            self._gate_open = False
+
+    def read(self, timeout: float = READ_TIMEOUT_S):
+        """Próximo chunk liberado pelo PTT (ou None se nada chegou dentro do timeout)."""
+        try:
+            return self._frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
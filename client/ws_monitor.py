@@ -4,16 +4,21 @@ import websocket
 import threading
 import json
 import time
-from datetime import datetime
 from tkinter import messagebox
 from typing import Dict, Any
-import requests 
 import sys # Importa sys para checar módulos
 
 # Importações de módulos locais 
 from event_logic import FlightEventLogger 
-from sim_data import fetch_all_data, create_rounded_data, has_significant_change, flight_data, sm, CONN_STATUS
-from radio_ui_logic import RadioClient # Importa a classe, mas trata falha na inicialização
+import sim_data # Estado da conexão (CONN_STATUS/sm) é lido sempre do módulo, nunca de uma cópia importada
+from sim_data import fetch_all_data, create_rounded_data, has_significant_change, flight_data
+from radio_ui_logic import RadioClient, load_config as load_radio_config # Importa a classe, mas trata falha na inicialização
+from log_utils import get_logger
+from position_reporter import PositionReporter
+from http_client import get_http_client
+
+log = get_logger('monitor')
+radio_log = get_logger('radio')
 
 
 # CONSTANTES (Portadas do node_server/config.js)
@@ -30,7 +35,7 @@ def _fetch_network_flight_plan(vatsim_id: str, ivao_id: str) -> Dict[str, str]:
         try:
             # NOTA: O 'verify=False' aqui pode ser um problema de segurança, mas é mantido 
             # se for necessário para acessar a URL em certos ambientes.
-            response = requests.get(IVAO_DATA_URL, timeout=8, verify=False)
+            response = get_http_client().get(IVAO_DATA_URL, timeout=8, verify=False)
             response.raise_for_status()
             data = response.json()
             ivao_id_int = int(ivao_id.strip())
@@ -41,10 +46,10 @@ def _fetch_network_flight_plan(vatsim_id: str, ivao_id: str) -> Dict[str, str]:
                     flight_plan["departureId"] = fp.get('departureId', "N/A").strip().upper()
                     flight_plan["arrivalId"] = fp.get('arrivalId', "N/A").strip().upper()
                     flight_plan["networkUserId"] = ivao_id
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] [IVAO FETCH] Sucesso. DEP: {flight_plan['departureId']}, ARR: {flight_plan['arrivalId']}")
+                    log.info("IVAO: plano encontrado. DEP: %s, ARR: %s", flight_plan['departureId'], flight_plan['arrivalId'])
                     return flight_plan
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [IVAO FETCH] Erro ao buscar plano IVAO: {e}")
+            log.warning("IVAO: erro ao buscar plano: %s", e)
 
     # 2. (A busca VATSIM original foi omitida, mas a busca por IVAO e o retorno permanecem)
     return flight_plan
@@ -75,9 +80,11 @@ class FlightMonitor:
         # Atributos para controle do rádio
         self.radio_client: RadioClient | None = None
         self.last_tuned_com2_freq: str = "N/A" 
+        self.last_monitored_com1_freq: str | None = None # Dual-watch: COM1 recebido na mesma conexão do rádio
         self.network_id_for_radio: str = "N/A"
         self.radio_was_connected = False
-        self.last_position_send_time = 0.0
+        self.radio_engine_failed = False # Motor de áudio subiu sem áudio: não é reiniciado a cada volta do loop
+        self.position_reporter = PositionReporter() # Posição do rádio por dead reckoning (não mais a cada 2 s)
         
         self.conn_thread: threading.Thread | None = None
         self.data_thread: threading.Thread | None = None
@@ -116,15 +123,8 @@ class FlightMonitor:
         if self.conn_thread and self.conn_thread.is_alive():
              self.conn_thread.join(timeout=TIMEOUT)
 
-        global sm, CONN_STATUS
-        if sm:
-            try: 
-                sm.exit()
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [SIMCONNECT] Limpeza final do SimConnect concluída.")
-            except: 
-                pass
-            sm = None
-            CONN_STATUS = "SIMULADO" 
+        if sim_data.disconnect_simconnect():
+            log.info("Limpeza final do SimConnect concluída.")
 
     def _connection_management_loop(self):
         RETRY_DELAY = 5 
@@ -217,7 +217,7 @@ class FlightMonitor:
 
     def _send_data_loop(self):
         """Loop principal de coleta de dados, detecção de eventos, envio WebSocket e SINTONIA DO RÁDIO."""
-        global flight_data, sm, CONN_STATUS
+        global flight_data
         
         while self.running and self.ws_client and self.ws_client.sock and self.ws_client.sock.connected:
             try:
@@ -226,7 +226,7 @@ class FlightMonitor:
                 
                 # NOVO: LÓGICA DE CHECK PERIÓDICO (a cada 60s)
                 if (time.time() - self.last_network_check_time) >= 60.0:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] [NETWORK CHECK] Verificação periódica do plano de voo.")
+                    log.debug("Verificação periódica do plano de voo.")
                     flight_plan = _fetch_network_flight_plan(self.vatsim_id, self.ivao_id)
                     self._update_pilot_data_with_flight_plan(flight_plan)
                     self.last_network_check_time = time.time()
@@ -234,24 +234,39 @@ class FlightMonitor:
 
                 # --- LÓGICA DO RÁDIO (Correta para ser controlada por CONN_STATUS) ---
                 # A conexão do rádio é iniciada quando CONN_STATUS == "REAL"
-                if CONN_STATUS == "REAL":
-                    if self.radio_client is None:
+                if sim_data.CONN_STATUS == "REAL":
+                    if self.radio_client is None and not self.radio_engine_failed:
                         try:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] [RÁDIO INFO] SimConnect REAL detectado. Instanciando RadioClient...")
-                            self.radio_client = RadioClient(master_app=self.master_app, pilot_id=self.network_id_for_radio)
-                            if self.radio_client.p:
+                            radio_log.info("SimConnect REAL detectado. Instanciando RadioClient...")
+                            if load_radio_config().get('audio_engine_process', False):
+                                # Áudio, DSP e Socket.IO do rádio em processo separado (não disputam o GIL com a telemetria).
+                                # O motor sobe em segundo plano; o connect é enviado quando ele ficar pronto
+                                from audio_engine import AudioEngineClient
+                                self.radio_client = AudioEngineClient(master_app=self.master_app, pilot_id=self.network_id_for_radio)
                                 self.radio_client.connect()
-                                print(f"[{datetime.now().strftime('%H:%M:%S')}] [RÁDIO INFO] RadioClient conectado.")
                             else:
-                                self.radio_client = None
+                                self.radio_client = RadioClient(master_app=self.master_app, pilot_id=self.network_id_for_radio)
+                                if self.radio_client.p:
+                                    self.radio_client.connect()
+                                    radio_log.info("RadioClient conectado.")
+                                else:
+                                    self.radio_client = None
                         except Exception as e:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] [RÁDIO CRÍTICO] Falha ao instanciar RadioClient: {e}")
+                            radio_log.error("Falha ao instanciar RadioClient: %s", e)
                             self.radio_client = None
-                    
+
+                    if self.radio_client and getattr(self.radio_client, 'remote', False) and self.radio_client.failed:
+                        radio_log.error("Motor de áudio sem áudio; rádio desativado até a próxima conexão do simulador.")
+                        self.radio_client.disconnect() # Encerra o processo do motor (sem esperar por ele)
+                        self.radio_client = None
+                        self.radio_engine_failed = True
+
                     if self.radio_client:
                         is_connected = self.radio_client.sio.connected
                         if is_connected and not self.radio_was_connected:
                             self.last_tuned_com2_freq = None # Força a resincronização da frequência na reconexão
+                            self.last_monitored_com1_freq = None
+                            self.position_reporter.reset()
                         self.radio_was_connected = is_connected
 
                         if is_connected:
@@ -260,25 +275,34 @@ class FlightMonitor:
                             if current_com2_freq != self.last_tuned_com2_freq:
                                 self.radio_client.tune_frequency(current_com2_freq)
                                 self.last_tuned_com2_freq = current_com2_freq
+
+                            # Monitora COM1 (só recepção)
+                            current_com1_freq = f"{current_rounded.get('com1_active', 0.0):.3f}"
+                            if current_com1_freq != self.last_monitored_com1_freq:
+                                self.radio_client.monitor_frequency(current_com1_freq)
+                                self.last_monitored_com1_freq = current_com1_freq
                             
-                            # Envia posição (com otimização)
-                            if (time.time() - self.last_position_send_time) >= 2.0:
-                                self.radio_client.send_position(current_rounded.get('lat', 0.0), current_rounded.get('lng', 0.0))
-                                self.last_position_send_time = time.time()
+                            # Envia posição quando ela se afasta da extrapolada pelo relay (ou rumo/velocidade mudam);
+                            # lat/lng sem arredondamento (o erro tolerado perto do solo é de 100 m)
+                            lat, lng = flight_data.get('lat', 0.0), flight_data.get('lng', 0.0)
+                            gs, track = current_rounded.get('gs', 0.0), current_rounded.get('track', 0.0)
+                            if self.position_reporter.should_send(lat, lng, gs, track, current_rounded.get('agl', 0.0)):
+                                self.radio_client.send_position(lat, lng, gs, track)
                 else: # Se CONN_STATUS != "REAL"
                     # O rádio é desconectado e limpo quando a conexão SimConnect cai.
+                    self.radio_engine_failed = False
                     if self.radio_client:
                         self.radio_client.disconnect()
                         self.radio_client = None
                 # --- FIM DA LÓGICA DO RÁDIO ---
 
                 self.master_app.after(0, self.master_app.current_frame.update_data, current_rounded)
-                self.master_app.after(0, self.master_app.current_frame.update_sim_status, CONN_STATUS)
+                self.master_app.after(0, self.master_app.current_frame.update_sim_status, sim_data.CONN_STATUS)
 
                 # --- INÍCIO DA CORREÇÃO ---
                 # A lógica de eventos agora é executada independentemente do estado de transmissão.
                 if self.event_logger:
-                    self.event_logger.check_and_log_events(current_rounded) 
+                    self.event_logger.check_and_log_events(current_rounded, flight_data) 
                 # --- FIM DA CORREÇÃO ---
 
                 # A telemetria é enviada apenas se o servidor permitir (self.transmitting é True após START_TX)
@@ -318,7 +342,7 @@ class FlightMonitor:
                 time.sleep(1) # Aguarda antes de tentar reconectar
                 
             except Exception as e: 
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Erro no loop de dados: {e}")
+                log.exception("Erro no loop de dados: %s", e)
                 if self.radio_client:
                     self.radio_client.disconnect()
                     self.radio_client = None
@@ -33,11 +33,57 @@ const io = new Server(server, {
 });
 
 // --- ESTADO GLOBAL E CONSTANTES DE ALCANCE ---
-const PILOT_POSITIONS = {}; // { pilot_id: { lat: number, lng: number, socket_id: string, currentFrequency: string } }
+const PILOT_POSITIONS = {}; // { pilot_id: { lat, lng, gs, track, receivedAt, socket_id: string, currentFrequency: string } }
 const MAX_RANGE_KM = 4000.0;
 const MIN_RANGE_KM = 5.0;
 const EARTH_RADIUS_KM = 6371; // Raio da Terra em km
 
+// Dead reckoning: clientes novos enviam velocidade (gs, nós) e rumo (track, graus) e só reportam a posição
+// quando ela se afasta da extrapolada; o relay extrapola a última posição até o próximo reporte.
+const KT_TO_KMS = 1.852 / 3600;
+const STATIONARY_GS_KT = 1.0;
+const EXTRAPOLATION_MAX_S = 60.0; // Cliente que parou de reportar não é extrapolado indefinidamente
+
+// --- NEGOCIAÇÃO DE CODEC DE ÁUDIO ---
+// Preferência do relay (mais compacto primeiro). O relay não decodifica: escolhe o primeiro codec
+// suportado por TODOS os clientes conectados. Clientes antigos (sem 'codec_offer') só entendem pcm16.
+const CODEC_PREFERENCE = ['nb-ulaw', 'ulaw', 'alaw', 'pcm16'];
+const CLIENT_CODECS = {}; // { socket_id: [codecs] }
+let currentCodec = 'pcm16';
+
+// Taxa de amostragem da rede, negociada da mesma forma (clientes antigos só conhecem 23 kHz)
+const LEGACY_WIRE_RATE = 23000;
+const WIRE_RATE_PREFERENCE = [16000, LEGACY_WIRE_RATE];
+const CLIENT_RATES = {}; // { socket_id: [taxas] }
+let currentRate = LEGACY_WIRE_RATE;
+
+function selectCommonCodec() {
+    const offers = Object.values(CLIENT_CODECS);
+    for (const codec of CODEC_PREFERENCE) {
+        if (offers.every(codecs => codecs.includes(codec))) return codec;
+    }
+    return 'pcm16';
+}
+
+function selectCommonRate() {
+    const offers = Object.values(CLIENT_RATES);
+    for (const rate of WIRE_RATE_PREFERENCE) {
+        if (offers.every(rates => rates.includes(rate))) return rate;
+    }
+    return LEGACY_WIRE_RATE;
+}
+
+function renegotiateCodec() {
+    const codec = selectCommonCodec();
+    const rate = selectCommonRate();
+    if (codec !== currentCodec || rate !== currentRate) {
+        currentCodec = codec;
+        currentRate = rate;
+        console.log(`[CODEC] Codec de áudio da rede: ${currentCodec} a ${currentRate} Hz`);
+        io.emit('codec_selected', { codec: currentCodec, rate: currentRate });
+    }
+}
+
 /**
  * Calcula a distância Haversine entre duas coordenadas.
  * @param {number} lat1 
@@ -63,6 +109,29 @@ function haversineDistance(lat1, lon1, lat2, lon2) {
     return EARTH_RADIUS_KM * c;
 }
 
+/**
+ * Posição estimada do piloto no instante `now` (ms): a última recebida, extrapolada em rumo e velocidade constantes.
+ * Mesma conta do cliente (position_reporter.extrapolate).
+ * @param {object} position
+ * @param {number} now
+ * @returns {{lat: number, lng: number}}
+ */
+function extrapolatePosition(position, now) {
+    const { lat, lng, gs, track, receivedAt } = position;
+    const elapsedS = Math.min((now - receivedAt) / 1000, EXTRAPOLATION_MAX_S);
+    if (!(gs >= STATIONARY_GS_KT) || !(elapsedS > 0)) return { lat, lng };
+
+    const toRad = (value) => (value * Math.PI) / 180;
+    const toDeg = (value) => (value * 180) / Math.PI;
+    const delta = (gs * KT_TO_KMS * elapsedS) / EARTH_RADIUS_KM;
+    const phi1 = toRad(lat);
+    const theta = toRad(track);
+    const phi2 = Math.asin(Math.sin(phi1) * Math.cos(delta) + Math.cos(phi1) * Math.sin(delta) * Math.cos(theta));
+    const lmb2 = toRad(lng) + Math.atan2(Math.sin(theta) * Math.sin(delta) * Math.cos(phi1),
+                                         Math.cos(delta) - Math.sin(phi1) * Math.sin(phi2));
+    return { lat: toDeg(phi2), lng: ((toDeg(lmb2) + 540) % 360) - 180 };
+}
+
 /**
  * Calcula o fator de degradação com base na distância.
  * @param {number} distanceKm 
@@ -161,13 +230,33 @@ io.on('connection', (socket) => {
     console.log(`Cliente ${socket.id} entrou na frequência ${DEFAULT_FREQUENCY}`);
 
     let currentFrequency = DEFAULT_FREQUENCY;
+    // Frequências só de escuta (dual-watch: COM1 monitorado enquanto o TX fica no COM2)
+    let monitoredFrequencies = [];
     let pilotId = null;
 
+    // Até enviar 'codec_offer', o cliente é tratado como legado (apenas pcm16 a 23 kHz)
+    CLIENT_CODECS[socket.id] = ['pcm16'];
+    CLIENT_RATES[socket.id] = [LEGACY_WIRE_RATE];
+    renegotiateCodec();
+
+    // 0. Recebe os codecs e taxas suportados pelo cliente e informa o codec/taxa em uso
+    socket.on('codec_offer', (offer) => {
+        const codecs = (offer && Array.isArray(offer.codecs)) ? offer.codecs.filter(c => typeof c === 'string') : [];
+        CLIENT_CODECS[socket.id] = codecs.includes('pcm16') ? codecs : codecs.concat('pcm16');
+        const rates = (offer && Array.isArray(offer.rates)) ? offer.rates.filter(r => Number.isInteger(r)) : [];
+        CLIENT_RATES[socket.id] = rates.includes(LEGACY_WIRE_RATE) ? rates : rates.concat(LEGACY_WIRE_RATE);
+        renegotiateCodec();
+        socket.emit('codec_selected', { codec: currentCodec, rate: currentRate });
+    });
+
     // 1. Recebe solicitação de MUDANÇA DE FREQUÊNCIA
     socket.on('change_frequency', (newFrequency) => {
         if (newFrequency && typeof newFrequency === 'string') {
 
-            socket.leave(currentFrequency);
+            // A sala continua se a frequência antiga também estiver sendo monitorada
+            if (!monitoredFrequencies.includes(currentFrequency)) {
+                socket.leave(currentFrequency);
+            }
             console.log(`Cliente ${socket.id} saiu da frequência ${currentFrequency}`);
 
             currentFrequency = newFrequency.trim();
@@ -183,15 +272,36 @@ io.on('connection', (socket) => {
         }
     });
 
+    // 1.2. Frequências monitoradas (só recepção). O áudio recebido indica a frequência de origem.
+    socket.on('monitor_frequencies', (frequencies) => {
+        if (!Array.isArray(frequencies)) return;
+        const next = frequencies
+            .filter(freq => typeof freq === 'string')
+            .map(freq => freq.trim())
+            .filter(freq => freq && freq !== currentFrequency);
+
+        monitoredFrequencies.forEach(freq => {
+            if (!next.includes(freq) && freq !== currentFrequency) socket.leave(freq);
+        });
+        next.forEach(freq => socket.join(freq));
+        monitoredFrequencies = next;
+        console.log(`Cliente ${socket.id} monitorando: ${monitoredFrequencies.join(', ') || '(nenhuma)'}`);
+    });
+
     // 1.5. Recebe e armazena a POSIÇÃO e o ID do piloto
     socket.on('update_position', (data) => {
         const { lat, lng, pilot_id } = data;
+        // Velocidade e rumo (opcionais: clientes antigos enviam só lat/lng e não são extrapolados)
+        const hasVelocity = typeof data.gs === 'number' && typeof data.track === 'number';
 
         if (pilot_id && typeof lat === 'number' && typeof lng === 'number') {
             pilotId = pilot_id;
             PILOT_POSITIONS[pilot_id] = {
                 lat,
                 lng,
+                gs: hasVelocity ? data.gs : 0,
+                track: hasVelocity ? data.track : 0,
+                receivedAt: Date.now(),
                 socket_id: socket.id,
                 currentFrequency: currentFrequency // Guarda a frequência atual
             };
@@ -201,14 +311,28 @@ io.on('connection', (socket) => {
 
 
     // 2. Recebe ÁUDIO do PTT e retransmite para a sala (frequência)
-    socket.on('audio_chunk', (data) => {
+    // Clientes com codec negociado enviam { audio, codec }; clientes antigos enviam o PCM cru
+    socket.on('audio_chunk', (chunk, ack) => {
+        // Ack imediato (quando pedido): o cliente mede o RTT do emit para ajustar o tamanho de quadro
+        if (typeof ack === 'function') ack();
+
+        const isWrapped = chunk && !Buffer.isBuffer(chunk) && (chunk.audio !== undefined || chunk.silence === true);
+        const data = isWrapped ? chunk.audio : chunk;
+        const codec = isWrapped && typeof chunk.codec === 'string' ? chunk.codec : 'pcm16';
+        const rate = isWrapped && Number.isInteger(chunk.rate) ? chunk.rate : LEGACY_WIRE_RATE;
+        // Quadro do remetente (ms): o receptor dimensiona o jitter buffer por ele
+        const frameMs = isWrapped && typeof chunk.frame_ms === 'number' ? chunk.frame_ms : undefined;
+        // Marcador de silêncio (VAD do transmissor): repassado sem áudio, o receptor gera ruído de conforto
+        const isSilence = isWrapped && chunk.silence === true;
+
         if (!pilotId) {
             // Áudio recebido, mas piloto ainda não enviou a posição/ID.
             return;
         }
 
-        const senderPosition = PILOT_POSITIONS[pilotId];
-        if (!senderPosition) return;
+        if (!PILOT_POSITIONS[pilotId]) return;
+        const now = Date.now();
+        const senderPosition = extrapolatePosition(PILOT_POSITIONS[pilotId], now);
 
         // Percorre todos os clientes na sala (exceto o remetente)
         io.sockets.in(currentFrequency).fetchSockets().then(sockets => {
@@ -231,25 +355,39 @@ io.on('connection', (socket) => {
 
                 if (!receiverPosition) {
                     // Se o receptor ainda não enviou posição, envia com degradação zero.
-                    const payload = { audio: data, factor: 0.0 };
+                    const payload = isSilence
+                        ? { silence: true, factor: 0.0, sender: pilotId, frequency: currentFrequency, codec: codec, rate: rate, frame_ms: frameMs }
+                        : { audio: data, factor: 0.0, sender: pilotId, frequency: currentFrequency, codec: codec, rate: rate, frame_ms: frameMs };
                     receiverSocket.emit('broadcast_audio', payload);
                     return;
                 }
 
-                // 2. CALCULAR DISTÂNCIA
+                // 2. CALCULAR DISTÂNCIA (posições extrapoladas até agora)
+                const receiverNow = extrapolatePosition(receiverPosition, now);
                 const distanceKm = haversineDistance(
                     senderPosition.lat, senderPosition.lng,
-                    receiverPosition.lat, receiverPosition.lng
+                    receiverNow.lat, receiverNow.lng
                 );
 
                 // 3. CALCULAR FATOR DE DEGRADAÇÃO
                 const factor = calculateDegradationFactor(distanceKm);
 
-                // 4. ENVIAR COM FATOR CORRETO
+                // 4. ENVIAR COM FATOR CORRETO (sender permite ao cliente mixar transmissões simultâneas)
                 const payload = {
                     audio: data,
-                    factor: factor
+                    factor: factor,
+                    sender: pilotId,
+                    frequency: currentFrequency, // Receptores em dual-watch identificam o COM pela frequência
+                    codec: codec,
+                    rate: rate,
+                    frame_ms: frameMs
                 };
+                if (isSilence) {
+                    delete payload.audio;
+                    payload.silence = true;
+                    receiverSocket.emit('broadcast_audio', payload);
+                    return;
+                }
 
                 console.log(`[TX AUDIO] De ${pilotId} para ${receiverPilotId} (Dist: ${distanceKm.toFixed(1)} km, Fator: ${factor.toFixed(4)})`);
 
@@ -262,6 +400,11 @@ io.on('connection', (socket) => {
     socket.on('disconnect', () => {
         console.log(`[DESCONEXÃO] Cliente desconectado: ${socket.id}`);
         socket.leave(currentFrequency);
+        monitoredFrequencies.forEach(freq => socket.leave(freq));
+
+        delete CLIENT_CODECS[socket.id];
+        delete CLIENT_RATES[socket.id];
+        renegotiateCodec();
 
         // Remove a posição do piloto ao desconectar
         for (const id in PILOT_POSITIONS) {